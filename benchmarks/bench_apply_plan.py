@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+bench_apply_plan.py - Batched scaffold materialization vs. the previous per-entry loop.
+Builds a synthetic plan, materializes it with both versions into a temporary directory,
+checks that the trees and counts are identical, then re-applies it on top of itself.
+
+Usage: python benchmarks/bench_apply_plan.py [--dirs 1000] [--files 100] [--jobs 8]
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+from nexus_cli.scaffolding import apply_plan, BOILERPLATES
+
+def legacy_apply_plan(plan, overwrite, use_boilerplate):
+    """The previous apply_plan: mkdir(parents=True) and exists() for every file, serial writes."""
+    d_count, f_count = 0, 0
+    for path, is_dir in plan:
+        if is_dir:
+            path.mkdir(parents=True, exist_ok=True)
+            d_count += 1
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if not path.exists() or overwrite:
+                content = ""
+                if use_boilerplate:
+                    if path.name == ".gitignore": content = BOILERPLATES[".gitignore"]
+                    elif path.name == ".env": content = BOILERPLATES[".env"]
+                    else: content = BOILERPLATES.get(path.suffix, "")
+                path.write_text(content, encoding="utf-8")
+                f_count += 1
+    return d_count, f_count
+
+def make_plan(root, dirs, files):
+    plan = [(root, True)]
+    exts = [".py", ".md", ".txt", ".json"]
+    for d in range(dirs):
+        package = root / f"pkg{d // 10}" / f"mod{d}"
+        if d % 10 == 0:
+            plan.append((package.parent, True))
+        plan.append((package, True))
+        plan += [(package / f"file{f}{exts[f % len(exts)]}", False) for f in range(files)]
+    return plan
+
+def snapshot(root):
+    out = {}
+    for base, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(base, name)
+            with open(path, "rb") as f:
+                out[os.path.relpath(path, root)] = f.read()
+    return out
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--dirs", type=int, default=1000)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=8)
+    args = parser.parse_args()
+
+    base = Path(tempfile.mkdtemp(prefix="nexus_plan_"))
+    try:
+        old_plan = make_plan(base / "legacy", args.dirs, args.files)
+        new_plan = make_plan(base / "batched", args.dirs, args.files)
+        print(f"{len(new_plan):,} plan entries")
+
+        for label, overwrite in (("fresh", False), ("re-apply", False), ("overwrite", True)):
+            old, t_old = timed(legacy_apply_plan, old_plan, overwrite, True)
+            new, t_new = timed(apply_plan, new_plan, overwrite, True, args.jobs)
+            assert old == new, f"counts differ: {old} vs {new}"
+            print(f"{label:>9}: legacy {t_old:.2f}s | batched {t_new:.2f}s ({t_old / t_new:.1f}x), counts {new}")
+
+        assert snapshot(base / "legacy") == snapshot(base / "batched"), "materialized trees differ"
+        print("trees identical")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
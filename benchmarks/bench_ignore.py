@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+bench_ignore.py - Compiled ignore matcher vs. the legacy per-pattern loop.
+Generates a synthetic set of paths and patterns in memory (nothing touches the disk).
+
+Usage: python benchmarks/bench_ignore.py [--paths 100000] [--patterns 300]
+"""
+
+import os
+import time
+import fnmatch
+import random
+import argparse
+
+from nexus_cli.ignore import IgnoreMatcher
+
+def legacy_is_ignored(path_string, ignore_patterns):
+    """The pre-0.4 context.is_ignored: substring test plus fnmatch on the basename."""
+    for pattern in ignore_patterns:
+        if pattern in path_string or fnmatch.fnmatch(os.path.basename(path_string), pattern):
+            return True
+    return False
+
+def make_paths(n, rng):
+    dirs = ["src", "lib", "tests", "docs", "data", "build", "vendor", "node_modules", "pkg", "tools"]
+    exts = ["py", "js", "ts", "md", "csv", "json", "txt", "log", "png"]
+    paths = []
+    for i in range(n):
+        depth = rng.randint(1, 6)
+        parts = [rng.choice(dirs) + str(rng.randint(0, 30)) for _ in range(depth)]
+        if rng.random() < 0.05:
+            parts.insert(rng.randint(0, depth), rng.choice(["node_modules", "__pycache__", "venv", ".git"]))
+        paths.append("/".join(parts) + f"/file{i}.{rng.choice(exts)}")
+    return paths
+
+def make_patterns(n, rng):
+    patterns = [".git", "venv", "__pycache__", "node_modules", "*.egg-info", "context_*.md"]
+    while len(patterns) < n:
+        kind = rng.random()
+        token = f"gen{len(patterns)}"
+        if kind < 0.5:
+            patterns.append(f"{token}_*")
+        elif kind < 0.8:
+            patterns.append(f"*.{token}")
+        else:
+            patterns.append(f"{token}/")
+    return patterns
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--patterns", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    paths = make_paths(args.paths, rng)
+    patterns = make_patterns(args.patterns, rng)
+
+    start = time.perf_counter()
+    legacy_hits = sum(legacy_is_ignored(p, patterns) for p in paths)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = IgnoreMatcher(patterns)
+    matcher.match("warmup")
+    compile_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled_hits = sum(matcher.match(p) for p in paths)
+    compiled_s = time.perf_counter() - start
+
+    print(f"paths={len(paths):,} patterns={len(patterns)}")
+    print(f"legacy   : {legacy_s:8.3f}s  ({legacy_hits:,} ignored)")
+    print(f"compiled : {compiled_s:8.3f}s  ({compiled_hits:,} ignored, compile {compile_s * 1000:.1f}ms)")
+    print(f"speedup  : {legacy_s / compiled_s:8.1f}x")
+
+if __name__ == "__main__":
+    main()
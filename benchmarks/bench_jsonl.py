@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+bench_jsonl.py - JSONL report output vs. the markdown report.
+Writes synthetic code sections for N files as markdown and as JSONL (plain, gzip, and zstd
+when available), checks that `nexus render` reproduces the markdown byte for byte, then
+compares looking up single sections: a markdown scan vs. a seek through the offset index.
+
+Usage: python benchmarks/bench_jsonl.py [--files 20000] [--lookups 200]
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from nexus_cli.jsonl import JsonlWriter, JsonlReader, CompressionUnavailable, render_markdown, codec, SUFFIXES
+from nexus_cli.report import ReportWriter
+
+class Stat:
+    __slots__ = ("st_size", "st_mtime")
+
+    def __init__(self, size):
+        self.st_size = size
+        self.st_mtime = 0.0
+
+class FakeEntry:
+    """Stands in for a walked FileEntry: the writer only needs relpath and stat()."""
+
+    __slots__ = ("relpath", "_stat")
+
+    def __init__(self, relpath, size):
+        self.relpath = relpath
+        self._stat = Stat(size)
+
+    def stat(self):
+        return self._stat
+
+def make_section(rng, relpath):
+    lines = [f"def f{i}(x):\n    return x * {rng.randint(0, 10 ** 6)}  # {'é' if i % 7 == 0 else ''}" for i in range(rng.randint(10, 120))]
+    return f"### CODE: {relpath}\n```\n" + "\n".join(lines) + "\n```\n"
+
+def markdown_lookup(path, relpath):
+    """What a consumer of the markdown report does: read it and find the section's header."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    start = text.index(f"### CODE: {relpath}\n")
+    return text[start:text.index("\n---\n", start)]
+
+def median_ms(func, keys):
+    times = []
+    for key in keys:
+        start = time.perf_counter()
+        func(key)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sections = []
+    for i in range(args.files):
+        relpath = f"pkg{i // 1000}/mod{i // 50}/file{i}.py"
+        sections.append((FakeEntry(relpath, i), make_section(rng, relpath)))
+    header = "# NEXUS CONTEXT REPORT: bench\n**Generated:** now\n\n"
+    keys = [e.relpath for e, _ in rng.sample(sections, args.lookups)]
+
+    with tempfile.TemporaryDirectory(prefix="nexus_jsonl_") as tmp:
+        md = os.path.join(tmp, "context.md")
+        start = time.perf_counter()
+        with ReportWriter(md) as writer:
+            writer.write(header)
+            for entry, content in sections:
+                writer.write_section(content)
+        print(f"markdown:   write {time.perf_counter() - start:.2f}s, {os.path.getsize(md) / (1 << 20):.1f} MB, "
+              f"lookup {median_ms(lambda k: markdown_lookup(md, k), keys[:20]):.2f} ms (read + find)")
+        with open(md, "rb") as f:
+            expected = f.read()
+
+        for compression in (None, "gzip", "zstd"):
+            try:
+                if compression: codec(compression)
+            except CompressionUnavailable as e:
+                print(f"{compression}: skipped ({e})")
+                continue
+            path = os.path.join(tmp, "context.jsonl" + SUFFIXES.get(compression, ""))
+            start = time.perf_counter()
+            with JsonlWriter(path, header, compression) as writer:
+                for entry, content in sections:
+                    writer.write_section(content, entry=entry, translator="code")
+            write = time.perf_counter() - start
+
+            rendered = os.path.join(tmp, "rendered.md")
+            start = time.perf_counter()
+            render_markdown(path, rendered)
+            render = time.perf_counter() - start
+            with open(rendered, "rb") as f:
+                assert f.read() == expected, f"{compression or 'plain'}: rendered markdown differs"
+
+            def lookup(key):
+                with JsonlReader(path) as reader:
+                    return reader.read(key)
+            with JsonlReader(path) as reader:
+                warm = median_ms(reader.read, keys)
+            print(f"{compression or 'plain':10}: write {write:.2f}s, {os.path.getsize(path) / (1 << 20):.1f} MB "
+                  f"(+{os.path.getsize(path + '.idx') / 1024:.0f} KB index), render {render:.2f}s, "
+                  f"lookup {median_ms(lookup, keys):.2f} ms (index load + seek), {warm:.3f} ms with the index loaded")
+
+if __name__ == "__main__":
+    main()
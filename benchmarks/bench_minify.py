@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+bench_minify.py - Single-pass minify_text vs. the previous two-regex version, plus the
+throughput of the language-aware python mode. Builds a synthetic report in memory.
+
+Usage: python benchmarks/bench_minify.py [--mb 100]
+"""
+
+import re
+import time
+import random
+import argparse
+
+from nexus_cli.report import minify_text
+from nexus_cli.minify import minify_python
+
+TRAILING_WS_RE = re.compile(r'[ \t]+$', flags=re.MULTILINE)
+BLANK_RUN_RE = re.compile(r'\n{3,}')
+
+def legacy_minify(text):
+    """The previous minifier: two full regex passes over the text."""
+    return BLANK_RUN_RE.sub('\n\n', TRAILING_WS_RE.sub('', text))
+
+def make_section(i, rng):
+    lines = [f"### CODE: module_{i}.py", "```", '"""Module docstring."""', ""]
+    for f in range(rng.randint(3, 12)):
+        lines += [f"def func_{f}(a, b):  ", f'    """Docstring for func_{f}."""', "    # compute", f"    return a * {f} + b", "", "", ""]
+    return "\n".join(lines + ["```", ""])
+
+def timed(fn, text):
+    start = time.perf_counter()
+    out = fn(text)
+    return out, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--mb", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sections, size = [], 0
+    while size < args.mb << 20:
+        sections.append(make_section(len(sections), rng) + "\n---\n")
+        size += len(sections[-1])
+    report = "".join(sections)
+
+    old, t_old = timed(legacy_minify, report)
+    new, t_new = timed(minify_text, report)
+    assert old == new, "single-pass output differs from the two-regex version"
+    print(f"whitespace, {size / (1 << 20):.0f} MB: two-regex {t_old:.2f}s | single-pass {t_new:.2f}s ({t_old / t_new:.1f}x)")
+
+    sample = sections[:2000]
+    start = time.perf_counter()
+    chars_out = sum(len(minify_python(s)) for s in sample)
+    elapsed = time.perf_counter() - start
+    chars_in = sum(len(s) for s in sample)
+    print(f"python mode, {len(sample)} sections: {chars_in / elapsed / (1 << 20):.1f} MB/s, {chars_in:,} -> {chars_out:,} chars")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+bench_search.py - Build time, size and query latency of the --query search index.
+Indexes synthetic code sections for N files (default 100k), runs a set of queries against
+it, then re-indexes 1% of the files as an incremental update.
+
+Usage: python benchmarks/bench_search.py [--files 100000] [--queries 50]
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from nexus_cli.search import SearchIndex, select_relevant
+
+class Stat:
+    __slots__ = ("st_size", "st_mtime_ns")
+
+    def __init__(self, size, mtime):
+        self.st_size = size
+        self.st_mtime_ns = mtime
+
+class FakeEntry:
+    """Stands in for a walked FileEntry: the index only needs relpath and stat()."""
+
+    __slots__ = ("relpath", "_stat")
+
+    def __init__(self, relpath, size, mtime=0):
+        self.relpath = relpath
+        self._stat = Stat(size, mtime)
+
+    def stat(self):
+        return self._stat
+
+def make_vocabulary(rng, n=20000):
+    syllables = ["auth", "token", "refresh", "user", "cache", "load", "parse", "render", "stream", "index",
+                 "query", "config", "session", "client", "server", "handler", "report", "shard", "walk", "scan"]
+    words = {rng.choice(syllables) + rng.choice(syllables).capitalize() for _ in range(n // 4)}
+    while len(words) < n:
+        words.add("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+def make_section(rng, relpath, vocabulary, weights):
+    words = rng.choices(vocabulary, weights, k=rng.randint(80, 400))
+    lines = [f"def {words[i]}({words[i + 1]}):\n    return {words[i + 2]}.{words[i + 3]}()" for i in range(0, len(words) - 3, 4)]
+    return f"### CODE: {relpath.rpartition('/')[2]}\n```\n" + "\n".join(lines) + "\n```\n"
+
+def index_size(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    entries = [FakeEntry(f"pkg{i // 1000}/mod{i // 50}/file{i}.py", i) for i in range(args.files)]
+    texts = {e.relpath: make_section(rng, e.relpath, vocabulary, weights) for e in entries}
+    tasks = [(e, "code") for e in entries]
+    render = lambda stale: ((e, t, texts[e.relpath]) for e, t in stale)
+    print(f"{args.files:,} sections, {sum(map(len, texts.values())) / (1 << 20):.0f} MB of text")
+
+    with tempfile.TemporaryDirectory(prefix="nexus_search_") as tmp:
+        path = os.path.join(tmp, "search.sqlite")
+        start = time.perf_counter()
+        index = SearchIndex(path)
+        index.update(tasks, render)
+        build = time.perf_counter() - start
+        print(f"build: {build:.1f}s ({args.files / build:,.0f} files/s), index {index_size(path) / (1 << 20):.0f} MB")
+
+        queries = [" ".join(rng.sample(vocabulary[:2000], rng.randint(2, 4))) for _ in range(args.queries)]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            select_relevant(tasks, index, query, args.top_k)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"query (top {args.top_k}, with neighbours): median {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+
+        changed = rng.sample(range(args.files), args.files // 100)
+        for i in changed:
+            entries[i]._stat = Stat(entries[i]._stat.st_size, 1)
+        index.close()
+        start = time.perf_counter()
+        index = SearchIndex(path)
+        n = index.update(tasks, render)
+        print(f"incremental: {n:,} changed files re-indexed in {time.perf_counter() - start:.2f}s (fingerprint check included)")
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+bench_token_estimate.py - Fast token estimator vs. exact BPE counts on a real project.
+Renders every file of the project the way 'nexus scan' would, counts each section both ways,
+and prints the error per section kind plus calibrated chars_per_token ratios.
+
+Usage: python benchmarks/bench_token_estimate.py [PROJECT_DIR] [--bpe-file path/to/cl100k_base.tiktoken]
+"""
+
+import os
+import time
+import argparse
+from collections import defaultdict
+
+from nexus_cli.context import load_config, load_custom_handlers
+from nexus_cli.handlers import render_file, configure_handlers
+from nexus_cli.ignore import ProjectIgnore
+from nexus_cli.walker import walk_files
+from nexus_cli.report import SECTION_SEPARATOR
+from nexus_cli.tokens import TokenCounter, FastEstimator, ENCODING_NAME, section_kind
+
+def render_sections(config):
+    load_custom_handlers()
+    configure_handlers(config.get("handlers"))
+    matcher = ProjectIgnore.from_config(config)
+    translators = config.get("translators", {})
+    sections = []
+    for entry in walk_files(config.get("watch_dirs", ["."]), matcher):
+        translator = translators.get(entry.ext)
+        if translator:
+            content = render_file(translator, entry.path)
+            if content:
+                sections.append(content + SECTION_SEPARATOR)
+    return sections
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("project", nargs="?", default=".")
+    parser.add_argument("--bpe-file", help="Local BPE file for offline exact counts")
+    args = parser.parse_args()
+
+    os.chdir(args.project)
+    config = load_config()
+    settings = config.get("tokenizer", {})
+    exact = TokenCounter(settings.get("encoding", ENCODING_NAME), args.bpe_file or settings.get("bpe_file"), settings.get("cache_dir"))
+    if not exact.available:
+        raise SystemExit(f"Exact tokenizer unavailable: {exact.error}")
+    fast = FastEstimator(settings.get("chars_per_token"))
+
+    sections = render_sections(config)
+    t0 = time.perf_counter()
+    exact_counts = [exact.measure(s) for s in sections]
+    t_exact = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fast_counts = [fast.measure(s) for s in sections]
+    t_fast = time.perf_counter() - t0
+
+    by_kind = defaultdict(lambda: [0, 0, 0, 0, 0.0])
+    for text, e, f in zip(sections, exact_counts, fast_counts):
+        row = by_kind[section_kind(text)]
+        row[0] += 1
+        row[1] += len(text)
+        row[2] += e
+        row[3] += f
+        row[4] += abs(f - e) / max(e, 1)
+
+    print(f"{len(sections)} sections | exact {t_exact * 1000:.1f} ms | fast {t_fast * 1000:.2f} ms ({t_exact / max(t_fast, 1e-9):.0f}x)")
+    print(f"{'kind':<8} {'sections':>8} {'exact':>10} {'fast':>10} {'total err':>10} {'mean |err|':>11} {'calibrated':>11}")
+    for kind, (n, chars, e, f, abs_err) in sorted(by_kind.items(), key=lambda kv: -kv[1][2]):
+        print(f"{str(kind):<8} {n:>8} {e:>10,} {f:>10,} {(f - e) / max(e, 1):>+10.1%} {abs_err / n:>11.1%} {chars / max(e, 1):>11.2f}")
+    total_e, total_f = sum(exact_counts), sum(fast_counts)
+    print(f"{'all':<8} {len(sections):>8} {total_e:>10,} {total_f:>10,} {(total_f - total_e) / max(total_e, 1):>+10.1%}")
+
+if __name__ == "__main__":
+    main()
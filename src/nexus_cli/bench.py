@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+bench.py - Benchmark Module for Nexus CLI
+Generates synthetic projects, times scaffold, init and every scan phase, and compares runs.
+"""
+
+import io
+import os
+import sys
+import json
+import zlib
+import random
+import shutil
+import struct
+import argparse
+import platform
+import tempfile
+import statistics
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+from nexus_cli.context import console
+from nexus_cli.stats import PhaseTimer
+
+# --- Corpus Presets ---
+# Per kind: file count plus the size knobs of each file
+PRESETS = {
+    "tiny":   {"py": 50,    "log": 1, "csv": 2,  "pdf": 2,   "png": 5},
+    "small":  {"py": 1000,  "log": 2, "csv": 5,  "pdf": 10,  "png": 50},
+    "medium": {"py": 10000, "log": 4, "csv": 10, "pdf": 40,  "png": 200},
+    "large":  {"py": 50000, "log": 8, "csv": 30, "pdf": 100, "png": 1000},
+}
+SHAPES = {
+    "tiny":   {"log_mb": 1,   "csv_cols": 10, "csv_rows": 1000,  "pdf_pages": 3},
+    "small":  {"log_mb": 10,  "csv_cols": 40, "csv_rows": 20000, "pdf_pages": 20},
+    "medium": {"log_mb": 50,  "csv_cols": 50, "csv_rows": 20000, "pdf_pages": 50},
+    "large":  {"log_mb": 100, "csv_cols": 80, "csv_rows": 50000, "pdf_pages": 100},
+}
+KIND_DIRS = {"log": "logs", "csv": "data", "pdf": "docs", "png": "assets"}
+PY_PER_DIR, DIRS_PER_PKG = 50, 20
+
+def parse_mix(spec):
+    """Turns "py=2000,pdf=0" into {"py": 2000, "pdf": 0}."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        kind, _, count = part.partition("=")
+        if kind not in PRESETS["tiny"] or not count.isdigit():
+            raise ValueError(f"invalid mix entry '{part}' (expected kind=count, kinds: {', '.join(PRESETS['tiny'])})")
+        mix[kind] = int(count)
+    return mix
+
+# --- Project Layout ---
+def project_tree(name, mix):
+    """
+    The ASCII tree of the synthetic project, in the format `nexus scaffold` reads. Returns
+    (lines, files) where files lists (relpath, kind) for every file in the tree.
+    """
+    lines, files = [f"{name}/"], []
+
+    def add(depth, label):
+        lines.append("│ " * depth + "├── " + label)
+
+    if mix.get("py"):
+        add(0, "src/")
+        for n in range(mix["py"]):
+            pkg, mod, idx = n // (PY_PER_DIR * DIRS_PER_PKG), n // PY_PER_DIR % DIRS_PER_PKG, n % PY_PER_DIR
+            if n % (PY_PER_DIR * DIRS_PER_PKG) == 0:
+                add(1, f"pkg{pkg}/")
+            if idx == 0:
+                add(2, f"mod{mod}/")
+            add(3, f"f{idx}.py")
+            files.append((f"src/pkg{pkg}/mod{mod}/f{idx}.py", "py"))
+    for kind, directory in KIND_DIRS.items():
+        if mix.get(kind):
+            add(0, f"{directory}/")
+            for n in range(mix[kind]):
+                add(1, f"{kind}_{n}.{kind}")
+                files.append((f"{directory}/{kind}_{n}.{kind}", kind))
+    return lines, files
+
+# --- Content Generators ---
+def make_python(rng, n):
+    out = [f"# Copyright (c) {2000 + n % 25} Example Corp.", "# Licensed under the Apache License, Version 2.0.", "",
+           f'"""Synthetic module {n} for benchmarking."""', "", "import os", "import json", ""]
+    for f in range(rng.randint(2, 12)):
+        args = ", ".join(f"arg{a}" for a in range(rng.randint(0, 4)))
+        out += [f"def func_{f}({args}):", f'    """Does step {f} of the pipeline."""', "    # accumulate partial results"]
+        out += [f"    value_{i} = {rng.randint(0, 999)} * len(os.sep) + {i}" for i in range(rng.randint(1, 8))]
+        out += ["    return json.dumps(locals())", "", ""]
+    return "\n".join(out)
+
+def make_log_block(rng, size=1 << 20):
+    levels = ["INFO", "INFO", "INFO", "DEBUG", "WARNING", "ERROR"]
+    lines, total = [], 0
+    while total < size:
+        line = (f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+                f"{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d} {rng.choice(levels)} worker-{rng.randint(0, 15)} "
+                f"request id={rng.getrandbits(48):012x} path=/api/v1/items/{rng.randint(0, 99999)} took={rng.randint(1, 900)}ms\n")
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)
+
+def make_csv(rng, cols, rows):
+    header = ",".join(f"col_{c}" for c in range(cols))
+    pool = []
+    for _ in range(min(rows, 500)):
+        pool.append(",".join(
+            str(rng.randint(0, 10 ** 6)) if c % 3 == 0 else f"{rng.random() * 1000:.3f}" if c % 3 == 1 else f"item{rng.randint(0, 999)}"
+            for c in range(cols)))
+    return header + "\n" + "\n".join(pool[r % len(pool)] for r in range(rows)) + "\n"
+
+def make_pdf(rng, pages):
+    """A minimal multi-page PDF (one text stream per page, classic xref table)."""
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for p in range(pages):
+        text = " ".join(f"({line}) Tj T*" for line in (f"Page {p + 1} line {i}: value {rng.randint(0, 99999)}" for i in range(30)))
+        stream = f"BT /F1 11 Tf 14 TL 72 760 Td {text} ET".encode()
+        objs.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objs))
+        kids.append(b"%d 0 R" % len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for n, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+def make_png(rng, width=64, height=64):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    shade = rng.randint(0, 255)
+    # One filter byte per scanline, then RGB pixels (a gradient, so the image is not trivially blank)
+    rows = b"".join(b"\x00" + bytes(v for x in range(width) for v in (x * 4 % 256, y * 4 % 256, shade))
+                    for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+def fill_project(root, files, shape, seed):
+    """Writes synthetic content into every scaffolded file. Returns {kind: [files, bytes]}."""
+    rng = random.Random(seed)
+    log_block = make_log_block(rng) if any(kind == "log" for _, kind in files) else ""
+    sizes = {}
+    for n, (relpath, kind) in enumerate(files):
+        path = os.path.join(root, relpath)
+        if kind == "py":
+            data = make_python(rng, n).encode()
+        elif kind == "log":
+            data = log_block.encode() * shape["log_mb"]
+        elif kind == "csv":
+            data = make_csv(rng, shape["csv_cols"], shape["csv_rows"]).encode()
+        elif kind == "pdf":
+            data = make_pdf(rng, shape["pdf_pages"])
+        else:
+            data = make_png(rng)
+        with open(path, "wb") as f:
+            f.write(data)
+        stats = sizes.setdefault(kind, [0, 0])
+        stats[0] += 1
+        stats[1] += len(data)
+    return sizes
+
+# --- Timed Steps ---
+def quietly(func, *args, **kwargs):
+    """Runs func with its console output captured; the output is replayed if it fails."""
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            return func(*args, **kwargs)
+    except BaseException:
+        sys.stdout.write(buffer.getvalue())
+        raise
+
+def timed_scan(args, cold):
+    """Runs one scan in the current directory. Returns {phase: seconds}, 'total' and 'other' included."""
+    from nexus_cli.context import run_scan
+    scan_args = argparse.Namespace(
+        output="bench_report.md", copy=False, minify=args.minify, max_tokens=None, shard_tokens=None,
+        shards=None, token_estimate=args.token_estimate, token_breakdown=None, dedup=False,
+        jobs=args.jobs, no_cache=False, rebuild_cache=cold
+    )
+    timer = PhaseTimer()
+    start = perf_counter()
+    quietly(run_scan, scan_args, timer)
+    phases = dict(timer.seconds)
+    phases["total"] = perf_counter() - start
+    phases["other"] = max(0.0, phases["total"] - sum(timer.seconds.values()))
+    return phases
+
+def run_once(args, base, index, mix, shape):
+    """Scaffolds, fills, initializes and scans one fresh project. Returns (metrics, corpus)."""
+    from nexus_cli.scaffolding import run_scaffold
+    from nexus_cli.init import run_init
+
+    name = "bench_project"
+    lines, files = project_tree(name, mix)
+    run_dir = Path(base) / f"run_{index}"
+    tree_file = Path(base) / f"tree_{index}.txt"
+    tree_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    metrics = {}
+    start = perf_counter()
+    quietly(run_scaffold, argparse.Namespace(file=tree_file, out=run_dir, yes=True, json=False, dry_run=False, no_boilerplate=False))
+    metrics["scaffold"] = perf_counter() - start
+
+    project = run_dir / name
+    start = perf_counter()
+    sizes = fill_project(project, files, shape, args.seed)
+    corpus = {"files": len(files), "bytes": sum(b for _, b in sizes.values()),
+              "kinds": {k: {"files": n, "bytes": b} for k, (n, b) in sorted(sizes.items())},
+              "generate_seconds": round(perf_counter() - start, 3)}
+
+    cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        start = perf_counter()
+        quietly(run_init, argparse.Namespace(force=True, yes=True))
+        metrics["init"] = perf_counter() - start
+
+        with open("nexus.json", "r", encoding="utf-8") as f:
+            config = json.load(f)
+        config["ignore_patterns"].append("bench_report.md")
+        if args.minify:
+            config["minify"] = {"py": "python"}
+        if args.bpe_file:
+            config["tokenizer"] = {"bpe_file": os.path.abspath(os.path.join(cwd, args.bpe_file))}
+        with open("nexus.json", "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=4)
+
+        for label, cold in (("scan", True), ("scan_warm", False)):
+            for phase, seconds in timed_scan(args, cold).items():
+                metrics[f"{label}.{phase}"] = seconds
+    finally:
+        os.chdir(cwd)
+    return metrics, corpus
+
+# --- Reporting ---
+def compare(metrics, baseline, tolerance, min_delta):
+    """Returns [(metric, seconds, baseline_seconds, regressed)] for the metrics both runs have."""
+    rows = []
+    for metric, seconds in metrics.items():
+        old = baseline.get(metric)
+        if old is None:
+            continue
+        rows.append((metric, seconds, old, seconds > old * (1 + tolerance) and seconds - old > min_delta))
+    return rows
+
+def print_results(result, rows=None):
+    from rich.table import Table
+    table = Table(title=f"Nexus bench: {result['corpus']['files']:,} files, {result['corpus']['bytes'] / (1 << 20):.1f} MB "
+                        f"(median of {result['settings']['repeat']})")
+    table.add_column("Metric")
+    table.add_column("Seconds", justify="right")
+    if rows is not None:
+        table.add_column("Baseline", justify="right")
+        table.add_column("Change", justify="right")
+    by_metric = {row[0]: row for row in rows or []}
+    for metric, seconds in result["metrics"].items():
+        cells = [metric, f"{seconds:.3f}"]
+        if rows is not None:
+            row = by_metric.get(metric)
+            if row is None:
+                cells += ["-", "-"]
+            else:
+                change = f"{(seconds / row[2] - 1) * 100:+.0f}%" if row[2] else "-"
+                cells += [f"{row[2]:.3f}", f"[bold red]{change}" if row[3] else change]
+        table.add_row(*cells)
+    console.print(table)
+
+def run_bench(args):
+    """Entry point for the 'nexus bench' subcommand."""
+    try:
+        mix = {**PRESETS[args.size], **parse_mix(args.mix)}
+    except ValueError as e:
+        console.print(f"[bold red]❌ {e}")
+        sys.exit(2)
+    shape = SHAPES[args.size]
+    repeat = max(1, args.repeat)
+
+    base = os.path.abspath(args.dir) if args.dir else tempfile.mkdtemp(prefix="nexus_bench_")
+    os.makedirs(base, exist_ok=True)
+    console.print(f"[cyan][Nexus] ⏱️  Benchmarking '{args.size}' corpus ({', '.join(f'{k}={v}' for k, v in mix.items())}) in {base}")
+
+    samples, corpus = {}, None
+    try:
+        for index in range(repeat):
+            metrics, corpus = run_once(args, base, index, mix, shape)
+            for metric, seconds in metrics.items():
+                samples.setdefault(metric, []).append(seconds)
+            console.print(f"[cyan]    run {index + 1}/{repeat}: scan {metrics['scan.total']:.2f}s, warm {metrics['scan_warm.total']:.2f}s")
+            if not args.dir:
+                shutil.rmtree(os.path.join(base, f"run_{index}"), ignore_errors=True)
+    finally:
+        if not args.dir:
+            shutil.rmtree(base, ignore_errors=True)
+
+    try:
+        from importlib.metadata import version
+        nexus_version = version("nexus-cli")
+    except Exception:
+        nexus_version = "unknown"
+
+    result = {
+        "nexus_version": nexus_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "settings": {"size": args.size, "mix": mix, "shape": shape, "seed": args.seed, "repeat": repeat,
+                     "jobs": args.jobs, "minify": args.minify, "token_estimate": args.token_estimate or "exact"},
+        "corpus": corpus,
+        # A phase missing from some runs (e.g. nothing to tokenize) counts as 0 there
+        "metrics": {m: round(statistics.median(v + [0.0] * (repeat - len(v))), 4) for m, v in sorted(samples.items())},
+        "samples": {m: [round(s, 4) for s in v] for m, v in sorted(samples.items())},
+    }
+
+    rows, regressions = None, []
+    if args.baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]❌ Cannot read baseline {args.baseline}: {e}")
+            sys.exit(2)
+        if baseline.get("settings", {}).get("mix") != mix or baseline.get("settings", {}).get("shape") != shape:
+            console.print("[bold yellow]⚠️ The baseline was recorded on a different corpus; the comparison may be meaningless.")
+        rows = compare(result["metrics"], baseline.get("metrics", {}), args.tolerance, args.min_delta)
+        regressions = [row for row in rows if row[3]]
+
+    print_results(result, rows)
+    out_path = args.output or f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    console.print(f"[bold green]✅ Benchmark results saved to: [white]{out_path}")
+
+    if regressions:
+        names = ", ".join(row[0] for row in regressions)
+        console.print(f"[bold red]❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%} of the baseline: {names}")
+        sys.exit(1)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+cache.py - Scan Cache Module for Nexus CLI
+Persists rendered handler sections under .nexus/ so unchanged files skip re-translation.
+"""
+
+import os
+import json
+import hashlib
+
+CACHE_DIR = os.path.join(".nexus", "cache")
+CACHE_FILE = os.path.join(CACHE_DIR, "scan_cache.json")
+# Bump when the cache file layout changes (handler output changes bump handlers.HANDLER_VERSION)
+CACHE_VERSION = 2
+
+def file_hash(path, chunk_size=1 << 20):
+    """Returns a blake2b digest of the file contents, read in fixed-size chunks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ScanCache:
+    """
+    On-disk map of path -> rendered section.
+    An entry is valid only while the file's size, mtime (and optionally its content hash)
+    and the translator that produced it are unchanged. Entries not touched during a full run
+    are evicted on save, and the whole cache is dropped when the salt (handler settings, version and custom handlers) changes.
+    """
+
+    def __init__(self, path=CACHE_FILE, verify_hash=False, rebuild=False, salt=""):
+        self.path = path
+        self.verify_hash = verify_hash
+        self.salt = salt
+        self.entries = {}
+        self.touched = set()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        if not rebuild:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION and data.get("salt", "") == self.salt:
+            self.entries = data.get("entries", {})
+
+    def _matches(self, entry, path, translator, st):
+        if entry.get("translator") != translator:
+            return False
+        if not self._same_stat(entry, st):
+            return False
+        if self.verify_hash and entry.get("hash") != file_hash(path):
+            return False
+        return True
+
+    def get(self, path, translator, st):
+        """Returns the cached section for path, or None on a miss."""
+        self.touched.add(path)
+        entry = self.entries.get(path)
+        if entry is not None and self._matches(entry, path, translator, st):
+            self.hits += 1
+            return entry["content"]
+        self.misses += 1
+        return None
+
+    @staticmethod
+    def _same_stat(entry, st):
+        return entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime_ns
+
+    def put(self, path, translator, st, content):
+        old = self.entries.get(path)
+        entry = {"translator": translator, "size": st.st_size, "mtime": st.st_mtime_ns, "content": content}
+        if self.verify_hash:
+            entry["hash"] = file_hash(path)
+        elif old and old.get("hash") and self._same_stat(old, st):
+            entry["hash"] = old["hash"]
+        self.entries[path] = entry
+        self.touched.add(path)
+        self.dirty = True
+
+    def content_hash(self, path, st):
+        """Content hash of path, reused while its size and mtime are unchanged."""
+        self.touched.add(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry.get("hash") and self._same_stat(entry, st):
+            return entry["hash"]
+        if entry is None or not self._same_stat(entry, st):
+            # A hash-only entry; it never matches get() until a section is put for the path
+            entry = self.entries[path] = {"size": st.st_size, "mtime": st.st_mtime_ns}
+        entry["hash"] = file_hash(path)
+        self.dirty = True
+        return entry["hash"]
+
+    def get_tokens(self, path, key):
+        """Cached token count of path's section under `key` (encoding + minify mode), if any."""
+        entry = self.entries.get(path)
+        return entry.get("tokens", {}).get(key) if entry else None
+
+    def put_tokens(self, path, key, count):
+        entry = self.entries.get(path)
+        if entry is not None and entry.get("tokens", {}).get(key) != count:
+            entry.setdefault("tokens", {})[key] = count
+            self.dirty = True
+
+    def evict(self):
+        """Drops the entries not touched since the cache was loaded."""
+        stale = [p for p in self.entries if p not in self.touched]
+        for p in stale:
+            del self.entries[p]
+        if stale:
+            self.dirty = True
+
+    def save(self, evict=True):
+        """Evicts stale entries (unless evict is False, after a partial scan) and atomically writes the cache back to disk."""
+        if evict:
+            self.evict()
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "salt": self.salt, "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+client.py - Daemon Client Module for Nexus CLI
+Finds a running `nexus serve` daemon for the current project and sends it requests.
+Standard library only, so forwarding a scan costs no heavy imports.
+"""
+
+import os
+import sys
+import json
+import shutil
+import socket
+
+SERVE_FILE = os.path.join(".nexus", "serve.json")
+CONNECT_TIMEOUT = 0.5
+
+class DaemonError(Exception):
+    pass
+
+def pid_alive(pid):
+    """Whether a process with this pid exists (a daemon that crashed leaves its serve.json behind)."""
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        try:
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def forget_daemon(info, path=SERVE_FILE):
+    """Removes a stale serve.json, unless a new daemon has replaced it in the meantime."""
+    try:
+        if daemon_info(path, check=False) == info:
+            os.remove(path)
+    except OSError:
+        pass
+
+def daemon_info(path=SERVE_FILE, check=True):
+    """
+    The serve.json written by a running daemon ({pid, socket|port, token}), or None.
+    With `check`, a file whose daemon is no longer running is removed and ignored.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(info, dict):
+        return None
+    if check and not pid_alive(info.get("pid")):
+        forget_daemon(info, path)
+        return None
+    return info
+
+def connect(info):
+    if info.get("socket"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = info["socket"]
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ("127.0.0.1", info["port"])
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    sock.settimeout(None)
+    return sock
+
+def request(cmd, info=None, **params):
+    """
+    Sends one request and returns the daemon's response dict. Raises DaemonError when no
+    daemon is reachable, so callers can fall back to doing the work themselves.
+    """
+    info = info or daemon_info()
+    if not info:
+        raise DaemonError("no daemon is running for this project")
+    # The token only goes to the daemon that wrote serve.json
+    if not pid_alive(info.get("pid")):
+        forget_daemon(info)
+        raise DaemonError(f"daemon {info.get('pid')} is not running")
+    try:
+        sock = connect(info)
+    except (ConnectionRefusedError, FileNotFoundError) as e:
+        # Nothing listens on the recorded address: the daemon is gone
+        forget_daemon(info)
+        raise DaemonError(f"daemon unreachable: {e}")
+    except OSError as e:
+        raise DaemonError(f"daemon unreachable: {e}")
+    try:
+        with sock:
+            payload = {"cmd": cmd, "token": info.get("token"), **params}
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError as e:
+        raise DaemonError(f"daemon unreachable: {e}")
+    if not line:
+        raise DaemonError("daemon closed the connection")
+    response = json.loads(line)
+    if not response.get("ok", False) and "error" in response:
+        raise DaemonError(response["error"])
+    return response
+
+def forward_scan(args):
+    """
+    Runs `nexus scan` on the project's daemon, if one is running. Prints the scan's output and
+    returns its exit status, or None when there is no daemon to forward to.
+    """
+    info = daemon_info()
+    if not info:
+        return None
+    options = {k: v for k, v in vars(args).items() if k not in ("command", "no_daemon")}
+    try:
+        response = request("scan", info, args=options, tty=sys.stdout.isatty(),
+                           width=shutil.get_terminal_size().columns)
+    except DaemonError:
+        return None
+    sys.stdout.write(response.get("output", ""))
+    sys.stdout.flush()
+    return response.get("code", 0)
@@ -5,26 +5,45 @@ Scans the project directory and compiles files into an LLM-ready markdown report
 """
 
 import os
-import re  # <--- NEW: Regular Expressions for Minification
+import sys
 import json
-import fnmatch
 import importlib.util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
 
 # --- QoL Libraries ---
-import tiktoken
-import pyperclip
 from rich.console import Console # <--- NEW
 
 # Import the core registry from our handlers module
-from nexus_cli.handlers import REGISTRY
+from nexus_cli.handlers import REGISTRY, render_file, timed_render, configure_handlers, handler_salt, pdf_cache_policy, prune_pdf_cache
+from nexus_cli.cache import ScanCache, CACHE_DIR, file_hash
+from nexus_cli.client import SERVE_FILE
+from nexus_cli.dedup import find_duplicates, render_reference
+from nexus_cli.minify import Minifier
+from nexus_cli.shards import ShardWriter, partition_sections, write_shards, write_index
+from nexus_cli.stats import NULL_TIMER, ScanStats
+from nexus_cli.ignore import ProjectIgnore, normalize_path, translate_legacy_patterns, IGNORE_SYNTAX
+from nexus_cli.walker import Walker, FileEntry
+from nexus_cli.jsonl import JsonlWriter, CompressionUnavailable, compression_for, codec, SUFFIXES
+from nexus_cli.report import ReportWriter, Section, minify_text, format_bytes, SECTION_SEPARATOR
+from nexus_cli.packing import PriorityRules, pack_sections, render_manifest, manifest_reserve, INCLUDED, OMITTED
+from nexus_cli.tokens import make_counter
 
 def load_config():
     """Loads nexus.json or returns a default configuration."""
     if os.path.exists("nexus.json"):
         print("[Nexus] Loading configuration from nexus.json")
         with open("nexus.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+            config = json.load(f)
+        # Older nexus.json files used substring patterns; keep them matching what they used to
+        if config.get("ignore_syntax") != IGNORE_SYNTAX:
+            config["ignore_patterns"], changed = translate_legacy_patterns(config.get("ignore_patterns", []))
+            if changed:
+                print(f"[Nexus] ⚠️ ignore_patterns now follow .gitignore rules; substring patterns are kept as "
+                      f"{', '.join(f'{old!r} -> {new!r}' for old, new in changed.items())}. "
+                      f"Add \"ignore_syntax\": \"{IGNORE_SYNTAX}\" to nexus.json to use the patterns as written.")
+        return config
             
     print("[Nexus] WARNING: nexus.json not found. Using defaults.")
     return {
@@ -32,8 +51,10 @@ def load_config():
         "watch_dirs": ["."],
         "ignore_patterns": [
             ".git", "venv", "__pycache__", "nexus_tool", 
-            "test_output", "context_*.md", "nexus_report_*.md"
+            "test_output", "context_*.md", "context_*.jsonl*", "nexus_report_*.md"
         ],
+        "ignore_syntax": IGNORE_SYNTAX,
+        "use_gitignore": False,
         "translators": {
             "csv": "csv", "py": "code", "js": "code", "md": "text", 
             "txt": "text", "png": "image", "jpg": "image", "pdf": "pdf",
@@ -41,13 +62,6 @@ def load_config():
         }
     }
 
-def is_ignored(path_string, ignore_patterns):
-    """Evaluates if a path should be ignored using both substrings and wildcards."""
-    for pattern in ignore_patterns:
-        if pattern in path_string or fnmatch.fnmatch(os.path.basename(path_string), pattern):
-            return True
-    return False
-
 def load_custom_handlers():
     """Loads a custom_handlers.py file from the user's project if it exists."""
     custom_path = os.path.join(os.getcwd(), ".nexus", "custom_handlers.py")
@@ -63,75 +77,550 @@ def load_custom_handlers():
 # Initialize a Rich console
 console = Console()
 
-def run_scan(args):
-    """Entry point for the 'nexus scan' subcommand."""
-    config = load_config()
-    load_custom_handlers()  
-    
-    # Use a status spinner for a premium CLI feel
-    with console.status("[bold cyan][Nexus] Scanning project files...", spinner="dots") as status:
-        report = f"# NEXUS CONTEXT REPORT: {config.get('project_name')}\n**Generated:** {datetime.now()}\n\n"
-        
-        files_processed = 0
-        watch_dirs = config.get("watch_dirs", ["."])
+class ScanResources:
+    """
+    Loads what a scan needs before it walks: the config (and custom handlers), the scan cache
+    and the token counter. `nexus serve` substitutes a subclass that keeps them warm.
+    """
+
+    def config(self):
+        config = load_config()
+        load_custom_handlers()
+        return config
+
+    def cache(self, **options):
+        return ScanCache(**options)
+
+    def counter(self, settings, estimate):
+        return make_counter(settings, estimate)
+
+    def save_cache(self, cache, evict=True):
+        cache.save(evict=evict)
+
+# CPU-bound built-in translators go to worker processes; everything else is I/O and uses threads
+PROCESS_TRANSLATORS = {"csv", "pdf"}
+
+class _TimedFuture:
+    """Unwraps a timed_render result, reporting the handler time measured in the worker."""
+
+    __slots__ = ("future", "report")
+
+    def __init__(self, future, report):
+        self.future = future
+        self.report = report
+
+    def result(self):
+        seconds, content = self.future.result()
+        self.report(seconds)
+        return content
+
+class HandlerPool:
+    """
+    Dispatches handler calls to thread/process pools, or defers them inline when jobs == 1.
+    With `on_render(path, translator, seconds)`, workers time their own handler calls.
+    """
+
+    def __init__(self, jobs, options=None, on_render=None):
+        self.jobs = jobs
+        self.options = options or {}
+        self.on_render = on_render
+        self._threads = None
+        self._processes = None
+
+    def submit(self, translator, path):
+        """Returns a Future for the handler call, or None if it should run inline."""
+        if self.jobs <= 1:
+            return None
+        func = render_file if self.on_render is None else timed_render
+        # Custom handlers only exist in this process, so they never cross into a worker process
+        if translator in PROCESS_TRANSLATORS and REGISTRY[translator].__module__ == "nexus_cli.handlers":
+            if self._processes is None:
+                # Forking while handler threads hold import locks can deadlock the child, so
+                # workers start from a clean interpreter (forkserver, or spawn where unavailable)
+                import multiprocessing
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.jobs, initializer=configure_handlers, initargs=(self.options,),
+                    mp_context=multiprocessing.get_context(method)
+                )
+            future = self._processes.submit(func, translator, path)
+        else:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self.jobs)
+            future = self._threads.submit(func, translator, path)
+        if self.on_render is None:
+            return future
+        return _TimedFuture(future, lambda seconds: self.on_render(path, translator, seconds))
 
-        for directory in watch_dirs:
-            if not os.path.exists(directory):
+    def close(self):
+        for executor in (self._threads, self._processes):
+            if executor is not None:
+                # cancel_futures is Python 3.9+; on 3.8 queued calls finish before shutdown returns
+                if sys.version_info >= (3, 9):
+                    executor.shutdown(cancel_futures=True)
+                else:
+                    executor.shutdown()
+
+def render_tasks(tasks, pool, cache=None, on_error=None, presets=None, render=render_file):
+    """
+    Yields (entry, translator, content) for each (entry, translator) task, in task order.
+    Cache hits resolve immediately; misses are submitted to the pool through a bounded window,
+    so the output is identical to a serial run. Failed files are reported and skipped.
+    `presets` maps paths to already known content, which bypasses both cache and handlers.
+    `render(translator, path)` runs inline handler calls (jobs == 1).
+    """
+    def finish(item):
+        entry, translator, content, future = item
+        try:
+            if content is None:
+                content = future.result() if future else render(translator, entry.path)
+                if cache: cache.put(entry.path, translator, entry.stat(), content)
+            return entry, translator, content
+        except Exception as e:
+            if on_error: on_error(entry, e)
+            return None
+
+    window = pool.jobs * 4
+    pending = deque()
+    for entry, translator in tasks:
+        if presets and entry.path in presets:
+            content, future = presets[entry.path], None
+        else:
+            try:
+                content = cache.get(entry.path, translator, entry.stat()) if cache else None
+            except OSError as e:
+                if on_error: on_error(entry, e)
                 continue
-                
-            for root, dirs, files in os.walk(directory):
-                dirs[:] = [d for d in dirs if not is_ignored(os.path.join(root, d), config["ignore_patterns"])]
-                    
-                for file in files:
-                    path = os.path.join(root, file)
-                    if is_ignored(path, config["ignore_patterns"]):
-                        continue
-
-                    # Update status message for the current file
-                    status.update(f"[bold cyan][Nexus] Processing: [white]{file}")
-
-                    ext = file.split(".")[-1].lower()
-                    translator = config["translators"].get(ext)
-
-                    if translator and translator in REGISTRY:
-                        try:
-                            content = REGISTRY[translator](path)
-                            if content:
-                                report += content + "\n---\n"
-                                files_processed += 1
-                        except Exception as e:
-                            console.print(f"[bold red]! Error reading {file}: {e}")
-    
-    # --- Token Minification ---
-    if getattr(args, 'minify', False):
-        report = re.sub(r'[ \t]+$', '', report, flags=re.MULTILINE)
-        report = re.sub(r'\n{3,}', '\n\n', report)
-        console.print("[cyan][Nexus] 🗜️  Report minified (removed extra spaces and newlines).")
+            future = pool.submit(translator, entry.path) if content is None else None
+        pending.append((entry, translator, content, future))
+        while len(pending) > window:
+            done = finish(pending.popleft())
+            if done: yield done
+    while pending:
+        done = finish(pending.popleft())
+        if done: yield done
+
+def print_token_breakdown(breakdown, top_n):
+    """Prints per-translator totals and the top_n most expensive files (0 = every file)."""
+    from rich.table import Table
+    by_translator = {}
+    for _, translator, n in breakdown:
+        by_translator[translator] = by_translator.get(translator, 0) + n
+
+    table = Table(title="Tokens by translator")
+    table.add_column("Translator")
+    table.add_column("Files", justify="right")
+    table.add_column("Tokens", justify="right")
+    for translator, n in sorted(by_translator.items(), key=lambda kv: -kv[1]):
+        files = sum(1 for _, t, _ in breakdown if t == translator)
+        table.add_row(translator, f"{files:,}", f"{n:,}")
+    console.print(table)
+
+    ranked = sorted(breakdown, key=lambda row: -row[2])
+    table = Table(title="Tokens by file" if not top_n else f"Top {top_n} files by tokens")
+    table.add_column("File")
+    table.add_column("Translator")
+    table.add_column("Tokens", justify="right")
+    for relpath, translator, n in ranked[:top_n or None]:
+        table.add_row(relpath, translator, f"{n:,}")
+    console.print(table)
 
-    # --- Save Logic ---
+def print_ranking(ranking):
+    """Prints the files a --query scan kept, best match first."""
+    if not ranking:
+        console.print("[bold yellow]⚠️ No file matches the query.")
+        return
+    from rich.table import Table
+    table = Table(title="Query matches")
+    table.add_column("#", justify="right")
+    table.add_column("File")
+    table.add_column("Score", justify="right")
+    for rank, (relpath, score) in enumerate(ranking, 1):
+        table.add_row(str(rank), relpath, f"{score:.2f}")
+    console.print(table)
+
+def print_scan_stats(stats, top_n):
+    """Prints scan phases, per-translator totals and the top_n slowest files (0 = every file)."""
+    from rich.table import Table
+    table = Table(title=f"Scan phases ({stats.total:.2f}s total)")
+    table.add_column("Phase")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Share", justify="right")
+    table.add_column("Calls", justify="right")
+    for phase, seconds, calls in stats.phases():
+        share = f"{seconds / stats.total:.0%}" if stats.total else "-"
+        table.add_row(phase, f"{seconds:.3f}", share, f"{calls:,}" if calls else "")
+    console.print(table)
+
+    table = Table(title="Handlers by translator")
+    for column in ("Translator", "Files", "Rendered", "Cached", "Errors", "Seconds", "Input", "Output", "Tokens"):
+        table.add_column(column, justify="left" if column == "Translator" else "right")
+    for translator, t in sorted(stats.by_translator().items(), key=lambda kv: -kv[1]["seconds"]):
+        table.add_row(translator, f"{t['files']:,}", f"{t['rendered']:,}", f"{t['cached']:,}", f"{t['errors']:,}",
+                      f"{t['seconds']:.3f}", format_bytes(t["bytes"]), format_bytes(t["output"]), f"{t['tokens']:,}")
+    console.print(table)
+
+    table = Table(title="Slowest files" if not top_n else f"Top {top_n} slowest files")
+    for column in ("File", "Translator", "Status", "Seconds", "Input", "Output", "Tokens", "Error"):
+        table.add_column(column, justify="right" if column in ("Seconds", "Input", "Output", "Tokens") else "left")
+    for f in stats.slowest(top_n):
+        table.add_row(f.relpath, f.translator, f.status, f"{f.seconds:.3f}", format_bytes(f.bytes), format_bytes(f.output),
+                      f"{f.tokens:,}" if f.tokens is not None else "-", f.error or "")
+    console.print(table)
+
+def print_profile(profiler, path, top_n=25):
+    import io
+    import pstats
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(top_n)
+    console.print(buffer.getvalue().strip("\n"), markup=False, highlight=False)
+    console.print(f"[cyan][Nexus] 🔬 Profile saved to {path} (inspect with: python -m pstats {path})")
+
+def run_scan(args, timer=NULL_TIMER, resources=None):
+    """
+    Entry point for the 'nexus scan' subcommand. `timer` receives the time spent per phase;
+    --stats/--stats-json swap in a ScanStats and --profile runs the scan under cProfile.
+    """
+    stats_top = getattr(args, 'stats', None)
+    stats_json = getattr(args, 'stats_json', None)
+    if timer is NULL_TIMER and (stats_top is not None or stats_json):
+        timer = ScanStats()
+
+    profile_path = getattr(args, 'profile', None)
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(scan, args, timer, resources)
+        finally:
+            profiler.dump_stats(profile_path)
+            print_profile(profiler, profile_path)
+    else:
+        scan(args, timer, resources)
+
+    # --- Scan Statistics ---
+    if isinstance(timer, ScanStats):
+        timer.finish()
+        if stats_top is not None:
+            print_scan_stats(timer, stats_top)
+        if stats_json:
+            try:
+                with open(stats_json, "w", encoding="utf-8") as f:
+                    json.dump(timer.to_dict(), f, indent=2)
+                console.print(f"[cyan][Nexus] 📊 Scan statistics saved to {stats_json}")
+            except OSError as e:
+                console.print(f"[bold yellow]⚠️ Failed to write scan statistics: {e}")
+
+def scan(args, timer=NULL_TIMER, resources=None):
+    """Scans the project and writes the report (see run_scan)."""
+    resources = resources or ScanResources()
+    config = resources.config()
+    handler_opts = config.get("handlers", {})
+    # The PDF page cache follows --no-cache / --rebuild-cache like the scan cache
+    render_opts = pdf_cache_policy(handler_opts, not getattr(args, 'no_cache', False), getattr(args, 'rebuild_cache', False))
+    configure_handlers(render_opts)
+
+    # --- Incremental Cache ---
+    cache = None
+    if not getattr(args, 'no_cache', False):
+        cache = timer.wrap(resources.cache, "setup")(
+            verify_hash=config.get("cache", {}).get("verify_hash", False),
+            rebuild=getattr(args, 'rebuild_cache', False),
+            # Changing a handler option, nexus' handlers or custom_handlers.py invalidates every cached section
+            salt=handler_salt(handler_opts)
+        )
+        timer.instrument(cache, "cache", "get", "put", "content_hash", "get_tokens", "put_tokens", "save")
+
+    # The cache directory and the daemon's serve.json are always skipped, whatever nexus.json says
+    matcher = ProjectIgnore.from_config(config, extra=[f"/{normalize_path(CACHE_DIR)}/", f"/{normalize_path(SERVE_FILE)}"])
+    timer.instrument(matcher, "ignore", "enter_dir", "match")
+    
+    # --- Output Path ---
+    # --format jsonl writes one record per file plus a sidecar offset index (see jsonl.py)
+    jsonl = getattr(args, 'format', None) == "jsonl"
+    compression = getattr(args, 'compress', None)
+    if compression and not jsonl:
+        console.print("[bold yellow]⚠️ --compress only applies to --format jsonl and is ignored.")
+        compression = None
     if getattr(args, 'output', None):
         out_path = args.output
+        if jsonl and compression is None:
+            compression = compression_for(out_path)
     else:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        out_path = f"context_{timestamp}.md"
+        out_path = f"context_{timestamp}.jsonl{SUFFIXES.get(compression, '')}" if jsonl else f"context_{timestamp}.md"
+    if compression:
+        try:
+            codec(compression)
+        except CompressionUnavailable as e:
+            console.print(f"[bold red]❌ {e}")
+            sys.exit(1)
+
+    minify = getattr(args, 'minify', False)
+    jobs = max(1, getattr(args, 'jobs', 1) or 1)
+    counter = timer.wrap(resources.counter, "setup")(config.get("tokenizer"), getattr(args, 'token_estimate', None))
+    timer.instrument(counter, "tokenize", "measure", "measure_batch")
+    if counter.error is not None:
+        reason = (str(counter.error).splitlines() or [type(counter.error).__name__])[0][:100]
+        console.print(f"[bold yellow]⚠️ Tokenizer unavailable ({reason}); token counts are disabled. Set \"tokenizer\": {{\"bpe_file\": ...}} in nexus.json or use --token-estimate fast.")
+    # Tokens saved by minifying cost two extra counts per section, so they are only measured for --stats / --token-breakdown
+    measure_savings = counter.available and (isinstance(timer, ScanStats) or getattr(args, 'token_breakdown', None) is not None)
+    minifier = Minifier(config.get("minify"), counter.measure if measure_savings else None) if minify else None
+    if minifier and minifier.unknown:
+        console.print(f"[bold yellow]⚠️ Unknown minify modes {minifier.unknown}; those files get the whitespace pass only.")
+    if minifier:
+        timer.instrument(minifier, "minify", "apply")
+    max_tokens = getattr(args, 'max_tokens', None)
+    if max_tokens and not counter.available:
+        console.print("[bold yellow]⚠️ Tokenizer unavailable: --max-tokens is ignored.")
+        max_tokens = None
+    shard_tokens = getattr(args, 'shard_tokens', None)
+    shard_count = getattr(args, 'shards', None)
+    if (shard_tokens or shard_count) and not counter.available:
+        console.print("[bold yellow]⚠️ Tokenizer unavailable: sharding is ignored.")
+        shard_tokens = shard_count = None
+    if (shard_tokens or shard_count) and jsonl:
+        console.print("[bold yellow]⚠️ Sharding is ignored with --format jsonl (records are read one by one through the index).")
+        shard_tokens = shard_count = None
+    if (shard_tokens or shard_count) and max_tokens:
+        console.print("[bold yellow]⚠️ --max-tokens is ignored when the report is sharded.")
+        max_tokens = None
+
+    # --- Git File Lists ---
+    # --since/--git take the file list from the local repository instead of walking the tree
+    since = getattr(args, 'since', None)
+    use_git = since is not None or getattr(args, 'git', False)
+    list_unchanged = getattr(args, 'list_unchanged', False) and since is not None
+    base = None
+    if use_git:
+        from nexus_cli import gitfiles
+        try:
+            if since is not None:
+                base = gitfiles.merge_base(since)
+        except gitfiles.GitError as e:
+            console.print(f"[bold red]❌ Cannot use git for this scan: {e}")
+            sys.exit(1)
+
+    # Use a status spinner for a premium CLI feel
+    with console.status("[bold cyan][Nexus] Scanning project files...", spinner="dots") as status:
+        tasks = []
+        walker = Walker(
+            matcher,
+            follow_symlinks=config.get("follow_symlinks", False),
+            jobs=jobs,
+            on_error=lambda path, e: console.print(f"[bold red]! Error reading {path}: {e}")
+        )
+
+        listing = None
+        with timer.phase("walk"):
+            if use_git:
+                path_filter = gitfiles.PathFilter(matcher, config.get("watch_dirs", ["."]))
+                try:
+                    listed = gitfiles.changed_files(base) if base else gitfiles.tracked_files()
+                    entries = path_filter.entries(listed)
+                    if list_unchanged:
+                        changed = set(listed)
+                        listing = gitfiles.render_listing(path_filter.entries(p for p in gitfiles.tracked_files() if p not in changed))
+                except gitfiles.GitError as e:
+                    console.print(f"[bold red]❌ Cannot use git for this scan: {e}")
+                    sys.exit(1)
+            else:
+                entries = walker.walk(config.get("watch_dirs", ["."]))
+            for entry in entries:
+                translator = config["translators"].get(entry.ext)
+                if translator and translator in REGISTRY:
+                    tasks.append((entry, translator))
+
+        def on_error(entry, e):
+            timer.error(entry, config["translators"].get(entry.ext), e)
+            console.print(f"[bold red]! Error reading {entry.name}: {e}")
+
+        # --- Relevance Ranking ---
+        # --query keeps the best BM25 matches (and their neighbours) from a persistent index of the sections
+        query = getattr(args, 'query', None)
+        ranking, candidates, presets = None, len(tasks), {}
+        if query:
+            from nexus_cli.search import SearchIndex, SearchUnavailable, select_relevant
+            status.update("[bold cyan][Nexus] Updating the search index...")
+            index_pool = HandlerPool(jobs, render_opts, timer.on_render)
+            # Sections rendered for the index are reused below, so no file is looked up or rendered twice
+            def render_stale(stale):
+                for entry, translator, content in render_tasks(stale, index_pool, cache, on_error, render=timer.wrap_handler(render_file)):
+                    presets[entry.path] = content
+                    yield entry, translator, content
+            try:
+                index = timer.wrap(SearchIndex, "search")(salt=handler_salt(handler_opts), rebuild=getattr(args, 'rebuild_cache', False))
+                indexed = timer.wrap(index.update, "search")(tasks, render_stale, complete=base is None)
+                tasks, ranking = timer.wrap(select_relevant, "search")(tasks, index, query, getattr(args, 'top_k', 10), getattr(args, 'neighbors', 1))
+                presets = {e.path: presets[e.path] for e, _ in tasks if e.path in presets}
+                index.close()
+            except SearchUnavailable as e:
+                console.print(f"[bold red]❌ --query needs a search index: {e}")
+                sys.exit(1)
+            finally:
+                index_pool.close()
+            console.print(f"[cyan][Nexus] 🔎 Search index: {indexed:,} of {candidates:,} files (re)indexed.")
+
+        # --- Deduplication ---
+        # Byte-identical files are rendered once; later copies become short references
+        duplicates = {}
+        if getattr(args, 'dedup', False) or config.get("dedup", False):
+            status.update("[bold cyan][Nexus] Hashing duplicate candidates...")
+            content_hash = (lambda e: cache.content_hash(e.path, e.stat())) if cache else (lambda e: file_hash(e.path))
+            duplicates = timer.wrap(find_duplicates, "dedup")(tasks, content_hash)
+            presets.update((e.path, render_reference(e, duplicates[e.path])) for e, _ in tasks if e.path in duplicates)
+        emitted, referenced, section_tokens = set(), [], {}
+
+        # The report is opened only after the walk, so it never scans itself
+        header = f"# NEXUS CONTEXT REPORT: {config.get('project_name')}\n**Generated:** {datetime.now()}\n\n"
+        if base:
+            header = header[:-1] + f"**Changed since:** `{since}` (merge base `{base[:12]}`), {len(tasks):,} files\n\n"
+        if ranking is not None:
+            header = header[:-1] + f"**Query:** `{query}`: {len(ranking):,} best of {candidates:,} files, {len(tasks) - len(ranking):,} neighbours\n\n"
+        writer = shard_writer = shards = None
+        if shard_tokens:
+            shard_writer = ShardWriter(out_path, header, shard_tokens, minify=minify, counter=counter)
+            timer.instrument(shard_writer, "write", "write_section", "close")
+            if listing: shard_writer.write_section(gitfiles.LISTING_NAME, listing)
+        elif jsonl:
+            meta = {"project": config.get('project_name'), "generated": datetime.now().isoformat(timespec="seconds")}
+            writer = JsonlWriter(out_path, header, compression, minify=minify, counter=counter, meta=meta)
+            timer.instrument(writer, "write", "write", "write_section", "flush", "close")
+            if listing: writer.write_section(listing)
+        elif not shard_count:
+            writer = ReportWriter(out_path, minify=minify, counter=counter)
+            timer.instrument(writer, "write", "write", "write_section", "flush", "close")
+            writer.write(header)
+            # Written before any file, so a --max-tokens budget already accounts for it
+            if listing: writer.write_section(listing)
+        # With a token budget or a fixed shard count every section has to be known before any is written
+        sections = [] if max_tokens or shard_count else None
+        if listing and shard_count:
+            sections.append(Section(FileEntry("", gitfiles.LISTING_NAME, gitfiles.LISTING_NAME), "git", listing))
+
+        # Section token counts are cached next to the section, per encoding and minify mode
+        token_key = f"{counter.name}:{minifier.key if minifier else 'raw'}"
+        # Per-file token counts are collected for --token-breakdown and for --stats
+        collect_stats = isinstance(timer, ScanStats)
+        breakdown = [] if getattr(args, 'token_breakdown', None) is not None or collect_stats else None
+
+        def record_tokens(entry, translator):
+            def record(n):
+                if cache: cache.put_tokens(entry.path, token_key, n)
+                if breakdown is not None: breakdown.append((entry.relpath, translator, n))
+                if duplicates: section_tokens[entry.path] = n
+            return record
+
+        # --- Dispatch ---
+        pool = HandlerPool(jobs, render_opts, timer.on_render)
+        try:
+            for entry, translator, content in render_tasks(tasks, pool, cache, on_error, presets, timer.wrap_handler(render_file)):
+                status.update(f"[bold cyan][Nexus] Processing: [white]{entry.name}")
+                timer.file(entry, translator, content, duplicate=entry.path in duplicates)
+                if not content:
+                    continue
+                original = duplicates.get(entry.path)
+                if original is None:
+                    emitted.add(entry.path)
+                elif original.path in emitted:
+                    referenced.append((entry, original))
+                else:
+                    # The original produced no section, so there is nothing to refer to
+                    continue
+                tokens = cache.get_tokens(entry.path, token_key) if cache and original is None else None
+                if minifier:
+                    content = minifier.apply(content, entry.ext)
+                if sections is not None:
+                    sections.append(Section(entry, translator, content, tokens))
+                elif shard_writer:
+                    shard_writer.write_section(entry.relpath, content, tokens, record_tokens(entry, translator), minified=bool(minifier))
+                else:
+                    writer.write_section(content, tokens, record_tokens(entry, translator), minified=bool(minifier), entry=entry, translator=translator)
+
+            if sections is not None:
+                status.update("[bold cyan][Nexus] Balancing shards..." if shard_count else "[bold cyan][Nexus] Packing sections into the token budget...")
+                prepare = minify_text if minify else (lambda text: text)
+                measure = lambda text: counter.measure(prepare(text))
+                missing = [s for s in sections if s.tokens is None]
+                for s, n in zip(missing, counter.measure_batch([prepare(s.content + SECTION_SEPARATOR) for s in missing])):
+                    s.tokens = n
+                    if cache: cache.put_tokens(s.entry.path, token_key, n)
+                if duplicates:
+                    section_tokens.update((s.entry.path, s.tokens) for s in sections)
+
+            if shard_count:
+                shards = timer.wrap(write_shards, "write")(out_path, header, partition_sections(sections, shard_count), minify, counter, minified=bool(minifier))
+                if breakdown is not None:
+                    breakdown.extend((s.entry.relpath, s.translator, s.tokens) for s in sections)
+            elif sections is not None:
+                writer.flush()
+                manifest_rows = getattr(args, 'manifest_rows', None) or config.get("manifest_rows")
+                budget = max_tokens - counter.total - manifest_reserve(sections, measure, max_tokens, manifest_rows)
+                packed = timer.wrap(pack_sections, "pack")(sections, budget, measure, PriorityRules(config.get("priority")))
+                for p in packed:
+                    if p.status != OMITTED:
+                        writer.write_section(p.text, p.tokens, entry=p.section.entry, translator=p.section.translator)
+                    if breakdown is not None:
+                        breakdown.append((p.section.entry.relpath, p.section.translator, p.tokens))
+                writer.write(render_manifest(packed, max_tokens, manifest_rows))
+                dropped = sum(p.status != INCLUDED for p in packed)
+                console.print(f"[cyan][Nexus] 📦 Token budget {max_tokens:,}: {dropped} of {len(packed)} sections truncated or omitted.")
+        finally:
+            pool.close()
+            if writer: writer.close()
+            if shard_writer: shards = shard_writer.close()
     
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(report)
-        
+    if cache:
+        try:
+            # A changed-files or query scan only touches part of the project, so nothing is evicted
+            resources.save_cache(cache, evict=base is None and not query)
+            if base is None and not query:
+                prune_pdf_cache([e.path for e, t in tasks if t == "pdf"])
+        except OSError as e:
+            console.print(f"[bold yellow]⚠️ Failed to save scan cache: {e}")
+        console.print(f"[cyan][Nexus] ♻️  Cache: {cache.hits} hits, {cache.misses} misses.")
+
+    if referenced:
+        saved_bytes = sum(e.stat().st_size for e, _ in referenced)
+        saved_tokens = sum(section_tokens.get(o.path, 0) - section_tokens.get(e.path, 0) for e, o in referenced)
+        token_note = f" and ~{saved_tokens:,} tokens" if counter.available else ""
+        console.print(f"[cyan][Nexus] 🧬 Dedup: {len(referenced)} duplicate files referenced instead of rendered, saving {format_bytes(saved_bytes)}{token_note}.")
+
+    if minifier:
+        console.print("[cyan][Nexus] 🗜️  Report minified:")
+        for mode, sections_n, chars_in, chars_out, saved in minifier.savings():
+            token_note = f", {saved:,} tokens saved" if saved is not None else ""
+            console.print(f"[cyan]    {mode}: {sections_n:,} sections, {format_bytes(chars_in)} → {format_bytes(chars_out)}{token_note}")
+
+    # --- Shard Index ---
+    if shards is not None:
+        out_path = timer.wrap(write_index, "write")(out_path, config.get('project_name'), shards, shard_tokens)
+        oversize = sum(1 for s in shards if shard_tokens and s.tokens > shard_tokens)
+        note = f" ({oversize} hold a single file larger than the limit)" if oversize else ""
+        console.print(f"[cyan][Nexus] 🧩 Report split into {len(shards)} shards{note}.")
+
+    if ranking is not None:
+        print_ranking(ranking)
+
     # --- Token Estimation ---
-    try:
-        enc = tiktoken.get_encoding("cl100k_base")
-        token_count = len(enc.encode(report))
-        token_msg = f" (~{token_count:,} tokens)"
-    except Exception:
-        token_msg = ""
-        
+    token_msg = f" (~{counter.total:,} tokens{', estimated' if counter.name == 'estimate' else ''})" if counter.available else ""
+    if collect_stats:
+        timer.add_tokens(breakdown)
+    if breakdown and getattr(args, 'token_breakdown', None) is not None:
+        print_token_breakdown(breakdown, args.token_breakdown)
     console.print(f"[bold green]✅ Context Snapshot saved to: [white]{out_path}{token_msg}")
 
     # --- Auto-Clipboard ---
     if getattr(args, 'copy', False):
         try:
-            pyperclip.copy(report)
+            import pyperclip
+            if jsonl:
+                # The clipboard gets the markdown the records stand for, never JSON or compressed bytes
+                from nexus_cli.jsonl import markdown_text
+                pyperclip.copy(markdown_text(out_path))
+            else:
+                with open(out_path, "r", encoding="utf-8") as f:
+                    pyperclip.copy(f.read())
             console.print("[bold blue]📋 Output successfully copied to clipboard!")
         except Exception as e:
-            console.print(f"[bold yellow]⚠️ Failed to copy to clipboard: {e}")
\ No newline at end of file
+            console.print(f"[bold yellow]⚠️ Failed to copy to clipboard: {e}")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+dedup.py - Deduplication Module for Nexus CLI
+Finds byte-identical files before rendering, so each distinct content is emitted only once.
+"""
+
+def find_duplicates(tasks, content_hash):
+    """
+    Maps the path of every duplicate (entry, translator) task to the entry of its first
+    occurrence in task order. Only files that share their translator and size with another
+    file are hashed (content_hash(entry) -> digest), so unique files are never read. Empty
+    files are left alone, since a reference would not be any shorter.
+    """
+    by_size = {}
+    for entry, translator in tasks:
+        try:
+            size = entry.stat().st_size
+        except OSError:
+            continue
+        if size:
+            by_size.setdefault((translator, size), []).append(entry)
+
+    duplicates = {}
+    for group in by_size.values():
+        if len(group) < 2:
+            continue
+        first = {}
+        for entry in group:
+            try:
+                digest = content_hash(entry)
+            except OSError:
+                continue
+            original = first.setdefault(digest, entry)
+            if original is not entry:
+                duplicates[entry.path] = original
+    return duplicates
+
+def render_reference(entry, original):
+    """The short section emitted in place of a duplicate file."""
+    return f"### DUPLICATE: {entry.name}\n- Identical to `{original.relpath}` (content omitted)\n"
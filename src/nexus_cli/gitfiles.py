@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+gitfiles.py - Git File List Module for Nexus CLI
+Takes the scan's file list from the local git repository (index, working tree, a base ref)
+instead of walking the file system. Only local git commands are run, never a fetch.
+"""
+
+import os
+import subprocess
+
+from nexus_cli.ignore import normalize_path
+from nexus_cli.walker import FileEntry, dedupe_roots
+
+LISTING_NAME = "(unchanged files)"
+
+class GitError(Exception):
+    pass
+
+def git(*args):
+    """Runs a git command in the current directory and returns its raw stdout."""
+    try:
+        result = subprocess.run(["git", *args], capture_output=True)
+    except FileNotFoundError:
+        raise GitError("git is not installed")
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise GitError(message[-1] if message else f"git {args[0]} failed")
+    return result.stdout
+
+def _paths(output):
+    return [normalize_path(os.fsdecode(p)) for p in output.split(b"\0") if p]
+
+def merge_base(ref):
+    """The commit a branch diverged from `ref` (`ref` itself when HEAD is on or behind it)."""
+    return git("merge-base", ref, "HEAD").decode().strip()
+
+def tracked_files():
+    """Files in the index plus untracked, non-ignored files, relative to the current directory."""
+    return _paths(git("ls-files", "-z", "--cached", "--others", "--exclude-standard"))
+
+def changed_files(base):
+    """
+    Files added or modified since commit `base`: committed, staged and unstaged changes,
+    plus untracked files. Deleted files are left out.
+    """
+    changed = _paths(git("diff", "--name-only", "--relative", "--diff-filter=d", "-z", base, "--"))
+    untracked = _paths(git("ls-files", "-z", "--others", "--exclude-standard"))
+    return sorted(set(changed) | set(untracked))
+
+class PathFilter:
+    """
+    Applies what the walk would to a listed path: it must sit under a watch dir, no directory
+    between the watch dir and the file may be ignored, and the file itself must not be.
+    """
+
+    def __init__(self, matcher, watch_dirs):
+        self.matcher = matcher
+        self.roots = [(d, normalize_path(d)) for d in dedupe_roots(watch_dirs)]
+        self._dirs = {}
+
+    def _root(self, relpath):
+        for i, (directory, root) in enumerate(self.roots):
+            if not root or relpath.startswith(root + "/"):
+                return i, directory, root
+        return None
+
+    def _dir_allowed(self, reldir, root):
+        allowed = self._dirs.get(reldir)
+        if allowed is None:
+            if reldir == root:
+                allowed = True
+            else:
+                parent = reldir.rpartition("/")[0]
+                allowed = self._dir_allowed(parent, root) and not self._match(parent, reldir, True)
+            self._dirs[reldir] = allowed
+        return allowed
+
+    def _match(self, parent, relpath, is_dir=False):
+        if self.matcher is None:
+            return False
+        self.matcher.enter_dir(parent)
+        return self.matcher.match(relpath, is_dir)
+
+    def entries(self, relpaths):
+        """Returns FileEntries for the allowed relpaths that are regular files, in walk order."""
+        keyed = []
+        for relpath in relpaths:
+            found = self._root(relpath)
+            if found is None:
+                continue
+            i, directory, root = found
+            parent, _, name = relpath.rpartition("/")
+            if not self._dir_allowed(parent, root) or self._match(parent, relpath):
+                continue
+            # Built like the walker's paths, so scan cache entries are shared with full scans
+            rest = relpath[len(root) + 1:] if root else relpath
+            path = os.path.join(directory, rest.replace("/", os.sep))
+            if not os.path.isfile(path):
+                continue
+            parts = rest.split("/")
+            keyed.append(((i, tuple((1, d) for d in parts[:-1]) + ((0, name),)), FileEntry(path, relpath, name)))
+        keyed.sort(key=lambda item: item[0])
+        return [entry for _, entry in keyed]
+
+def render_listing(entries):
+    """A compact '### UNCHANGED FILES' section: one line per directory with its file names."""
+    by_dir = {}
+    for entry in entries:
+        by_dir.setdefault(entry.relpath.rpartition("/")[0], []).append(entry.name)
+    lines = [f"### UNCHANGED FILES: {len(entries):,} files not shown"]
+    lines += [f"- `{d or '.'}/`: {', '.join(names)}" for d, names in by_dir.items()]
+    return "\n".join(lines) + "\n"
@@ -1,7 +1,8 @@
 import os
-import pandas as pd
-from PIL import Image
-from pypdf import PdfReader
+import json
+
+# Heavy parsers (pandas, Pillow, pypdf) are imported inside the handlers that need them,
+# so registering the built-ins costs nothing until a matching file is actually scanned.
 
 # This is our central registry
 REGISTRY = {}
@@ -13,38 +14,402 @@ def register_handler(name):
         return func
     return decorator
 
+def render_file(translator, filepath):
+    """Runs the handler registered as `translator`. Module-level so worker processes can unpickle it."""
+    return REGISTRY[translator](filepath)
+
+def timed_render(translator, filepath):
+    """render_file plus the handler's own wall time, measured where it runs. Returns (seconds, content)."""
+    from time import perf_counter
+    start = perf_counter()
+    content = REGISTRY[translator](filepath)
+    return perf_counter() - start, content
+
+# --- Handler Options ---
+# Per-translator settings from the "handlers" block of nexus.json, e.g.
+# "handlers": {"text": {"head": 4000, "tail": 1000}, "code": {"max_lines": 200}}
+HANDLER_OPTIONS = {}
+
+def configure_handlers(options):
+    """Installs the per-translator options. Also used as the initializer of worker processes."""
+    HANDLER_OPTIONS.clear()
+    HANDLER_OPTIONS.update(options or {})
+
+def handler_options(name, **defaults):
+    """Returns the options configured for translator `name`, layered over the given defaults."""
+    return {**defaults, **HANDLER_OPTIONS.get(name, {})}
+
+# Bump whenever a built-in handler's output changes, so sections cached by older releases are dropped
+HANDLER_VERSION = 3
+CUSTOM_HANDLERS = os.path.join(".nexus", "custom_handlers.py")
+
+def handler_salt(options):
+    """
+    Salt for everything derived from rendered sections (scan cache, search index): the handler
+    options, HANDLER_VERSION and the content of the project's custom_handlers.py.
+    """
+    import hashlib
+    try:
+        with open(CUSTOM_HANDLERS, "rb") as f:
+            custom = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        custom = None
+    return json.dumps({"options": options, "handlers": HANDLER_VERSION, "custom": custom}, sort_keys=True)
+
+# --- Bounded Reads ---
+SNIFF_BYTES = 8192
+TEXT_CONTROL = {7, 8, 9, 10, 12, 13, 27}
+
+def is_binary(sample):
+    """Treats a leading sample as binary if it has NUL bytes or is >30% non-text control bytes."""
+    if not sample:
+        return False
+    if b"\0" in sample:
+        return True
+    control = sum(1 for b in sample if (b < 32 and b not in TEXT_CONTROL) or b == 127)
+    return control / len(sample) > 0.3
+
+def _read_head(f, head, max_lines):
+    if not max_lines:
+        return f.read(head) if head else f.read()
+    lines = []
+    remaining = head or -1
+    for _ in range(max_lines):
+        # readline(limit) keeps a single huge line (e.g. a minified bundle) bounded too
+        line = f.readline(remaining)
+        if not line:
+            break
+        lines.append(line)
+        if head:
+            remaining -= len(line)
+            if remaining <= 0:
+                break
+    return "".join(lines)
+
+def read_bounded(filepath, head=None, tail=0, max_lines=None):
+    """
+    Reads at most `head` characters / `max_lines` lines from the start of a file, plus the last
+    `tail` characters when the file is longer than that. Returns (head_text, tail_text), or None
+    when the leading bytes look binary. Nothing past those limits is ever read.
+    """
+    with open(filepath, "rb") as raw:
+        if is_binary(raw.read(SNIFF_BYTES)):
+            return None
+        size = os.fstat(raw.fileno()).st_size
+
+    with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+        head_text = _read_head(f, head, max_lines)
+        truncated = bool(f.read(1))
+
+    tail_text = ""
+    if tail and truncated:
+        # UTF-8 needs at most 4 bytes per character; never re-read what the head already covered
+        start = max(len(head_text.encode("utf-8")), size - tail * 4)
+        with open(filepath, "rb") as raw:
+            raw.seek(start)
+            tail_text = raw.read().decode("utf-8", errors="ignore")[-tail:]
+    return head_text, tail_text
+
+# --- Streaming CSV ---
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_BLOCK_BYTES = 1 << 20
+CSV_MAX_CARRY = 16 << 20
+
+def _sniff_csv(filepath):
+    """Returns (dialect, first_rows, block_chars) from the leading block of a CSV file."""
+    import io, csv
+    with open(filepath, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        block = f.read(CSV_SNIFF_BYTES)
+        if len(block) == CSV_SNIFF_BYTES and "\n" in block:
+            block = block[:block.rindex("\n") + 1]
+    try:
+        dialect = csv.Sniffer().sniff(block, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    rows = [r for r in csv.reader(io.StringIO(block), dialect) if r]
+    return dialect, rows, len(block)
+
+def _count_csv_records(filepath, quotechar):
+    """
+    Counts non-blank records by scanning raw byte buffers. Quoted fields are collapsed with one
+    regex pass per buffer, so embedded newlines are skipped without parsing a single row.
+    """
+    import re
+    quote = quotechar.encode() if quotechar else b""
+    quoted_re = re.compile(re.escape(quote) + b"[^" + re.escape(quote) + b"]*" + re.escape(quote)) if quote else None
+    # Every newline followed by another (CRLF included) ends a blank line; the lookahead lets runs overlap
+    blank_re = re.compile(rb"\n(?=\r?\n)")
+    records, carry, prev_nl = 0, b"", True
+    with open(filepath, "rb") as f:
+        for buf in iter(lambda: f.read(CSV_BLOCK_BYTES), b""):
+            data, carry = carry + buf, b""
+            if quote and quote in data:
+                # An odd quote count means a field runs past this buffer: carry it over whole
+                if data.count(quote) % 2:
+                    cut = data.rindex(quote)
+                    data, carry = data[:cut], data[cut:]
+                    # A stray quote (e.g. a sniffed apostrophe) must not buffer the rest of the file
+                    if len(carry) > CSV_MAX_CARRY:
+                        data, carry = data + carry.replace(quote, b""), b""
+                data = quoted_re.sub(b"_", data)
+            if not data:
+                continue
+            blank = len(blank_re.findall(data)) + (prev_nl and data[:1] in (b"\n", b"\r"))
+            records += data.count(b"\n") - blank
+            prev_nl = data.endswith(b"\n")
+    if carry or not prev_nl:
+        records += 1
+    return records
+
+def _csv_column_stats(filepath, dialect, columns):
+    """Single streaming pass with csv.reader: empty counts and numeric min/max per column."""
+    import csv
+    stats = [{"empty": 0, "min": None, "max": None, "numeric": True} for _ in columns]
+    rows = 0
+    with open(filepath, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        reader = csv.reader(f, dialect)
+        next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            rows += 1
+            for st, value in zip(stats, row):
+                value = value.strip()
+                if not value:
+                    st["empty"] += 1
+                    continue
+                if not st["numeric"]:
+                    continue
+                try:
+                    num = float(value)
+                except ValueError:
+                    st["numeric"] = False
+                    continue
+                st["min"] = num if st["min"] is None else min(st["min"], num)
+                st["max"] = num if st["max"] is None else max(st["max"], num)
+    return rows, stats
+
 @register_handler("csv")
 def handle_csv(filepath):
     try:
-        df = pd.read_csv(filepath)
-        return f"### DATA: {os.path.basename(filepath)}\n- Shape: {df.shape}\n- Columns: {list(df.columns)}\n"
+        opts = handler_options("csv", mode="stream", sample_rows=0, stats=False, rows="exact")
+        if opts["mode"] == "pandas":
+            import pandas as pd
+            df = pd.read_csv(filepath)
+            return f"### DATA: {os.path.basename(filepath)}\n- Shape: {df.shape}\n- Columns: {list(df.columns)}\n"
+
+        dialect, head_rows, block_chars = _sniff_csv(filepath)
+        columns = head_rows[0] if head_rows else []
+        size = os.path.getsize(filepath)
+        if opts["rows"] == "estimate" and block_chars < size:
+            # Extrapolates the leading block's row density; never reads past the first 64 KB
+            rows, stats = f"~{round((len(head_rows) - 1) * size / max(1, block_chars)):,}", None
+        elif opts["stats"]:
+            rows, stats = _csv_column_stats(filepath, dialect, columns)
+        else:
+            rows, stats = max(0, _count_csv_records(filepath, dialect.quotechar) - 1), None
+
+        shape = f"({rows}, {len(columns)})"
+        out = f"### DATA: {os.path.basename(filepath)}\n- Shape: {shape}\n- Columns: {columns}\n"
+        sample = head_rows[1:1 + opts["sample_rows"]]
+        if sample:
+            out += "- Sample:\n"
+            for row in sample:
+                cells = [" ".join(cell.split())[:80] for cell in row]
+                out += f"  | {' | '.join(cells)} |\n"
+        if stats:
+            out += "- Stats:\n"
+            for name, st in zip(columns, stats):
+                kind = f"numeric, min={st['min']:g}, max={st['max']:g}" if st["numeric"] and st["min"] is not None else "text"
+                out += f"  - {name}: {kind}, empty={st['empty']}\n"
+        return out
     except Exception as e: return f"### CSV ERROR: {e}\n"
 
 @register_handler("code")
 def handle_code(filepath):
     try:
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-            return f"### CODE: {os.path.basename(filepath)}\n```\n{f.read()[:3000]}\n...\n```\n"
+        opts = handler_options("code", head=3000, tail=0, max_lines=None)
+        chunk = read_bounded(filepath, opts["head"], opts["tail"], opts["max_lines"])
+        if chunk is None: return ""
+        head, tail = chunk
+        body = f"{head}\n...\n{tail}" if tail else f"{head}\n..."
+        return f"### CODE: {os.path.basename(filepath)}\n```\n{body}\n```\n"
     except: return ""
 
 @register_handler("text")
 def handle_text(filepath):
     try:
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-            return f"### TEXT: {os.path.basename(filepath)}\n{f.read()[:2000]}\n"
+        opts = handler_options("text", head=2000, tail=0, max_lines=None)
+        chunk = read_bounded(filepath, opts["head"], opts["tail"], opts["max_lines"])
+        if chunk is None: return ""
+        head, tail = chunk
+        body = f"{head}\n...\n{tail}" if tail else head
+        return f"### TEXT: {os.path.basename(filepath)}\n{body}\n"
     except: return ""
 
 @register_handler("image")
 def handle_image(filepath):
     try:
+        from PIL import Image
         with Image.open(filepath) as img:
             return f"### IMAGE: {os.path.basename(filepath)}\n- Format: {img.format} | Size: {img.size} | Mode: {img.mode}\n"
     except Exception as e: return f"### IMG ERROR: {e}\n"
 
+# --- PDF ---
+def _parse_page_range(spec, count):
+    """Turns "0", "0-2" or "1,3-4" (0-based, inclusive) into page indexes below count."""
+    pages = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            pages.extend(range(int(lo), int(hi) + 1))
+        else:
+            pages.append(int(part))
+    return [p for p in dict.fromkeys(pages) if 0 <= p < count]
+
+def _pdf_page_count(reader):
+    """Reads /Count from the page tree root instead of flattening every page object."""
+    try:
+        return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+    except Exception:
+        return len(reader.pages)
+
+class PdfPageCache:
+    """
+    Extracted page text for one PDF, stored under .nexus/cache/pdf/<hash of the path>.json with the
+    file's size and mtime; a changed file starts over. `mode` is the pdf "cache_pages" option:
+    False disables the cache, "rebuild" ignores what is stored but writes the fresh pages back.
+    """
+
+    def __init__(self, filepath, mode=True):
+        self.path = None
+        self.pages = {}
+        self.dirty = False
+        if not mode:
+            return
+        st = os.stat(filepath)
+        self.fingerprint = [st.st_size, st.st_mtime_ns]
+        self.path = _pdf_cache_path(filepath)
+        if mode == "rebuild":
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("fingerprint") == self.fingerprint:
+                self.pages = stored["pages"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def get(self, index):
+        return self.pages.get(str(index))
+
+    def put(self, index, text):
+        self.pages[str(index)] = text
+        self.dirty = True
+
+    def save(self):
+        if not (self.path and self.dirty):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint, "pages": self.pages}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+def _pdf_cache_path(filepath):
+    import hashlib
+    from nexus_cli.cache import CACHE_DIR
+    key = hashlib.blake2b(os.path.abspath(filepath).encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, "pdf", key + ".json")
+
+def pdf_cache_policy(options, enabled=True, rebuild=False):
+    """The handler options with the scan's --no-cache / --rebuild-cache applied to the PDF page cache."""
+    pdf = dict(options.get("pdf", {}))
+    if not enabled:
+        pdf["cache_pages"] = False
+    elif rebuild and pdf.get("cache_pages", True):
+        pdf["cache_pages"] = "rebuild"
+    else:
+        return options
+    return {**options, "pdf": pdf}
+
+def prune_pdf_cache(filepaths):
+    """Deletes the cached pages of every PDF not in `filepaths` (the PDFs a full scan just saw)."""
+    keep = {os.path.basename(_pdf_cache_path(p)) for p in filepaths}
+    directory = os.path.dirname(_pdf_cache_path("."))
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        if name not in keep:
+            try: os.remove(os.path.join(directory, name))
+            except OSError: pass
+
+def _call_with_timeout(func, timeout):
+    """
+    Runs func in a daemon thread and waits at most `timeout` seconds. Returns (done, result).
+    A timed-out call is abandoned rather than killed, so one stuck page cannot stall the scan,
+    but it keeps its CPU until it returns: the budget bounds the wait, not the work.
+    """
+    import threading
+    box = {}
+    def target():
+        try: box["result"] = func()
+        except Exception as e: box["error"] = e
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        return False, None
+    if "error" in box:
+        raise box["error"]
+    return True, box.get("result")
+
 @register_handler("pdf")
 def handle_pdf(filepath):
     try:
-        reader = PdfReader(filepath)
-        text = reader.pages[0].extract_text()[:1000] if len(reader.pages) > 0 else "Empty"
-        return f"### PDF: {os.path.basename(filepath)}\n- Pages: {len(reader.pages)}\n- Preview:\n> {text}...\n"
-    except Exception as e: return f"### PDF ERROR: {e}\n"
\ No newline at end of file
+        import time
+        from pypdf import PdfReader
+        opts = handler_options("pdf", pages="0", preview_chars=1000, budget=10.0, metadata=False, cache_pages=True)
+        deadline = time.monotonic() + float(opts["budget"])
+
+        # Construction only parses the trailer and xref table; page content stays untouched
+        done, reader = _call_with_timeout(lambda: PdfReader(filepath), float(opts["budget"]))
+        if not done:
+            return f"### PDF: {os.path.basename(filepath)}\n- Skipped: parsing exceeded the {opts['budget']}s time budget\n"
+        count = _pdf_page_count(reader)
+        out = f"### PDF: {os.path.basename(filepath)}\n- Pages: {count}\n"
+        if opts["metadata"] and reader.metadata:
+            meta = reader.metadata
+            fields = [f"{k}: {v}" for k, v in (("Title", meta.title), ("Author", meta.author)) if v]
+            if fields: out += f"- {' | '.join(fields)}\n"
+
+        if count == 0:
+            return out + "- Preview:\n> Empty...\n"
+
+        cache = PdfPageCache(filepath, opts["cache_pages"])
+        texts, note = [], ""
+        for index in _parse_page_range(opts["pages"], count):
+            if sum(len(t) for t in texts) >= opts["preview_chars"]:
+                break
+            text = cache.get(index)
+            if text is None:
+                remaining = deadline - time.monotonic()
+                done, text = _call_with_timeout(lambda: reader.pages[index].extract_text(), max(0.0, remaining)) if remaining > 0 else (False, None)
+                if not done:
+                    note = f" (stopped at page {index}: {opts['budget']}s time budget exceeded)"
+                    break
+                cache.put(index, text or "")
+            texts.append(text)
+        cache.save()
+
+        preview = "\n".join(texts)[:opts["preview_chars"]]
+        return out + f"- Preview{note}:\n> {preview}...\n"
+    except Exception as e: return f"### PDF ERROR: {e}\n"
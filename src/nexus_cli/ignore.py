@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+ignore.py - Ignore Matcher Module for Nexus CLI
+Compiles ignore patterns (nexus.json and .gitignore files) into a few combined regexes
+with .gitignore semantics, shared by 'nexus scan' and 'nexus init'.
+"""
+
+import os
+import re
+import threading
+
+GITIGNORE = ".gitignore"
+
+def normalize_path(path):
+    """Turns an OS path relative to the project root into the '/'-separated form rules match on."""
+    if os.sep != "/":
+        path = path.replace(os.sep, "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return "" if path == "." else path
+
+def glob_to_regex(glob):
+    """Translates one gitignore-style glob into a regex fragment ('*' never crosses '/')."""
+    out, i, n = [], 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**", i):
+                if glob.startswith("**/", i):
+                    out.append("(?:.*/)?")
+                    i += 3
+                else:
+                    # A trailing '/**' matches everything inside, but not the directory itself
+                    out.append(".+" if i + 2 == n and glob.endswith("/**") else ".*")
+                    i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = glob.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+                continue
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+def compile_rule(pattern, base=""):
+    """
+    Compiles a single pattern into (negate, kind, regex_source), or None for blanks and comments.
+    'name' and 'dir_name' rules match a single path component anywhere in the tree; 'path' and
+    'dir_path' rules match the relative path ('dir_path' ones with a trailing '/' on directories).
+    """
+    pattern = pattern.rstrip("\n")
+    if pattern.endswith(" ") and not pattern.endswith("\\ "):
+        pattern = pattern.rstrip(" ")
+    if not pattern or pattern.startswith("#"):
+        return None
+
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith("\\!") or pattern.startswith("\\#"):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    # A slash anywhere but the end anchors the rule to the directory it was declared in
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    if not anchored and not base and "**" not in pattern:
+        return negate, "dir_name" if dir_only else "name", glob_to_regex(pattern)
+
+    prefix = "^" + (re.escape(base + "/") if base else "")
+    if not anchored:
+        prefix += "(?:.*/)?"
+    # Matching a parent directory component also ignores everything below it
+    suffix = "/" if dir_only else "(?:/|$)"
+    return negate, "dir_path" if dir_only else "path", prefix + glob_to_regex(pattern) + suffix
+
+class _RuleRun:
+    """A run of consecutive rules with the same polarity, merged into at most four regexes."""
+
+    def __init__(self, negate):
+        self.negate = negate
+        self.sources = {"name": [], "dir_name": [], "path": [], "dir_path": []}
+
+    def compile(self):
+        def build(kind):
+            return re.compile("|".join(f"(?:{src})" for src in self.sources[kind])) if self.sources[kind] else None
+        self.name_re = build("name")
+        self.dir_name_re = build("dir_name")
+        self.path_re = build("path")
+        self.dir_path_re = build("dir_path")
+        # Directory components repeat across thousands of paths, so their verdicts are memoized
+        self._dir_cache = {}
+
+    def _dir_component(self, part):
+        hit = self._dir_cache.get(part)
+        if hit is None:
+            hit = bool((self.name_re and self.name_re.fullmatch(part)) or
+                       (self.dir_name_re and self.dir_name_re.fullmatch(part)))
+            self._dir_cache[part] = hit
+        return hit
+
+    def match(self, relpath, is_dir):
+        if self.name_re or self.dir_name_re:
+            parts = relpath.split("/")
+            last = parts.pop()
+            for part in parts:
+                if self._dir_component(part):
+                    return True
+            if is_dir:
+                if self._dir_component(last):
+                    return True
+            elif self.name_re and self.name_re.fullmatch(last):
+                return True
+        if self.path_re and self.path_re.match(relpath):
+            return True
+        if self.dir_path_re:
+            return self.dir_path_re.match(relpath + "/" if is_dir else relpath) is not None
+        return False
+
+class IgnoreMatcher:
+    """
+    An ordered rule set where the last matching rule wins, as in .gitignore.
+    Consecutive rules of the same polarity are merged, so a match costs a few regex calls per
+    polarity run instead of one test per pattern.
+    """
+
+    def __init__(self, patterns=(), base=""):
+        self._rules = []
+        self._runs = None
+        # Rules can be added by one walker thread while others are matching
+        self._lock = threading.Lock()
+        self.add_patterns(patterns, base)
+
+    def __len__(self):
+        return len(self._rules)
+
+    def add_patterns(self, patterns, base=""):
+        base = normalize_path(base).rstrip("/")
+        rules = [r for r in (compile_rule(p, base) for p in patterns) if r]
+        if rules:
+            with self._lock:
+                self._rules.extend(rules)
+                self._runs = None
+
+    def add_ignore_file(self, path, base=""):
+        """Loads rules from a .gitignore-style file, relative to base. Missing files are skipped."""
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                self.add_patterns(f.read().splitlines(), base)
+        except OSError:
+            pass
+
+    def _compile(self):
+        with self._lock:
+            if self._runs is None:
+                self._runs = self._build_runs()
+        return self._runs
+
+    def _build_runs(self):
+        runs = []
+        for negate, kind, source in self._rules:
+            if not runs or runs[-1].negate != negate:
+                runs.append(_RuleRun(negate))
+            runs[-1].sources[kind].append(source)
+        for run in runs:
+            run.compile()
+        # Evaluated newest-first: the first run that matches decides
+        return runs[::-1]
+
+    def decide(self, relpath, is_dir=False):
+        """True (ignored) or False (re-included) from the last matching rule, or None if none matches."""
+        runs = self._runs
+        if runs is None:
+            runs = self._compile()
+        for run in runs:
+            if run.match(relpath, is_dir):
+                return not run.negate
+        return None
+
+    def match(self, relpath, is_dir=False):
+        """Returns True if the normalized relative path is ignored."""
+        return self.decide(relpath, is_dir) is True
+
+# nexus.json files without this marker predate .gitignore semantics (patterns were substrings)
+IGNORE_SYNTAX = "gitignore"
+GLOB_CHARS = set("*?[")
+
+def translate_legacy_patterns(patterns):
+    """
+    Rewrites the substring patterns of a pre-.gitignore nexus.json so they keep matching what
+    they used to: 'name' matched any path containing it, so it becomes '*name*' (and
+    'a/b' becomes '**/*a/b*'). Globs and negations already mean the same thing and are kept.
+    Returns (patterns, {old: new} for the rewritten ones).
+    """
+    out, changed = [], {}
+    for pattern in patterns:
+        if not pattern or pattern.startswith(("!", "#")) or GLOB_CHARS & set(pattern):
+            out.append(pattern)
+            continue
+        body = pattern.strip("/")
+        new = f"**/*{body}*" if "/" in body else f"*{body}*"
+        out.append(new)
+        changed[pattern] = new
+    return out, changed
+
+class ProjectIgnore:
+    """
+    Combines the nexus.json patterns with optional .gitignore rules.
+    A path is ignored if either layer ignores it; .gitignore files are picked up as the
+    walk enters each directory, so nested files apply only below their own directory.
+    Each .gitignore gets its own matcher, compiled once: loading one never recompiles the others.
+    """
+
+    def __init__(self, patterns, use_gitignore=False, root="."):
+        self.root = root
+        self.patterns = IgnoreMatcher(patterns)
+        self.use_gitignore = use_gitignore
+        # {reldir: IgnoreMatcher} for every loaded .gitignore that has rules
+        self.gitignores = {}
+        self.exclude = IgnoreMatcher()
+        self._visited = set()
+        self._lock = threading.Lock()
+        if use_gitignore:
+            self.exclude.add_ignore_file(os.path.join(root, ".git", "info", "exclude"))
+
+    @classmethod
+    def from_config(cls, config, extra=()):
+        return cls(list(config.get("ignore_patterns", [])) + list(extra), config.get("use_gitignore", False))
+
+    def enter_dir(self, reldir, has_gitignore=None):
+        """Loads reldir/.gitignore (and those of unvisited ancestors) before its children are filtered."""
+        if not self.use_gitignore:
+            return
+        reldir = normalize_path(reldir).rstrip("/")
+        parts = reldir.split("/") if reldir else []
+        for depth in range(len(parts) + 1):
+            current = "/".join(parts[:depth])
+            with self._lock:
+                if current in self._visited:
+                    continue
+                self._visited.add(current)
+            if depth == len(parts) and has_gitignore is False:
+                continue
+            rules = IgnoreMatcher()
+            rules.add_ignore_file(os.path.join(self.root, current, GITIGNORE), current)
+            if len(rules):
+                self.gitignores[current] = rules
+
+    def match(self, relpath, is_dir=False):
+        if self.patterns.match(relpath, is_dir):
+            return True
+        if not self.use_gitignore:
+            return False
+        # The deepest .gitignore with a matching rule decides, then .git/info/exclude
+        parts = relpath.split("/")[:-1]
+        for depth in range(len(parts), -1, -1):
+            rules = self.gitignores.get("/".join(parts[:depth]))
+            if rules is not None:
+                verdict = rules.decide(relpath, is_dir)
+                if verdict is not None:
+                    return verdict
+        return self.exclude.match(relpath, is_dir)
+
+    def is_ignored(self, path, is_dir=False):
+        """Convenience wrapper taking an OS path relative to the project root."""
+        return self.match(normalize_path(path), is_dir)
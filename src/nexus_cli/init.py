@@ -5,8 +5,16 @@ Auto-generates the nexus.json configuration file.
 """
 import os
 import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 
+from nexus_cli.cache import CACHE_DIR
+from nexus_cli.ignore import ProjectIgnore, normalize_path, IGNORE_SYNTAX
+from nexus_cli.report import format_bytes
+from nexus_cli.walker import Walker
+
 # --- CONSTANTS & COLORS ---
 class C:
     GREEN = '\033[92m'
@@ -18,8 +26,8 @@ class C:
 # --- NEW IGNORE PATTERNS ADDED HERE ---
 DEFAULT_IGNORE = [
     ".git", "venv", "__pycache__", "node_modules", 
-    "site-packages", ".egg-info", "nexus_tool", "test_output",
-    "context_*.md", "nexus_report_*.md" 
+    "site-packages", "*.egg-info", "nexus_tool", "test_output",
+    "context_*.md", "context_*.jsonl*", "nexus_report_*.md" 
 ]
 
 EXT_GUESSER = {
@@ -29,6 +37,126 @@ EXT_GUESSER = {
     "png": "image", "jpg": "image", "jpeg": "image", "gif": "image", "pdf": "pdf"
 }
 
+# --- Extension Census ---
+CENSUS_JOBS = min(8, os.cpu_count() or 1)
+CENSUS_FILE = os.path.join(CACHE_DIR, "census.json")
+
+# Above these sizes the generated nexus.json switches a translator to its cheap mode
+HUGE_FILE = 100 << 20
+HEAVY_TOTAL = 1 << 30
+MANY_PDFS = 1000
+CHEAP_HANDLERS = {
+    "csv": {"rows": "estimate"},
+    "pdf": {"pages": "0", "preview_chars": 500, "budget": 2},
+}
+
+class ExtensionStats:
+    __slots__ = ("files", "bytes", "largest")
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.largest = 0
+
+def take_census(matcher, jobs=CENSUS_JOBS, budget=None, stable_after=None):
+    """
+    Counts files and bytes per extension with a breadth-first walk: each directory is listed
+    (and its files stat'ed for their size) as one task, with jobs > 1 on worker threads, so
+    every top-level directory is reached early and the walk can stop on a time `budget`
+    (seconds) or once `stable_after` files in a row brought no new extension.
+    Returns (stats_by_ext, files_seen, complete).
+    """
+    walker = Walker(matcher)
+
+    def visit(path):
+        files, dirs = walker.list_dir(path)
+        tally = {}
+        for entry in files:
+            name = entry.name
+            if name[0] == "." or "." not in name:
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            ext = name[name.rindex(".") + 1:].lower()
+            stats = tally.get(ext)
+            if stats is None:
+                stats = tally[ext] = ExtensionStats()
+            stats.files += 1
+            stats.bytes += size
+            if size > stats.largest:
+                stats.largest = size
+        return tally, dirs
+
+    def visits(frontier):
+        if jobs <= 1:
+            while frontier:
+                yield visit(frontier.popleft())
+            return
+        running = set()
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            try:
+                while frontier or running:
+                    while frontier and len(running) < jobs * 4:
+                        running.add(pool.submit(visit, frontier.popleft()))
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                for future in running:
+                    future.cancel()
+
+    census, seen, since_new = {}, 0, 0
+    deadline = time.monotonic() + budget if budget else None
+    frontier = deque(["."])
+    for tally, dirs in visits(frontier):
+        frontier.extend(dirs)
+        for ext, part in tally.items():
+            stats = census.get(ext)
+            if stats is None:
+                census[ext] = part
+                since_new = 0
+                continue
+            stats.files += part.files
+            stats.bytes += part.bytes
+            stats.largest = max(stats.largest, part.largest)
+            since_new += part.files
+        seen += sum(part.files for part in tally.values())
+        if (deadline and time.monotonic() > deadline) or (stable_after and since_new >= stable_after):
+            return census, seen, False
+    return census, seen, True
+
+def cheap_handler_defaults(census, translators):
+    """Picks cheap handler modes for translators whose files are huge or numerous."""
+    totals = {}
+    for ext, translator in translators.items():
+        stats = census.get(ext)
+        if stats is None or translator not in CHEAP_HANDLERS:
+            continue
+        files, size, largest = totals.get(translator, (0, 0, 0))
+        totals[translator] = (files + stats.files, size + stats.bytes, max(largest, stats.largest))
+
+    handlers = {}
+    for translator, (files, size, largest) in totals.items():
+        if largest >= HUGE_FILE or size >= HEAVY_TOTAL or (translator == "pdf" and files >= MANY_PDFS):
+            handlers[translator] = dict(CHEAP_HANDLERS[translator])
+    return handlers
+
+def save_census(census, seen, complete, seconds):
+    """Keeps the census next to the scan cache (never part of a report)."""
+    data = {
+        "files": seen, "complete": complete, "seconds": round(seconds, 3),
+        "extensions": {ext: {"files": s.files, "bytes": s.bytes, "largest": s.largest}
+                       for ext, s in sorted(census.items(), key=lambda kv: -kv[1].bytes)},
+    }
+    try:
+        os.makedirs(os.path.dirname(CENSUS_FILE), exist_ok=True)
+        with open(CENSUS_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    except OSError:
+        pass
+
 def run_init(args):
     print(f"{C.CYAN}🚀 Initializing Nexus Project...{C.RESET}")
     
@@ -44,16 +172,18 @@ def run_init(args):
         project_name = input(f"📦 Project name ({default_name}): ").strip() or default_name
 
     print("\n🔍 Scanning current directory for file types...")
-    found_exts = set()
-    
-    for root, dirs, files in os.walk("."):
-        dirs[:] = [d for d in dirs if not any(ig in d for ig in DEFAULT_IGNORE)]
-        for file in files:
-            if "." in file and not file.startswith("."):
-                ext = file.rsplit(".", 1)[-1].lower()
-                found_exts.add(ext)
-                
-    found_exts = sorted(list(found_exts))
+    matcher = ProjectIgnore(DEFAULT_IGNORE + [f"/{normalize_path(CACHE_DIR)}/"], use_gitignore=True)
+    started = time.monotonic()
+    census, seen, complete = take_census(
+        matcher, getattr(args, 'jobs', None) or CENSUS_JOBS, getattr(args, 'budget', None), getattr(args, 'sample', None)
+    )
+    save_census(census, seen, complete, time.monotonic() - started)
+    note = "" if complete else f" {C.YELLOW}(sampled: stopped early){C.RESET}"
+    print(f"   {seen:,} files in {time.monotonic() - started:.2f}s{note}")
+    for ext, stats in sorted(census.items(), key=lambda kv: -kv[1].bytes)[:12]:
+        print(f"   .{ext}: {stats.files:,} files, {format_bytes(stats.bytes)}")
+
+    found_exts = sorted(census)
     
     if not found_exts:
         print(f"{C.YELLOW}No files found. Using default extension tracking.{C.RESET}")
@@ -78,8 +208,14 @@ def run_init(args):
         "project_name": project_name,
         "watch_dirs": ["."],
         "ignore_patterns": DEFAULT_IGNORE,
+        "ignore_syntax": IGNORE_SYNTAX,
+        "use_gitignore": True,
         "translators": translators
     }
+    handlers = cheap_handler_defaults(census, translators)
+    if handlers:
+        config["handlers"] = handlers
+        print(f"\n{C.YELLOW}💡 Large {', '.join(sorted(handlers))} files found: using cheap handler modes (see \"handlers\" in nexus.json).{C.RESET}")
     
     with open("nexus.json", "w", encoding="utf-8") as f:
         json.dump(config, f, indent=4)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+jsonl.py - JSONL Output Module for Nexus CLI
+Writes the report as one JSON record per file (path, translator, size, mtime, tokens, content)
+plus a sidecar offset index for random access, optionally compressed, and renders the markdown
+report back from it without running any handler (`nexus render`).
+"""
+
+import os
+import sys
+import json
+
+from rich.console import Console
+
+from nexus_cli.report import ReportWriter, minify_text, SECTION_SEPARATOR
+
+FORMAT_VERSION = 1
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+# Compressed records are grouped into frames of about this many bytes; a lookup decompresses one frame
+FRAME_SIZE = 64 * 1024
+
+console = Console()
+
+class CompressionUnavailable(Exception):
+    pass
+
+def codec(compression):
+    """Returns (compress, decompress) for a compression name; each handles one complete frame."""
+    if compression == "gzip":
+        import gzip
+        return (lambda data: gzip.compress(data, compresslevel=6, mtime=0)), gzip.decompress
+    if compression == "zstd":
+        try:
+            from compression import zstd  # Python 3.14+
+            return zstd.compress, zstd.decompress
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise CompressionUnavailable("zstd compression needs Python 3.14+ or the zstandard package (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+    raise CompressionUnavailable(f"unknown compression '{compression}'")
+
+def compression_for(path):
+    """The compression implied by a file name's suffix (.gz, .zst), or None."""
+    for compression, suffix in SUFFIXES.items():
+        if path.endswith(suffix):
+            return compression
+    return None
+
+def index_path(path):
+    return path + ".idx"
+
+def markdown_path(path):
+    """context_x.jsonl.gz -> context_x.md"""
+    suffix = SUFFIXES.get(compression_for(path), "")
+    base = path[:len(path) - len(suffix)]
+    return (base[:-6] if base.endswith(".jsonl") else base) + ".md"
+
+class JsonlWriter:
+    """
+    Streams report records as JSON lines, settling token counts in batches like ReportWriter.
+    The byte range of every file record goes into the sidecar index. With compression, lines
+    are grouped into frames of about FRAME_SIZE bytes, each a complete gzip member or zstd
+    frame: the file still decompresses as one stream, and the index points at a frame plus
+    the record's offset inside it.
+    """
+
+    def __init__(self, out_path, header, compression=None, minify=False, counter=None, meta=None, batch_size=64):
+        self.out_path = out_path
+        self.compression = compression
+        self.minify = minify
+        self.counter = counter
+        self.batch_size = batch_size
+        self.compress = codec(compression)[0] if compression else None
+        self.sections = 0
+        self.records = 0
+        self.files = {}
+        self.frames = [] if compression else None
+        self.header = {"kind": "header", "version": FORMAT_VERSION, "minified": minify, **(meta or {})}
+        self._pending = []
+        self._frame = bytearray()
+        self._pos = 0
+        self._f = open(out_path, "wb")
+        self.write(header, kind="header")
+
+    def _queue(self, record, text, measured, tokens, on_tokens):
+        record["tokens"] = tokens
+        record["content"] = text
+        self._pending.append((record, measured, tokens, on_tokens))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def write(self, text, tokens=None, on_tokens=None, minified=False, kind="text"):
+        """Queues report text outside any file section (the header, a manifest)."""
+        if self.minify and not minified:
+            text = minify_text(text)
+        if text:
+            # The header record gets its own copy: self.header (kept in the index) holds metadata only
+            record = dict(self.header) if kind == "header" else {"kind": kind}
+            self._queue(record, text, text, tokens, on_tokens)
+
+    def write_section(self, content, tokens=None, on_tokens=None, minified=False, entry=None, translator=None):
+        """Queues one section; with `entry` it becomes an indexed file record."""
+        if self.minify and not minified:
+            content = minify_text(content)
+        if entry is None:
+            record = {"kind": "section"}
+        else:
+            st = entry.stat()
+            record = {"kind": "file", "path": entry.relpath, "translator": translator, "size": st.st_size, "mtime": st.st_mtime}
+        self._queue(record, content, content + SECTION_SEPARATOR, tokens, on_tokens)
+        self.sections += 1
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        counts = [n for _, _, n, _ in pending]
+        if self.counter is not None and self.counter.available:
+            missing = [i for i, n in enumerate(counts) if n is None]
+            for i, n in zip(missing, self.counter.measure_batch([pending[i][1] for i in missing])):
+                counts[i] = n
+        for (record, _, _, on_tokens), n in zip(pending, counts):
+            if self.counter is not None and n is not None:
+                record["tokens"] = n
+                self.counter.total += n
+                if on_tokens: on_tokens(n)
+            self._emit(record)
+
+    def _emit(self, record):
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        path = record.get("path")
+        if self.compress is None:
+            if path is not None: self.files[path] = [self._pos, len(line)]
+            self._f.write(line)
+            self._pos += len(line)
+        else:
+            if path is not None: self.files[path] = [len(self.frames), len(self._frame), len(line)]
+            self._frame += line
+            if len(self._frame) >= FRAME_SIZE:
+                self._end_frame()
+        self.records += 1
+
+    def _end_frame(self):
+        if self._frame:
+            data = self.compress(bytes(self._frame))
+            self.frames.append([self._pos, len(data)])
+            self._f.write(data)
+            self._pos += len(data)
+            self._frame.clear()
+
+    def close(self):
+        try:
+            self.flush()
+            if self.compress is not None:
+                self._end_frame()
+        finally:
+            self._f.close()
+        index = {"version": FORMAT_VERSION, "compression": self.compression, "records": self.records,
+                 "header": self.header, "frames": self.frames, "files": self.files}
+        with open(index_path(self.out_path), "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class JsonlReader:
+    """
+    Reads a JSONL report. read(relpath) seeks straight to one file's record through the sidecar
+    index (decompressing a single frame); iterating streams every record in order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(index_path(path), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        compression = self.index["compression"]
+        self.decompress = codec(compression)[1] if compression else None
+        self.header = self.index["header"]
+        self._f = open(path, "rb")
+        self._cached = (None, None)
+
+    def __len__(self):
+        return len(self.index["files"])
+
+    def __contains__(self, relpath):
+        return relpath in self.index["files"]
+
+    def paths(self):
+        return list(self.index["files"])
+
+    def _read_frame(self, n):
+        if self._cached[0] != n:
+            offset, size = self.index["frames"][n]
+            self._f.seek(offset)
+            self._cached = (n, self.decompress(self._f.read(size)))
+        return self._cached[1]
+
+    def read(self, relpath):
+        """Returns the record of one file (KeyError if the report does not hold it)."""
+        location = self.index["files"][relpath]
+        if self.decompress is None:
+            offset, length = location
+            self._f.seek(offset)
+            line = self._f.read(length)
+        else:
+            frame, offset, length = location
+            line = self._read_frame(frame)[offset:offset + length]
+        return json.loads(line)
+
+    def __iter__(self):
+        if self.decompress is None:
+            self._f.seek(0)
+            for line in self._f:
+                yield json.loads(line)
+        else:
+            for n in range(len(self.index["frames"])):
+                for line in self._read_frame(n).splitlines():
+                    yield json.loads(line)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def render_markdown(path, out_path, paths=None):
+    """
+    Writes the markdown report a scan would have written from a JSONL report. With `paths`,
+    only those files' sections follow the header. Returns (sections, tokens or None).
+    """
+    with JsonlReader(path) as reader:
+        for relpath in paths or ():
+            if relpath not in reader:
+                raise KeyError(relpath)
+        # The header record is always the report's first line
+        records = iter(reader) if paths is None else [next(iter(reader))] + [reader.read(p) for p in paths]
+        tokens = 0
+        minified = reader.header.get("minified", False)
+        with ReportWriter(out_path, minify=minified) as writer:
+            for record in records:
+                # Stored text is already minified; only the blank-line fix at section boundaries is redone
+                if record["kind"] in ("file", "section"):
+                    writer.write_section(record["content"], minified=minified)
+                else:
+                    writer.write(record["content"], minified=minified)
+                tokens = None if tokens is None or record.get("tokens") is None else tokens + record["tokens"]
+    return writer.sections, tokens
+
+def markdown_text(path):
+    """The markdown report of a JSONL report as a string (what `--copy` puts on the clipboard)."""
+    import tempfile
+    fd, md_path = tempfile.mkstemp(suffix=".md")
+    os.close(fd)
+    try:
+        render_markdown(path, md_path)
+        with open(md_path, "r", encoding="utf-8") as f:
+            return f.read()
+    finally:
+        os.remove(md_path)
+
+def run_render(args):
+    """Entry point for the 'nexus render' subcommand."""
+    out_path = args.output or markdown_path(args.input)
+    try:
+        sections, tokens = render_markdown(args.input, out_path, args.path)
+    except KeyError as e:
+        console.print(f"[bold red]❌ {e.args[0]} is not in {args.input}")
+        sys.exit(1)
+    except (OSError, ValueError, CompressionUnavailable) as e:
+        console.print(f"[bold red]❌ Cannot render {args.input}: {e}")
+        sys.exit(1)
+    token_msg = f", ~{tokens:,} tokens" if tokens is not None else ""
+    console.print(f"[bold green]✅ Markdown report saved to: [white]{out_path}[/white] ({sections:,} sections{token_msg})")
@@ -1,12 +1,8 @@
 #!/usr/bin/env python3
+import sys
 import argparse
 from pathlib import Path
 
-# Import our subcommands
-from nexus_cli.context import run_scan
-from nexus_cli.scaffolding import run_scaffold
-from nexus_cli.init import run_init
-
 def main():
     parser = argparse.ArgumentParser(
         prog="nexus", 
@@ -19,31 +15,124 @@ def main():
     parser_init = subparsers.add_parser("init", help="Initialize Nexus project and generate nexus.json")
     parser_init.add_argument("-f", "--force", action="store_true", help="Overwrite existing nexus.json")
     parser_init.add_argument("-y", "--yes", action="store_true", help="Auto-accept all found extensions")
+    parser_init.add_argument("-j", "--jobs", type=int, help="Directories listed in parallel during the extension census (default: CPU count, at most 8)")
+    parser_init.add_argument("--budget", type=float, metavar="SECONDS", help="Stop the extension census after this many seconds")
+    parser_init.add_argument("--sample", type=int, nargs="?", const=2000, metavar="N", help="Stop the census once N files in a row bring no new extension (default 2000)")
 
     # --- Subcommand: SCAN ---
     parser_scan = subparsers.add_parser("scan", help="Generate context report for LLMs")
     parser_scan.add_argument("-o", "--output", help="Output filename (default: dynamic timestamp)")
     parser_scan.add_argument("-c", "--copy", action="store_true", help="Copy the generated context to clipboard")
     parser_scan.add_argument("-m", "--minify", action="store_true", help="Minify output to save tokens (strips extra newlines/spaces)")
+    parser_scan.add_argument("--format", choices=["md", "jsonl"], default="md", help="Report format: one markdown file, or one JSON record per file plus a sidecar offset index (default md)")
+    parser_scan.add_argument("--compress", choices=["gzip", "zstd"], help="With --format jsonl, compress records in independently seekable frames (default: from the -o suffix .gz/.zst)")
+    parser_scan.add_argument("--max-tokens", type=int, help="Pack the report into N tokens, degrading low-priority files to headers before omitting them")
+    parser_scan.add_argument("--manifest-rows", type=int, metavar="N", help="With --max-tokens, cap the manifest at N rows, grouping truncated and omitted files per directory (default: every file)")
+    shard_group = parser_scan.add_mutually_exclusive_group()
+    shard_group.add_argument("--shard-tokens", type=int, metavar="N", help="Split the report into shards of at most N tokens, streamed as files complete, plus an index")
+    shard_group.add_argument("--shards", type=int, metavar="K", help="Split the report into K token-balanced shards, plus an index")
+    parser_scan.add_argument("--token-estimate", choices=["exact", "fast"], help="Token counting: exact BPE encoding, or a fast per-section character estimate (default: nexus.json \"tokenizer\" or exact)")
+    parser_scan.add_argument("--token-breakdown", type=int, nargs="?", const=20, metavar="N", help="Print token totals per translator and the top N files (default 20, 0 = all)")
+    parser_scan.add_argument("--stats", type=int, nargs="?", const=10, metavar="N", help="Print time per scan phase and translator, and the N slowest files (default 10, 0 = all)")
+    parser_scan.add_argument("--stats-json", metavar="FILE", help="Write per-phase, per-translator and per-file scan statistics as JSON")
+    parser_scan.add_argument("--profile", metavar="FILE", help="Run the scan under cProfile, print the top functions and save the profile to FILE")
+    git_group = parser_scan.add_mutually_exclusive_group()
+    git_group.add_argument("--since", nargs="?", const="HEAD", metavar="REF", help="Only scan files changed since the merge base with REF (default HEAD: uncommitted changes), plus untracked files; uses the local git repository")
+    git_group.add_argument("--git", action="store_true", help="Take the file list from git (tracked and untracked, non-ignored files) instead of walking the tree")
+    parser_scan.add_argument("--list-unchanged", action="store_true", help="With --since, add a compact listing of the other files for context")
+    parser_scan.add_argument("--query", metavar="TEXT", help="Only include the files most relevant to TEXT (BM25 over a persistent index in .nexus/cache)")
+    parser_scan.add_argument("--top-k", type=int, default=10, metavar="N", help="With --query, keep the N best matches (default 10)")
+    parser_scan.add_argument("--neighbors", type=int, default=1, metavar="N", help="With --query, also keep up to N files on each side of a match in its directory (default 1)")
+    parser_scan.add_argument("--dedup", action="store_true", help="Render byte-identical files once and reference the first copy elsewhere")
+    parser_scan.add_argument("-j", "--jobs", type=int, default=1, help="Run handlers in parallel with N workers (processes for csv/pdf, threads otherwise)")
+    parser_scan.add_argument("--no-cache", action="store_true", help="Ignore and do not update the .nexus scan cache")
+    parser_scan.add_argument("--rebuild-cache", action="store_true", help="Discard the .nexus scan cache and rebuild it from scratch")
+    parser_scan.add_argument("--no-daemon", action="store_true", help="Scan in this process even when a 'nexus serve' daemon is running")
+
+    # --- Subcommand: WATCH ---
+    parser_watch = subparsers.add_parser("watch", help="Keep a context report up to date as files change")
+    parser_watch.add_argument("-o", "--output", help="Output filename (default: context_watch.md)")
+    parser_watch.add_argument("-c", "--copy", action="store_true", help="Copy the report to clipboard after every update")
+    parser_watch.add_argument("-m", "--minify", action="store_true", help="Minify output to save tokens (strips extra newlines/spaces)")
+    parser_watch.add_argument("--token-estimate", choices=["exact", "fast"], help="Token counting: exact BPE encoding, or a fast per-section character estimate")
+    parser_watch.add_argument("-j", "--jobs", type=int, default=1, help="Run handlers in parallel with N workers")
+    parser_watch.add_argument("--debounce", type=float, default=0.2, help="Seconds of quiet to wait for before updating (default 0.2)")
+    parser_watch.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify")
+    parser_watch.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds (default 1.0)")
+    parser_watch.add_argument("--no-cache", action="store_true", help="Ignore and do not update the .nexus scan cache")
+
+    # --- Subcommand: SERVE ---
+    parser_serve = subparsers.add_parser("serve", help="Keep a warm daemon that answers scans, token counts and renders")
+    parser_serve.add_argument("--port", type=int, help="Listen on localhost TCP (0 = any free port) instead of .nexus/serve.sock")
+    parser_serve.add_argument("--idle-timeout", type=float, metavar="SECONDS", help="Exit after this many seconds without requests")
+    serve_control = parser_serve.add_mutually_exclusive_group()
+    serve_control.add_argument("--stop", action="store_true", help="Stop the daemon serving this project")
+    serve_control.add_argument("--status", action="store_true", help="Show whether a daemon serves this project")
+
+    # --- Subcommand: RENDER ---
+    parser_render = subparsers.add_parser("render", help="Render the markdown report from a --format jsonl report, without re-running handlers")
+    parser_render.add_argument("input", help="JSONL report (its .idx sidecar must sit next to it)")
+    parser_render.add_argument("-o", "--output", help="Markdown file (default: the input name with .md)")
+    parser_render.add_argument("-p", "--path", action="append", metavar="RELPATH", help="Only render this file's section, read through the index (repeatable)")
 
     # --- Subcommand: SCAFFOLD ---
     parser_scaf = subparsers.add_parser("scaffold", help="Generate directory structure from ASCII tree")
-    parser_scaf.add_argument("-f", "--file", type=Path, help="Path to ASCII tree text file")
-    parser_scaf.add_argument("-o", "--out", type=Path, default=Path.cwd(), help="Output destination directory")
+    scaf_source = parser_scaf.add_mutually_exclusive_group()
+    scaf_source.add_argument("-f", "--file", type=Path, help="Path to ASCII tree text file")
+    scaf_source.add_argument("--from-plan", type=Path, metavar="PLAN_JSON", help="Replay a plan saved with --json instead of parsing a tree")
+    parser_scaf.add_argument("-o", "--out", type=Path, help="Output destination directory (default: current directory; with --from-plan, the plan's own paths)")
     parser_scaf.add_argument("-y", "--yes", action="store_true", help="Automatically accept all confirmations")
     parser_scaf.add_argument("--json", action="store_true", help="Automatically export plan as JSON")
     parser_scaf.add_argument("--dry-run", action="store_true", help="Display the plan and exit without creating anything")
     parser_scaf.add_argument("--no-boilerplate", action="store_true", help="Create files completely empty")
 
+    # --- Subcommand: BENCH ---
+    parser_bench = subparsers.add_parser("bench", help="Benchmark scaffold, init and scan phases on a synthetic project")
+    parser_bench.add_argument("--size", choices=["tiny", "small", "medium", "large"], default="small", help="Corpus preset (default: small)")
+    parser_bench.add_argument("--mix", metavar="KIND=N,...", help="Override file counts per kind: py, log, csv, pdf, png (e.g. py=20000,pdf=0)")
+    parser_bench.add_argument("--seed", type=int, default=0, help="Random seed for the generated content (default 0)")
+    parser_bench.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the median is reported (default 3)")
+    parser_bench.add_argument("-j", "--jobs", type=int, default=1, help="Scan workers (phase times are exact only with 1)")
+    parser_bench.add_argument("-m", "--minify", action="store_true", help="Scan with -m and python minify mode for .py files")
+    parser_bench.add_argument("--token-estimate", choices=["exact", "fast"], help="Token counting mode for the scans")
+    parser_bench.add_argument("--bpe-file", help="Local tiktoken BPE file for the generated project's tokenizer block")
+    parser_bench.add_argument("--dir", help="Generate projects here and keep them (default: a temporary directory)")
+    parser_bench.add_argument("-o", "--output", help="JSON results file (default: bench_<timestamp>.json)")
+    parser_bench.add_argument("--baseline", help="Previous results JSON; exit with status 1 if a metric regressed")
+    parser_bench.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs. the baseline as a fraction (default 0.25)")
+    parser_bench.add_argument("--min-delta", type=float, default=0.05, help="Ignore slowdowns smaller than this many seconds (default 0.05)")
+
     # Parse and Dispatch
     args = parser.parse_args()
     
+    # Subcommands are imported on demand so each one only pays for its own dependencies
     if args.command == "init":
+        from nexus_cli.init import run_init
         run_init(args)
     elif args.command == "scan":
-        run_scan(args)
+        # A running 'nexus serve' daemon answers without paying for imports, tokenizer or config
+        from nexus_cli.client import forward_scan
+        code = None if args.no_daemon else forward_scan(args)
+        if code is None:
+            from nexus_cli.context import run_scan
+            run_scan(args)
+        elif code:
+            sys.exit(code)
+    elif args.command == "serve":
+        from nexus_cli.serve import run_serve
+        run_serve(args)
+    elif args.command == "watch":
+        from nexus_cli.watch import run_watch
+        run_watch(args)
+    elif args.command == "render":
+        from nexus_cli.jsonl import run_render
+        run_render(args)
     elif args.command == "scaffold":
+        from nexus_cli.scaffolding import run_scaffold
         run_scaffold(args)
+    elif args.command == "bench":
+        from nexus_cli.bench import run_bench
+        run_bench(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
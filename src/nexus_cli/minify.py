@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+minify.py - Minification Module for Nexus CLI
+Language-aware minify modes for code sections, selected per file extension in nexus.json.
+"""
+
+import io
+import re
+import json
+import hashlib
+import tokenize
+
+from nexus_cli.report import minify_text
+
+FENCE = "\n```\n"
+
+# --- Python ---
+def minify_python(source):
+    """
+    Drops comments (license headers included) and docstrings, and collapses indentation to one
+    space per level. Works on truncated sources: anything after a tokenize error is kept as is.
+    """
+    lines = source.splitlines(keepends=True)
+    starts = [0, 0]
+    for line in lines:
+        starts.append(starts[-1] + len(line))
+
+    tokens = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            tokens.append(tok)
+    except (tokenize.TokenError, SyntaxError):
+        pass
+
+    def next_significant(i):
+        while i < len(tokens) and tokens[i].type in (tokenize.NL, tokenize.COMMENT):
+            i += 1
+        return tokens[i].type if i < len(tokens) else tokenize.ENDMARKER
+
+    edits = []
+    depth, line_start, last_row = 0, True, 0
+    for i, tok in enumerate(tokens):
+        kind = tok.type
+        if kind == tokenize.INDENT:
+            depth += 1
+        elif kind == tokenize.DEDENT:
+            depth -= 1
+        elif kind == tokenize.NEWLINE:
+            line_start = True
+        elif kind == tokenize.COMMENT:
+            row, col = tok.start
+            before = lines[row - 1][:col]
+            if before.strip():
+                edits.append((starts[row] + len(before.rstrip()), starts[row] + tok.end[1], ""))
+            else:
+                edits.append((starts[row], starts[row + 1], ""))
+        elif kind == tokenize.STRING and line_start and next_significant(i + 1) == tokenize.NEWLINE:
+            # A bare string statement (docstring); a body left empty gets '...' so it still parses
+            j = i + 1
+            while tokens[j].type != tokenize.NEWLINE:
+                j += 1
+            empty_body = tokens[i - 1].type == tokenize.INDENT and next_significant(j + 1) in (tokenize.DEDENT, tokenize.ENDMARKER)
+            edits.append((starts[tok.start[0]], starts[tok.end[0] + 1], " " * depth + "...\n" if empty_body else ""))
+            line_start = False
+            last_row = tok.end[0]
+        elif kind not in (tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER):
+            row, col = tok.start
+            if row != last_row and not lines[row - 1][:col].strip():
+                # Logical lines get their depth; continuation lines one level more
+                edits.append((starts[row], starts[row] + col, " " * (depth if line_start else depth + 1)))
+            line_start = False
+            last_row = tok.end[0]
+
+    out, pos = [], 0
+    for start, end, replacement in sorted(edits):
+        if start < pos:
+            continue
+        out.append(source[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(source[pos:])
+    return "".join(out)
+
+# --- C-like (C, C++, Java, JS/TS, Go, Rust, ...) ---
+# Whole-line comments, other comments, or a string literal (kept, so '//' inside strings survives)
+C_TOKEN_RE = re.compile(
+    r'^[ \t]*(?://[^\n]*|/\*.*?\*/)[ \t]*(?:\n|\Z)|//[^\n]*|/\*.*?\*/'
+    r'|("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)',
+    re.MULTILINE | re.DOTALL
+)
+
+def minify_c(source):
+    """Drops // and /* */ comments (license headers included), leaving string literals intact."""
+    return C_TOKEN_RE.sub(lambda m: m.group(1) or "", source)
+
+MODES = {"whitespace": None, "python": minify_python, "c": minify_c}
+
+class Minifier:
+    """
+    Minifies sections per file extension, from the "minify" block of nexus.json, e.g.
+    {"py": "python", "js": "c", "ts": "c"}. Language modes rewrite the fenced body of code
+    sections before the whitespace pass; every other file gets the whitespace pass only.
+    With a `measure(text) -> tokens` function, sections the minifier changed are counted
+    before and after, so the tokens saved per mode are exact.
+    """
+
+    def __init__(self, config=None, measure=None):
+        self.modes = {ext.lower().lstrip("."): mode for ext, mode in (config or {}).items()}
+        self.unknown = sorted({m for m in self.modes.values() if m not in MODES})
+        self.measure = measure
+        # Token counts are cached per minify configuration
+        digest = hashlib.blake2b(json.dumps(self.modes, sort_keys=True).encode(), digest_size=4).hexdigest()
+        self.key = f"min-{digest}" if self.modes else "min"
+        self.stats = {}
+
+    def mode_for(self, ext):
+        mode = self.modes.get(ext, "whitespace")
+        return mode if mode in MODES else "whitespace"
+
+    def apply(self, content, ext):
+        """Returns the minified section (language mode, then the whitespace pass)."""
+        mode = self.mode_for(ext)
+        out = content
+        language = MODES[mode]
+        if language is not None:
+            head, sep, rest = content.partition(FENCE)
+            if sep and rest.endswith(FENCE):
+                out = head + sep + language(rest[:-len(FENCE)]) + FENCE
+        out = minify_text(out)
+
+        stats = self.stats.setdefault(mode, [0, 0, 0, 0])
+        stats[0] += 1
+        stats[1] += len(content)
+        stats[2] += len(out)
+        if self.measure is not None and out != content:
+            stats[3] += self.measure(content) - self.measure(out)
+        return out
+
+    def savings(self):
+        """Yields (mode, sections, chars_in, chars_out, tokens_saved) per mode."""
+        for mode, (sections, chars_in, chars_out, saved) in sorted(self.stats.items()):
+            yield mode, sections, chars_in, chars_out, saved if self.measure is not None else None
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+packing.py - Token Budget Module for Nexus CLI
+Packs report sections into a --max-tokens budget by priority and renders the closing manifest.
+"""
+
+from nexus_cli.ignore import IgnoreMatcher
+from nexus_cli.report import SECTION_SEPARATOR
+
+INCLUDED, TRUNCATED, OMITTED = "included", "truncated", "omitted"
+
+class PriorityRules:
+    """
+    Scores sections from the "priority" block of nexus.json, e.g.
+    {"paths": {"src/**": 10, "tests/": -5}, "translators": {"code": 3}, "recency": 2, "size": -1}
+    Path globs use ignore-pattern syntax and every matching glob adds its weight. "recency" and
+    "size" weight the section's mtime and file size rank, scaled to 0..1 across the scan.
+    """
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.paths = [(IgnoreMatcher([glob]), weight) for glob, weight in config.get("paths", {}).items()]
+        self.translators = config.get("translators", {})
+        self.recency = config.get("recency", 0)
+        self.size = config.get("size", 0)
+
+    @staticmethod
+    def _ranks(values):
+        order = sorted(range(len(values)), key=values.__getitem__)
+        scale = max(1, len(values) - 1)
+        ranks = [0.0] * len(values)
+        for rank, i in enumerate(order):
+            ranks[i] = rank / scale
+        return ranks
+
+    def scores(self, sections):
+        scores = [0.0] * len(sections)
+        for i, s in enumerate(sections):
+            scores[i] += self.translators.get(s.translator, 0)
+            scores[i] += sum(w for m, w in self.paths if m.match(s.entry.relpath))
+        if self.recency or self.size:
+            stats = [s.entry.stat() for s in sections]
+            if self.recency:
+                for i, r in enumerate(self._ranks([st.st_mtime for st in stats])):
+                    scores[i] += self.recency * r
+            if self.size:
+                for i, r in enumerate(self._ranks([st.st_size for st in stats])):
+                    scores[i] += self.size * r
+        return scores
+
+class PackedSection:
+    __slots__ = ("section", "status", "text", "tokens", "full_tokens")
+
+    def __init__(self, section, status, text, tokens, full_tokens):
+        self.section = section
+        self.status = status
+        self.text = text
+        self.tokens = tokens
+        self.full_tokens = full_tokens
+
+def header_only(content):
+    """Degrades a section to its '### ...' header line."""
+    header = content.split("\n", 1)[0]
+    return f"{header}\n- _(content omitted to fit the token budget)_\n"
+
+def pack_sections(sections, budget, measure, rules=None):
+    """
+    Fits sections into `budget` tokens (measure(text) -> tokens, separators included).
+    Lowest-priority sections are degraded to headers first, and only when every section is
+    degraded are headers dropped, again lowest priority first. Once headers are dropped, the
+    highest-priority section is kept whole if it fits on its own. Leftover budget is then handed
+    back in priority order. Returns PackedSections in the original order.
+    """
+    n = len(sections)
+    scores = (rules or PriorityRules()).scores(sections)
+    best_first = sorted(range(n), key=lambda i: (-scores[i], i))
+
+    full = [s.tokens if s.tokens is not None else measure(s.content + SECTION_SEPARATOR) for s in sections]
+    heads = [header_only(s.content) for s in sections]
+    head = [measure(h + SECTION_SEPARATOR) for h in heads]
+    cost = {INCLUDED: full, TRUNCATED: head, OMITTED: [0] * n}
+
+    status = [INCLUDED] * n
+    used = sum(full)
+    for downgrade in (TRUNCATED, OMITTED):
+        for i in reversed(best_first):
+            if used <= budget:
+                break
+            used += cost[downgrade][i] - cost[status[i]][i]
+            status[i] = downgrade
+
+    # Many small files would otherwise leave a report of headers and no content at all
+    top = best_first[0] if n else None
+    if top is not None and status[top] != INCLUDED and full[top] <= budget:
+        used += full[top] - cost[status[top]][top]
+        status[top] = INCLUDED
+        for i in reversed(best_first):
+            if used <= budget:
+                break
+            if i != top:
+                used -= cost[status[i]][i]
+                status[i] = OMITTED
+
+    for i in best_first:
+        for upgrade in (INCLUDED, TRUNCATED):
+            if status[i] == upgrade:
+                break
+            delta = cost[upgrade][i] - cost[status[i]][i]
+            if used + delta <= budget:
+                used += delta
+                status[i] = upgrade
+                break
+
+    packed = []
+    for i, s in enumerate(sections):
+        text = {INCLUDED: s.content, TRUNCATED: heads[i], OMITTED: None}[status[i]]
+        packed.append(PackedSection(s, status[i], text, cost[status[i]][i], full[i]))
+    return packed
+
+def _manifest_rows(packed, grouped=False):
+    """
+    [status, tokens, full, label, files] rows, one per file. With `grouped`, only included files
+    keep their own row; truncated and omitted ones are summed per directory.
+    """
+    rows, groups = [], {}
+    for p in packed:
+        relpath = p.section.entry.relpath
+        if p.status == INCLUDED or not grouped:
+            rows.append([p.status, p.tokens, p.full_tokens, relpath, 1])
+            continue
+        directory = relpath.rpartition("/")[0]
+        row = groups.get((p.status, directory))
+        if row is None:
+            row = groups[(p.status, directory)] = [p.status, 0, 0, relpath, 0]
+            rows.append(row)
+        row[1] += p.tokens
+        row[2] += p.full_tokens
+        row[4] += 1
+        if row[4] > 1:
+            row[3] = f"{directory or '.'}/ ({row[4]} files)"
+    return rows
+
+def _render_table(summary, rows, max_rows=None):
+    lines = ["## NEXUS MANIFEST", summary, "", "| Status | Tokens | Full | File |", "|---|---|---|---|"]
+    for status, tokens, full, label, _ in rows[:max_rows]:
+        lines.append(f"| {status} | {tokens:,} | {full:,} | {label} |")
+    rest = rows[max_rows:] if max_rows is not None else []
+    if rest:
+        tokens, full, files = (sum(r[k] for r in rest) for k in (1, 2, 4))
+        lines.append(f"| ... | {tokens:,} | {full:,} | {files} more files |")
+    return "\n".join(lines) + "\n"
+
+def _summary(used, budget, included, truncated, omitted):
+    summary = f"- Sections: {used:,} tokens"
+    if budget is not None:
+        summary += f" of a {budget:,} token budget"
+    return f"{summary} | Included: {included} | Truncated: {truncated} | Omitted: {omitted}"
+
+def render_manifest(packed, budget=None, max_rows=None):
+    """
+    Markdown table of every section's fate and token cost, appended to the report. `max_rows`
+    ("manifest_rows" in nexus.json) caps it for huge projects: truncated and omitted files are
+    then grouped per directory, and rows past the cap collapse into one summary row.
+    """
+    counts = {INCLUDED: 0, TRUNCATED: 0, OMITTED: 0}
+    for p in packed:
+        counts[p.status] += 1
+    used = sum(p.tokens for p in packed)
+    summary = _summary(used, budget, counts[INCLUDED], counts[TRUNCATED], counts[OMITTED])
+    return _render_table(summary, _manifest_rows(packed, grouped=max_rows is not None), max_rows)
+
+def manifest_reserve(sections, measure, budget, max_rows=None):
+    """
+    Upper-bound token cost of the manifest, measured on a worst-case draft: every file's row (or
+    max_rows rows with the longest paths and a directory label) with numbers one digit wider
+    than its full token count, which a header-only cost never reaches.
+    """
+    n = len(sections)
+    # A truncated section costs at most its header plus the short omission note, so twice the total covers any sum
+    widest = max(budget, 2 * sum(s.tokens or 0 for s in sections))
+    if max_rows is None:
+        rows = [[TRUNCATED, 10 * (s.tokens or 1), 10 * (s.tokens or 1), s.entry.relpath, 1] for s in sections]
+    else:
+        longest = sorted((s.entry.relpath for s in sections), key=len, reverse=True)[:max_rows + 1]
+        rows = [[TRUNCATED, widest, widest, f"{path}/ ({n} files)", n] for path in longest]
+    return measure(_render_table(_summary(widest, widest, n, n, n), rows, max_rows))
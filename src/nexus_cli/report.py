@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+report.py - Report Writer Module for Nexus CLI
+Streams report sections to disk as they are produced, minifying and counting tokens per section.
+"""
+
+SECTION_SEPARATOR = "\n---\n"
+
+def minify_text(text):
+    """
+    Strips trailing spaces/tabs and collapses every run of 3+ newlines to 2, in a single pass
+    over the lines (no intermediate copy of the text per rule).
+    """
+    out, blank, seen = [], 0, False
+    for line in text.split("\n"):
+        line = line.rstrip(" \t")
+        if line:
+            out.append(line)
+            blank = 0
+            seen = True
+        else:
+            blank += 1
+            # Inside the text one blank line survives; a leading or trailing run keeps two newlines
+            if blank == 1 or (blank == 2 and not seen):
+                out.append(line)
+    if not seen:
+        return "\n" * min(text.count("\n"), 2)
+    if blank >= 2:
+        out.append("")
+    return "\n".join(out)
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+class Section:
+    """One file's rendered report section, plus what later stages (packing, manifests) need."""
+
+    __slots__ = ("entry", "translator", "content", "tokens")
+
+    def __init__(self, entry, translator, content, tokens=None):
+        self.entry = entry
+        self.translator = translator
+        self.content = content
+        self.tokens = tokens
+
+class ReportWriter:
+    """
+    Writes a markdown report section by section, so peak memory is bounded by the largest
+    single section rather than the whole report.
+    Chunks are queued in small batches so their token counts can be encoded together; chunks
+    whose count is already known (e.g. from the scan cache) are never re-encoded.
+    """
+
+    def __init__(self, out_path, minify=False, counter=None, batch_size=64):
+        self.out_path = out_path
+        self.minify = minify
+        self.counter = counter
+        self.batch_size = batch_size
+        self.sections = 0
+        self._trailing_newlines = 0
+        self._pending = []
+        self._f = open(out_path, "w", encoding="utf-8")
+
+    def _minify(self, text, minified=False):
+        if not minified:
+            text = minify_text(text)
+        # Keep blank-line runs collapsed across the boundary with the previous section
+        lead = len(text) - len(text.lstrip('\n'))
+        if lead and self._trailing_newlines + lead >= 3:
+            text = text[lead - max(0, 2 - self._trailing_newlines):]
+        return text
+
+    def write(self, text, tokens=None, on_tokens=None, minified=False):
+        """
+        Queues report text through the minify/count path. `tokens` skips encoding when the
+        count is already known; `on_tokens(n)` is called once the chunk's count is settled.
+        `minified` text has already been through minify_text and only gets the boundary fix.
+        """
+        if self.minify:
+            text = self._minify(text, minified)
+        if not text:
+            return
+        stripped = text.rstrip('\n')
+        self._trailing_newlines = len(text) - len(stripped) if stripped else self._trailing_newlines + len(text)
+        self._pending.append((text, tokens, on_tokens))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def write_section(self, content, tokens=None, on_tokens=None, minified=False, entry=None, translator=None):
+        """`entry` and `translator` name the section's file for structured writers (JsonlWriter)."""
+        if minified and content.endswith("\n\n"):
+            # Keep the blank-line run collapsed across the separator, as minify_text would
+            content = content[:-1]
+        self.write(content + SECTION_SEPARATOR, tokens, on_tokens, minified)
+        self.sections += 1
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        counts = [n for _, n, _ in pending]
+        if self.counter is not None and self.counter.available:
+            missing = [i for i, n in enumerate(counts) if n is None]
+            for i, n in zip(missing, self.counter.measure_batch([pending[i][0] for i in missing])):
+                counts[i] = n
+        for (text, _, on_tokens), n in zip(pending, counts):
+            self._f.write(text)
+            if self.counter is not None and n is not None:
+                self.counter.total += n
+                if on_tokens: on_tokens(n)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
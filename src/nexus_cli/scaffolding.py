@@ -5,12 +5,16 @@ Generates a folder and file structure from an ASCII tree.
 """
 
 from __future__ import annotations
+import os
 import re
 import sys
 import json
+import unicodedata
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 # --- CONSTANTS & COLORS ---
 class C:
@@ -56,34 +60,35 @@ def get_confirmation(prompt: str, auto_yes: bool = False) -> bool:
         if response in ["n", "no"]: return False
         print(f"{C.RED}❌ Please type 'y' or 'n'.{C.RESET}")
 
+ILLEGAL_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
 def sanitize_component(component: str) -> str:
     component = component.strip().strip('"').strip("'")
-    illegal = '<>:"/\\|?*'
-    component = "".join("_" if ch in illegal or ord(ch) < 32 else ch for ch in component)
+    component = ILLEGAL_CHARS_RE.sub("_", component)
     component = component.rstrip(" .")
     if not component: component = "_"
     if component.upper() in WINDOWS_RESERVED: component += "_"
     return component
 
 # --- PARSING LOGIC ---
+# Compiled once: the parser runs these on every line of trees that can be 100k+ lines long
+TREE_PREFIX_RE = re.compile(r"^[│\s|]*")
+# Notes start at "<--", "#", a run of 2+ spaces or " //"; the earliest one ends the name
+INLINE_NOTE_RE = re.compile(r"<--|#|\s{2,}|\s+//")
 
 def strip_inline_notes(s: str) -> str:
-    if "<--" in s: s = s.split("<--", 1)[0]
-    if "#" in s: s = s.split("#", 1)[0]
-    s = re.split(r"\s{2,}", s, maxsplit=1)[0]
-    s = re.split(r"\s+//", s, maxsplit=1)[0]
-    return s.strip()
+    m = INLINE_NOTE_RE.search(s)
+    return (s[:m.start()] if m else s).strip()
 
 def count_tree_depth(line: str) -> Tuple[int, str]:
-    expanded = line.expandtabs(4)
+    expanded = line.expandtabs(4) if "\t" in line else line
     # Match any combination of tree pipes and spaces at the start
-    prefix_match = re.match(r"^([│\s|]*)", expanded)
-    prefix = prefix_match.group(1) if prefix_match else ""
+    prefix_len = TREE_PREFIX_RE.match(expanded).end()
     
     # Each level in your tree looks like 2 or 3 characters (e.g., "│  ")
     # We'll normalize this by integer dividing the prefix length
-    depth = len(prefix) // 2 
-    return depth, expanded[len(prefix):]
+    depth = prefix_len // 2 
+    return depth, expanded[prefix_len:]
 
 def extract_name_from_line(line: str) -> Optional[Entry]:
     depth, rest = count_tree_depth(line)
@@ -101,38 +106,50 @@ def extract_name_from_line(line: str) -> Optional[Entry]:
         is_dir_hint=name_part.endswith("/") or "." not in name_part
     )
 
-def parse_tree(lines: List[str]) -> Tuple[str, List[Entry]]:
-    non_empty = [l for l in lines if l.strip()]
-    if not non_empty: raise ValueError("No valid content found.")
+def iter_tree(lines: Iterable[str]) -> Tuple[str, Iterator[Entry]]:
+    """
+    Single-pass parser: reads the root line, then returns it with a generator of the remaining
+    entries, so a tree file is never held in memory as a list of lines.
+    """
+    lines = (l for l in lines if l.strip())
+    first = next(lines, None)
+    if first is None: raise ValueError("No valid content found.")
     
-    root_name = strip_inline_notes(non_empty[0]).rstrip("/").strip()
+    root_name = strip_inline_notes(first).rstrip("/").strip()
     if not root_name: root_name = "project_root"
-    
-    entries = []
-    for raw in non_empty[1:]:
-        e = extract_name_from_line(raw)
-        if e: entries.append(e)
+
+    def entries():
+        for raw in lines:
+            e = extract_name_from_line(raw)
+            if e: yield e
             
-    return root_name, entries
+    return root_name, entries()
 
-def build_plan(root_dir: Path, entries: List[Entry]) -> List[Tuple[Path, bool]]:
-    plan = []
-    stack: List[Path] = [] 
+def parse_tree(lines: List[str]) -> Tuple[str, List[Entry]]:
+    root_name, entries = iter_tree(lines)
+    return root_name, list(entries)
 
-    for i, e in enumerate(entries):
-        while len(stack) > e.depth:
-            stack.pop()
+def iter_plan(root_dir: Path, entries: Iterable[Entry]) -> Iterator[Tuple[Path, bool]]:
+    """Yields (path, is_dir) per entry, looking one entry ahead to spot directories without a trailing slash."""
+    stack: List[Path] = []
+    entries = iter(entries)
+    e = next(entries, None)
+
+    while e is not None:
+        nxt = next(entries, None)
+        del stack[e.depth:]
         
-        next_depth = entries[i+1].depth if i+1 < len(entries) else -1
-        is_dir = e.is_dir_hint or (next_depth > e.depth)
+        is_dir = e.is_dir_hint or (nxt is not None and nxt.depth > e.depth)
         
         clean_name = sanitize_component(e.raw_name.rstrip("/"))
-        current_path = root_dir.joinpath(*stack) / clean_name
+        current_path = (stack[-1] if stack else root_dir) / clean_name
         
-        plan.append((current_path, is_dir))
-        if is_dir: stack.append(Path(clean_name))
+        yield current_path, is_dir
+        if is_dir: stack.append(current_path)
+        e = nxt
 
-    return plan
+def build_plan(root_dir: Path, entries: List[Entry]) -> List[Tuple[Path, bool]]:
+    return list(iter_plan(root_dir, entries))
 
 def preview_plan(root_dir: Path, plan: List[Tuple[Path, bool]]):
     print(f"\n{C.CYAN}--- PLAN PREVIEW ---{C.RESET}")
@@ -164,23 +181,106 @@ def save_json_plan(root_dir: Path, plan: List[Tuple[Path, bool]]):
     except OSError as e:
         print(f"{C.RED}❌ Failed to save JSON: {e}{C.RESET}")
 
-def apply_plan(plan: List[Tuple[Path, bool]], overwrite: bool, use_boilerplate: bool):
-    d_count, f_count = 0, 0
+def load_json_plan(plan_file: Path, out: Optional[Path] = None) -> Tuple[Path, List[Tuple[Path, bool]]]:
+    """
+    Reads a plan written by save_json_plan. With `out`, the plan's root directory is moved
+    under it (paths keep their place relative to the root); otherwise the saved paths are used.
+    """
+    with open(plan_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    try:
+        saved_root, items = data["root"], data["items"]
+        plan = [(item["path"], item["type"] == "dir") for item in items]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"{plan_file} is not a scaffold plan (missing {e}).")
+
+    if out is None:
+        return Path(saved_root), [(Path(p), d) for p, d in plan]
+
+    root_dir = out / Path(saved_root).name
+    prefix = saved_root.rstrip("/\\") + os.sep
+    rebased = []
+    for p, is_dir in plan:
+        if p != saved_root and not p.startswith(prefix):
+            raise ValueError(f"Plan entry outside its root: {p}")
+        rebased.append((root_dir / p[len(prefix):] if p != saved_root else root_dir, is_dir))
+    return root_dir, rebased
+
+WRITE_JOBS = 8
+WRITE_BATCH = 256
+
+def _name_key(name: str) -> str:
+    return unicodedata.normalize("NFC", name).casefold()
+
+def _boilerplate(path: Path, use_boilerplate: bool) -> str:
+    if not use_boilerplate: return ""
+    if path.name == ".gitignore": return BOILERPLATES[".gitignore"]
+    if path.name == ".env": return BOILERPLATES[".env"]
+    return BOILERPLATES.get(path.suffix, "")
+
+def _write_files(batch: List[Tuple[str, str]]):
+    for path, content in batch:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+def apply_plan(plan: Iterable[Tuple[Path, bool]], overwrite: bool, use_boilerplate: bool, jobs: int = WRITE_JOBS):
+    """
+    Materializes the plan (any iterable, consumed once): every distinct directory is created once,
+    parents first; files that already exist are found from one listing per pre-existing directory
+    instead of a stat per file; and the file writes run on a thread pool. Counts match a
+    one-entry-at-a-time pass.
+    """
+    # Paths are handled as strings from here on: hashing Path objects costs more than the syscalls saved
+    files, directories, d_count = [], set(), 0
     for path, is_dir in plan:
         if is_dir:
-            path.mkdir(parents=True, exist_ok=True)
+            directories.add(str(path))
             d_count += 1
         else:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            if not path.exists() or overwrite:
-                content = ""
-                if use_boilerplate:
-                    if path.name == ".gitignore": content = BOILERPLATES[".gitignore"]
-                    elif path.name == ".env": content = BOILERPLATES[".env"]
-                    else: content = BOILERPLATES.get(path.suffix, "")
-                
-                path.write_text(content, encoding="utf-8")
-                f_count += 1
+            file = str(path)
+            files.append((file, path))
+            directories.add(os.path.dirname(file))
+
+    # Directories that already existed are the only ones that can hold existing files
+    pre_existing = set()
+    for directory in sorted(directories, key=lambda d: d.count(os.sep)):
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            if not os.path.isdir(directory): raise
+            pre_existing.add(directory)
+        except FileNotFoundError:
+            os.makedirs(directory, exist_ok=True)
+
+    listings = {}
+    def exists(file: str) -> bool:
+        parent, name = os.path.split(file)
+        if parent not in pre_existing: return False
+        names = listings.get(parent)
+        if names is None:
+            names = listings[parent] = set(os.listdir(parent))
+        if name in names: return True
+        # Case-insensitive or normalizing filesystems: a loose listing match is re-checked with exists()
+        key = _name_key(name)
+        return any(_name_key(n) == key for n in names) and os.path.exists(file)
+
+    writes, scheduled, f_count = [], set(), 0
+    for file, path in files:
+        # A file listed twice is written once; without overwrite the second entry sees it as existing
+        if file in scheduled:
+            if overwrite: f_count += 1
+            continue
+        if overwrite or not exists(file):
+            writes.append((file, _boilerplate(path, use_boilerplate)))
+            scheduled.add(file)
+            f_count += 1
+
+    batches = [writes[i:i + WRITE_BATCH] for i in range(0, len(writes), WRITE_BATCH)]
+    if jobs > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for _ in pool.map(_write_files, batches): pass
+    else:
+        for batch in batches: _write_files(batch)
     return d_count, f_count
 
 
@@ -192,14 +292,20 @@ def run_scaffold(args):
     It receives 'args' directly from the router.
     """
     lines = []
+    tree_path = None
+    plan_file = getattr(args, "from_plan", None)
 
     # 1. READ INPUT
-    if args.file:
+    if plan_file:
+        if not plan_file.exists():
+            print(f"{C.RED}❌ Plan file does not exist: {plan_file}{C.RESET}")
+            sys.exit(1)
+        print(f"{C.CYAN}📥 Replaying plan from: {plan_file}{C.RESET}")
+    elif args.file:
         if not args.file.exists():
             print(f"{C.RED}❌ File does not exist: {args.file}{C.RESET}")
             sys.exit(1)
-        with open(args.file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+        tree_path = args.file
         print(f"{C.CYAN}📥 Reading tree from: {args.file}{C.RESET}")
     else:
         if sys.stdin.isatty():
@@ -218,8 +324,8 @@ def run_scaffold(args):
 
     # 2. PARSE AND EXECUTE
     try:
-        root_name, entries = parse_tree(lines)
-        base_dir = args.out.expanduser().resolve()
+        out = args.out.expanduser().resolve() if args.out else None
+        base_dir = out or Path.cwd()
         
         try:
             base_dir.mkdir(parents=True, exist_ok=True)
@@ -228,8 +334,14 @@ def run_scaffold(args):
             print(f"{C.YELLOW}Make sure the drive exists and you have write permissions.{C.RESET}")
             sys.exit(1)
 
-        root_dir = base_dir / sanitize_component(root_name)
-        plan = build_plan(root_dir, entries)
+        if plan_file:
+            root_dir, plan = load_json_plan(plan_file, out)
+        else:
+            # A tree file is parsed straight from the file object, line by line, while the plan is built
+            with (open(tree_path, "r", encoding="utf-8") if tree_path else nullcontext(lines)) as source:
+                root_name, entries = iter_tree(source)
+                root_dir = base_dir / sanitize_component(root_name)
+                plan = list(iter_plan(root_dir, entries))
         
         preview_plan(root_dir, plan)
         print(f"{C.CYAN}{len(plan)} items{C.RESET} will be created in total.")
@@ -238,7 +350,7 @@ def run_scaffold(args):
             print(f"\n{C.YELLOW}🏁 Dry-run completed. No changes were made to the disk.{C.RESET}")
             sys.exit(0)
 
-        if args.json or get_confirmation("Save a copy of the plan as JSON?", args.yes):
+        if not plan_file and (args.json or get_confirmation("Save a copy of the plan as JSON?", args.yes)):
             save_json_plan(root_dir, plan)
             
         ow = get_confirmation("Overwrite existing files?", args.yes)
@@ -251,4 +363,4 @@ def run_scaffold(args):
             
     except Exception as e:
         print(f"{C.RED}❌ Error: {e}{C.RESET}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+search.py - Search Index Module for Nexus CLI
+A persistent BM25 index over the sections handlers produce (SQLite FTS5, under .nexus/cache/),
+updated incrementally by file fingerprint, used by `nexus scan --query` to keep only the
+files relevant to a question.
+"""
+
+import os
+import re
+import sqlite3
+
+from nexus_cli.cache import CACHE_DIR
+
+INDEX_FILE = os.path.join(CACHE_DIR, "search.sqlite")
+INDEX_VERSION = 1
+# Rebuild from scratch once this share of the indexed documents are superseded versions
+MAX_DEAD_RATIO = 0.25
+# Documents added in one update that trigger an FTS5 segment merge
+OPTIMIZE_AFTER = 1000
+# BM25 column weights: a match in the path counts double
+PATH_WEIGHT, BODY_WEIGHT = 2.0, 1.0
+
+# camelCase and PascalCase identifiers are split so "refresh token" finds refreshToken
+CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+WORD_RE = re.compile(r"\w+")
+
+class SearchUnavailable(Exception):
+    pass
+
+def split_words(text):
+    return CAMEL_RE.sub(" ", text)
+
+def match_expression(query):
+    """An FTS5 expression matching any word of the query (BM25 rewards documents with more of them)."""
+    words = {w.lower() for w in WORD_RE.findall(split_words(query))}
+    return " OR ".join(f'"{w}"' for w in sorted(words))
+
+class SearchIndex:
+    """
+    FTS5 documents (path, body) plus a `files` table mapping each path to its current document
+    and fingerprint (size, mtime, translator). The FTS table is contentless to stay small, so
+    a changed file gets a new document and the old one is only unlinked; queries join through
+    `files`, and the index is rebuilt once unlinked documents exceed MAX_DEAD_RATIO.
+    """
+
+    def __init__(self, path=INDEX_FILE, salt="", rebuild=False):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        meta = self._meta()
+        if rebuild or meta.get("version") != str(INDEX_VERSION) or meta.get("salt") != salt or self._dead_ratio() > MAX_DEAD_RATIO:
+            self._create(salt)
+        self.added = 0
+        self.removed = 0
+
+    def _meta(self):
+        try:
+            return dict(self.db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            return {}
+
+    def _dead_ratio(self):
+        try:
+            live = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            total = self.db.execute("SELECT COUNT(*) FROM docs_docsize").fetchone()[0]
+        except sqlite3.DatabaseError:
+            return 1.0
+        return (total - live) / total if total else 0.0
+
+    def _create(self, salt):
+        db = self.db
+        for table in ("docs", "files", "meta"):
+            db.execute(f"DROP TABLE IF EXISTS {table}")
+        try:
+            db.execute("CREATE VIRTUAL TABLE docs USING fts5(path, body, content='', tokenize='porter unicode61')")
+        except sqlite3.OperationalError as e:
+            raise SearchUnavailable(f"SQLite was built without FTS5 ({e})")
+        db.execute("CREATE TABLE files (path TEXT PRIMARY KEY, doc INTEGER UNIQUE, size INTEGER, mtime INTEGER, translator TEXT)")
+        db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [("version", str(INDEX_VERSION)), ("salt", salt)])
+        db.commit()
+        db.execute("VACUUM")
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def stale(self, tasks, complete=True):
+        """
+        Returns the (entry, translator) tasks whose file is new or changed since it was indexed.
+        With complete=True the tasks are the whole project, and files missing from them are unlinked.
+        """
+        known = {path: (size, mtime, translator) for path, size, mtime, translator
+                 in self.db.execute("SELECT path, size, mtime, translator FROM files")}
+        stale = []
+        for entry, translator in tasks:
+            st = entry.stat()
+            if known.pop(entry.relpath, None) != (st.st_size, st.st_mtime_ns, translator):
+                stale.append((entry, translator))
+        if complete and known:
+            self.db.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in known))
+            self.removed += len(known)
+        return stale
+
+    def update(self, tasks, render, complete=True):
+        """Indexes new and changed files; render(stale_tasks) yields their (entry, translator, content). Returns how many."""
+        stale = self.stale(tasks, complete)
+        for entry, translator, content in render(stale):
+            self.add(entry, translator, content)
+        # After a large batch, merging FTS5's segments roughly halves the index and speeds up queries
+        optimize = self.added >= max(OPTIMIZE_AFTER, len(self) // 10)
+        if optimize:
+            self.db.execute("INSERT INTO docs(docs) VALUES('optimize')")
+        self.commit()
+        if optimize:
+            self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return len(stale)
+
+    def add(self, entry, translator, text):
+        """Indexes the section text of entry, replacing the previously indexed version."""
+        st = entry.stat()
+        cursor = self.db.execute("INSERT INTO docs (path, body) VALUES (?, ?)",
+                                 (split_words(entry.relpath.replace("/", " ")), split_words(text)))
+        self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                        (entry.relpath, cursor.lastrowid, st.st_size, st.st_mtime_ns, translator))
+        self.added += 1
+
+    def commit(self):
+        self.db.commit()
+
+    def search(self, query):
+        """Yields (relpath, score) for files matching any query word, best first (higher is better)."""
+        expression = match_expression(query)
+        if not expression:
+            return
+        rows = self.db.execute(
+            f"SELECT f.path, bm25(docs, {PATH_WEIGHT}, {BODY_WEIGHT}) AS rank FROM docs JOIN files f ON f.doc = docs.rowid "
+            "WHERE docs MATCH ? ORDER BY rank", (expression,))
+        for path, rank in rows:
+            yield path, -rank
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+def select_relevant(tasks, index, query, top_k, neighbors=1):
+    """
+    Ranks the tasks' files against query and keeps the top_k matches plus up to `neighbors`
+    files on each side of every match in the same directory (in walk order). Returns
+    (kept tasks in walk order, [(relpath, score)] of the matches).
+    """
+    position = {entry.relpath: i for i, (entry, _) in enumerate(tasks)}
+    ranking = []
+    for relpath, score in index.search(query):
+        if relpath in position:
+            ranking.append((relpath, score))
+            if len(ranking) >= top_k:
+                break
+
+    keep = set()
+    for relpath, _ in ranking:
+        i = position[relpath]
+        directory = relpath.rpartition("/")[0]
+        keep.add(i)
+        for step in (-1, 1):
+            j, found = i + step, 0
+            while found < neighbors and 0 <= j < len(tasks) and tasks[j][0].relpath.rpartition("/")[0] == directory:
+                keep.add(j)
+                found += 1
+                j += step
+    return [tasks[i] for i in sorted(keep)], ranking
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+serve.py - Daemon Module for Nexus CLI
+Keeps one project's config, handler registry, tokenizer and scan cache warm in a long-running
+process and answers scan, token-count and render requests over a Unix socket (or localhost
+TCP), one JSON object per line each way. See client.py for the other end.
+"""
+
+import io
+import os
+import sys
+import copy
+import json
+import time
+import signal
+import socket
+import secrets
+import argparse
+import importlib
+import threading
+import traceback
+import socketserver
+from contextlib import redirect_stdout
+
+from rich.console import Console
+
+from nexus_cli import context
+from nexus_cli.context import ScanResources, run_scan, load_config, load_custom_handlers
+from nexus_cli.cache import ScanCache
+from nexus_cli.client import SERVE_FILE, daemon_info, request, DaemonError
+from nexus_cli.handlers import REGISTRY, render_file, configure_handlers, handler_salt, CUSTOM_HANDLERS
+from nexus_cli.gitfiles import PathFilter
+from nexus_cli.ignore import normalize_path
+from nexus_cli.walker import FileEntry
+from nexus_cli.minify import Minifier
+from nexus_cli.tokens import make_counter
+
+SOCKET_FILE = os.path.join(".nexus", "serve.sock")
+CONFIG_FILE = "nexus.json"
+# Seconds without requests before a changed scan cache is written back to disk
+SAVE_AFTER_IDLE = 2.0
+# Libraries the built-in translators import on first use, loaded up front when configured
+WARM_IMPORTS = {"csv": "pandas", "image": "PIL.Image", "pdf": "pypdf"}
+
+log = Console(stderr=True)
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class WarmResources(ScanResources):
+    """
+    ScanResources that outlive a request. nexus.json and custom handlers are reloaded when
+    their files change. Every scan gets a shallow copy of the long-lived cache and counter
+    (sharing the cache entries and the loaded encoding, with fresh totals and instrumentation),
+    and cache writes are deferred to flush(), which the daemon calls when idle.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._config = None
+        self._stamps = None
+        self._cache = None
+        self._cache_key = None
+        self._counters = {}
+
+    def config(self):
+        stamps = (_mtime(CONFIG_FILE), _mtime(CUSTOM_HANDLERS))
+        if self._config is None or stamps != self._stamps:
+            self._config = load_config()
+            load_custom_handlers()
+            self._stamps = stamps
+            self._counters.clear()
+        return self._config
+
+    def cache(self, verify_hash=False, rebuild=False, salt=""):
+        if self._cache is None or rebuild or self._cache_key != (verify_hash, salt):
+            self.flush()
+            self._cache = ScanCache(verify_hash=verify_hash, rebuild=rebuild, salt=salt)
+            self._cache_key = (verify_hash, salt)
+        view = copy.copy(self._cache)
+        view.touched, view.hits, view.misses, view.dirty = set(), 0, 0, False
+        return view
+
+    def counter(self, settings, estimate):
+        key = json.dumps([settings, estimate], sort_keys=True)
+        if key not in self._counters:
+            self._counters[key] = make_counter(settings, estimate)
+        view = copy.copy(self._counters[key])
+        view.total = 0
+        return view
+
+    def save_cache(self, cache, evict=True):
+        if evict:
+            cache.evict()
+        if cache.dirty:
+            self._cache.dirty = True
+
+    def flush(self):
+        """Writes the cache to disk if a request changed it."""
+        if self._cache is not None and self._cache.dirty:
+            try:
+                self._cache.save(evict=False)
+            except OSError as e:
+                log.print(f"[bold yellow]⚠️ Failed to save scan cache: {e}")
+
+    def warm_up(self):
+        """Loads the config, the configured tokenizer, the cache and the handlers' libraries."""
+        config = self.config()
+        handler_opts = config.get("handlers", {})
+        self.cache(verify_hash=config.get("cache", {}).get("verify_hash", False), salt=handler_salt(handler_opts))
+        self.counter(config.get("tokenizer"), None)
+        for translator in set(config.get("translators", {}).values()) & set(WARM_IMPORTS):
+            try:
+                importlib.import_module(WARM_IMPORTS[translator])
+            except ImportError:
+                pass
+
+class Daemon:
+    """Dispatches requests; everything touching the warm resources runs one request at a time."""
+
+    def __init__(self, resources, token):
+        self.resources = resources
+        self.token = token
+        self.started = time.time()
+        self.requests = 0
+        self.last = time.monotonic()
+        self.stopping = threading.Event()
+
+    def handle(self, req):
+        if req.get("token") != self.token:
+            return {"ok": False, "error": "invalid token"}
+        cmd = req.get("cmd")
+        self.last = time.monotonic()
+        if cmd == "ping":
+            return {"ok": True, **self.status()}
+        if cmd == "shutdown":
+            self.stopping.set()
+            return {"ok": True}
+        handler = {"scan": self.scan, "tokens": self.tokens, "render": self.render}.get(cmd)
+        if handler is None:
+            return {"ok": False, "error": f"unknown command '{cmd}'"}
+
+        start = time.perf_counter()
+        with self.resources.lock:
+            try:
+                response = {"ok": True, **handler(req)}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.requests += 1
+            self.last = time.monotonic()
+        log.print(f"[dim]{cmd} {(time.perf_counter() - start) * 1000:.1f} ms{'' if response['ok'] else ' (failed)'}")
+        return response
+
+    def status(self):
+        cache = self.resources._cache
+        return {"pid": os.getpid(), "uptime": round(time.time() - self.started, 1), "requests": self.requests,
+                "cache_entries": len(cache.entries) if cache else 0}
+
+    def scan(self, req):
+        """Runs `nexus scan` with the client's arguments; the console output goes back to it."""
+        args = argparse.Namespace(**req.get("args", {}))
+        buffer = io.StringIO()
+        # Rendered for the client's terminal; the status spinner stays off (not interactive)
+        previous = context.console
+        context.console = Console(file=buffer, force_terminal=bool(req.get("tty")), force_interactive=False,
+                                  width=req.get("width") or 80)
+        code = 0
+        try:
+            with redirect_stdout(buffer):
+                run_scan(args, resources=self.resources)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            buffer.write(traceback.format_exc())
+            code = 1
+        finally:
+            context.console = previous
+        return {"output": buffer.getvalue(), "code": code}
+
+    def _section(self, path):
+        """Returns (entry, translator, content, cached) for one file, through the warm cache."""
+        config = self.resources.config()
+        handler_opts = config.get("handlers", {})
+        configure_handlers(handler_opts)
+        relpath = normalize_path(os.path.relpath(path))
+        name = relpath.rpartition("/")[2]
+        translator = config["translators"].get(name.split(".")[-1].lower())
+        if translator not in REGISTRY:
+            raise ValueError(f"no translator configured for {relpath}")
+        # Keyed like the walker's paths, so sections are shared with scans
+        found = PathFilter(None, config.get("watch_dirs", ["."])).entries([relpath])
+        if found:
+            entry = found[0]
+        elif os.path.isfile(path):
+            entry = FileEntry(path, relpath, name)
+        else:
+            raise FileNotFoundError(path)
+
+        cache = self.resources.cache(verify_hash=config.get("cache", {}).get("verify_hash", False),
+                                     salt=handler_salt(handler_opts))
+        content = cache.get(entry.path, translator, entry.stat())
+        cached = content is not None
+        if not cached:
+            content = render_file(translator, entry.path)
+            cache.put(entry.path, translator, entry.stat(), content)
+        self.resources.save_cache(cache, evict=False)
+        return entry, translator, content, cached
+
+    def render(self, req):
+        """Renders one file's report section, optionally minified, with its token count."""
+        entry, translator, content, cached = self._section(req["path"])
+        config = self.resources.config()
+        if req.get("minify"):
+            content = Minifier(config.get("minify")).apply(content, entry.ext)
+        counter = self.resources.counter(config.get("tokenizer"), req.get("estimate"))
+        tokens = counter.measure(content) if counter.available else None
+        return {"path": entry.relpath, "translator": translator, "cached": cached, "content": content, "tokens": tokens}
+
+    def tokens(self, req):
+        """Counts the tokens of `text`, or of the rendered section of `path`."""
+        config = self.resources.config()
+        text = req.get("text")
+        if text is None:
+            text = self._section(req["path"])[2]
+        counter = self.resources.counter(config.get("tokenizer"), req.get("estimate"))
+        if not counter.available:
+            raise RuntimeError(f"tokenizer unavailable: {counter.error}")
+        return {"tokens": counter.measure(text), "encoding": counter.name}
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            req = json.loads(line)
+        except ValueError:
+            response = {"ok": False, "error": "malformed request"}
+        else:
+            response = self.server.nexus.handle(req)
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+def make_server(port=None):
+    """A threaded server on .nexus/serve.sock, or on localhost TCP when asked (or without AF_UNIX)."""
+    if port is None and hasattr(socket, "AF_UNIX"):
+        if os.path.exists(SOCKET_FILE):
+            os.remove(SOCKET_FILE)
+        server = socketserver.ThreadingUnixStreamServer(SOCKET_FILE, _RequestHandler)
+        os.chmod(SOCKET_FILE, 0o600)
+        return server, {"socket": SOCKET_FILE}
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", port or 0), _RequestHandler)
+    return server, {"port": server.server_address[1]}
+
+def write_serve_file(info):
+    # Created afresh so the token is never readable by others, whatever mode an old file had
+    if os.path.exists(SERVE_FILE):
+        os.remove(SERVE_FILE)
+    fd = os.open(SERVE_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+
+def run_serve(args):
+    """Entry point for the 'nexus serve' subcommand."""
+    info = daemon_info()
+    if args.stop or args.status:
+        try:
+            response = request("shutdown" if args.stop else "ping", info)
+        except DaemonError as e:
+            log.print(f"[bold yellow]⚠️ No daemon answered: {e}")
+            sys.exit(1)
+        if args.stop:
+            log.print(f"[cyan][Nexus] 🛑 Daemon {info.get('pid')} stopping.")
+        else:
+            log.print(f"[cyan][Nexus] 🛰️  Daemon {response['pid']}: up {response['uptime']}s, "
+                      f"{response['requests']:,} requests, {response['cache_entries']:,} cached sections.")
+        return
+
+    try:
+        request("ping", info)
+        log.print(f"[bold yellow]⚠️ A daemon is already serving this project (pid {info.get('pid')}).")
+        sys.exit(1)
+    except DaemonError:
+        pass
+
+    start = time.perf_counter()
+    resources = WarmResources()
+    with redirect_stdout(sys.stderr):
+        resources.warm_up()
+    daemon = Daemon(resources, secrets.token_hex(16))
+
+    os.makedirs(os.path.dirname(SERVE_FILE), exist_ok=True)
+    server, address = make_server(args.port)
+    server.daemon_threads = True
+    server.nexus = daemon
+    write_serve_file({"pid": os.getpid(), "token": daemon.token, **address})
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stopping.set())
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.2}, daemon=True).start()
+    where = address.get("socket") or f"127.0.0.1:{address.get('port')}"
+    log.print(f"[bold green]🛰️  Serving {os.getcwd()} on {where} (pid {os.getpid()}, warmed up in {time.perf_counter() - start:.2f}s).")
+    log.print("[cyan]`nexus scan` in this directory now runs on the daemon. Stop with Ctrl+C or `nexus serve --stop`.")
+
+    try:
+        while not daemon.stopping.wait(0.5):
+            idle = time.monotonic() - daemon.last
+            if idle > SAVE_AFTER_IDLE:
+                with resources.lock:
+                    resources.flush()
+            if args.idle_timeout and idle > args.idle_timeout:
+                log.print(f"[cyan][Nexus] Idle for {args.idle_timeout:g}s, shutting down.")
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        with resources.lock:
+            resources.flush()
+        for path in (SERVE_FILE, address.get("socket")):
+            if path and os.path.exists(path):
+                os.remove(path)
+        log.print("[cyan][Nexus] 🛑 Daemon stopped.")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+shards.py - Sharded Output Module for Nexus CLI
+Splits a report into numbered shard files along file/directory boundaries, plus an index.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from nexus_cli.report import ReportWriter, minify_text, SECTION_SEPARATOR
+
+# A shard this full is closed at the next directory change instead of splitting the directory
+DIRECTORY_BREAK = 0.8
+
+class Shard:
+    __slots__ = ("number", "path", "files", "tokens")
+
+    def __init__(self, number, path, tokens=0):
+        self.number = number
+        self.path = path
+        self.files = []
+        self.tokens = tokens
+
+def shard_path(out_path, number):
+    base, ext = os.path.splitext(out_path)
+    return f"{base}_{number:03d}{ext or '.md'}"
+
+def index_path(out_path):
+    base, ext = os.path.splitext(out_path)
+    return f"{base}_index{ext or '.md'}"
+
+def shard_header(header, number):
+    return header.replace("\n", f" (shard {number})\n", 1)
+
+class ShardWriter:
+    """
+    Streams sections into shards of at most `limit` tokens (a single larger section gets a
+    shard of its own). Section counts are settled in batches before placement, and the file
+    writes run on a background thread so disk I/O overlaps with rendering the next files.
+    """
+
+    def __init__(self, out_path, header, limit, minify=False, counter=None, batch_size=64):
+        self.out_path = out_path
+        self.header = header
+        self.limit = limit
+        self.minify = minify
+        self.counter = counter
+        self.batch_size = batch_size
+        self.shards = []
+        self._pending = []
+        self._writer = None
+        self._dir = None
+        self._io = ThreadPoolExecutor(max_workers=1)
+        self._jobs = []
+
+    def _measure(self, texts):
+        if self.counter is None or not self.counter.available:
+            return [0] * len(texts)
+        if self.minify:
+            texts = [minify_text(t) for t in texts]
+        return self.counter.measure_batch(texts)
+
+    def _open(self):
+        number = len(self.shards) + 1
+        header = shard_header(self.header, number)
+        shard = Shard(number, shard_path(self.out_path, number), self._measure([header])[0])
+        self.shards.append(shard)
+        self._writer = ReportWriter(shard.path, minify=self.minify)
+        self._jobs.append(self._io.submit(self._writer.write, header))
+        if self.counter is not None:
+            self.counter.total += shard.tokens
+
+    def _close(self):
+        if self._writer is not None:
+            self._jobs.append(self._io.submit(self._writer.close))
+            self._writer = None
+
+    def write_section(self, relpath, content, tokens=None, on_tokens=None, minified=False):
+        self._pending.append((relpath, content, tokens, on_tokens, minified))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        missing = [i for i, p in enumerate(pending) if p[2] is None]
+        counts = [p[2] for p in pending]
+        for i, n in zip(missing, self._measure([pending[i][1] + SECTION_SEPARATOR for i in missing])):
+            counts[i] = n
+
+        for (relpath, content, _, on_tokens, minified), n in zip(pending, counts):
+            directory = os.path.dirname(relpath)
+            shard = self.shards[-1] if self._writer is not None else None
+            if shard is None or (shard.files and (
+                    shard.tokens + n > self.limit or
+                    (shard.tokens >= self.limit * DIRECTORY_BREAK and directory != self._dir))):
+                self._close()
+                self._open()
+                shard = self.shards[-1]
+            self._dir = directory
+            shard.files.append((relpath, n))
+            shard.tokens += n
+            self._jobs.append(self._io.submit(self._writer.write_section, content, n, None, minified))
+            if self.counter is not None:
+                self.counter.total += n
+            if on_tokens: on_tokens(n)
+
+    def close(self):
+        try:
+            self.flush()
+            self._close()
+        finally:
+            self._io.shutdown()
+        for job in self._jobs:
+            job.result()
+        return self.shards
+
+def partition_sections(sections, count):
+    """
+    Splits sections (with known tokens) into at most `count` contiguous, token-balanced groups.
+    Each group aims at the remaining tokens divided by the remaining groups. A group is cut at a
+    directory change, or inside a directory only when the rest of it would overshoot by 20%.
+    """
+    dirs = [os.path.dirname(s.entry.relpath) for s in sections]
+    # Tokens from each section to the end of its run of same-directory sections
+    run_rest = [0] * len(sections)
+    for i in range(len(sections) - 1, -1, -1):
+        run_rest[i] = sections[i].tokens + (run_rest[i + 1] if i + 1 < len(sections) and dirs[i + 1] == dirs[i] else 0)
+
+    remaining = sum(s.tokens for s in sections)
+    groups, used = [[]], 0
+    target = remaining / max(1, count)
+    for i, s in enumerate(sections):
+        if groups[-1] and len(groups) < count and used + s.tokens > target and (
+                dirs[i] != dirs[i - 1] or used + run_rest[i] > target * 1.2):
+            remaining -= used
+            groups.append([])
+            used = 0
+            target = remaining / (count - len(groups) + 1)
+        groups[-1].append(s)
+        used += s.tokens
+    return [g for g in groups if g]
+
+def write_shards(out_path, header, groups, minify=False, counter=None, minified=False):
+    """Writes one shard per group of sections, all shards concurrently. Returns the Shards."""
+    def write(number, group):
+        text = shard_header(header, number)
+        shard = Shard(number, shard_path(out_path, number))
+        with ReportWriter(shard.path, minify=minify) as writer:
+            writer.write(text)
+            for s in group:
+                writer.write_section(s.content, s.tokens, None, minified)
+                shard.files.append((s.entry.relpath, s.tokens))
+        shard.tokens = sum(n for _, n in shard.files)
+        return shard
+
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(groups)))) as pool:
+        shards = list(pool.map(write, range(1, len(groups) + 1), groups))
+    if counter is not None and counter.available:
+        for shard, n in zip(shards, counter.measure_batch([shard_header(header, s.number) for s in shards])):
+            shard.tokens += n
+            counter.total += shard.tokens
+    return shards
+
+def write_index(out_path, project_name, shards, limit=None):
+    """Writes the markdown index listing every shard, its files and token counts."""
+    total = sum(s.tokens for s in shards)
+    files = sum(len(s.files) for s in shards)
+    lines = [f"# NEXUS CONTEXT INDEX: {project_name}", f"**Generated:** {datetime.now()}", ""]
+    summary = f"- Shards: {len(shards)} | Files: {files:,} | Tokens: {total:,}"
+    if limit:
+        summary += f" (limit {limit:,} per shard)"
+    lines += [summary, "", "| Shard | File | Files | Tokens | First | Last |", "|---|---|---|---|---|---|"]
+    for s in shards:
+        first, last = (s.files[0][0], s.files[-1][0]) if s.files else ("", "")
+        lines.append(f"| {s.number} | {os.path.basename(s.path)} | {len(s.files):,} | {s.tokens:,} | {first} | {last} |")
+    for s in shards:
+        lines += ["", f"## {os.path.basename(s.path)}"]
+        lines += [f"- {relpath} ({n:,})" for relpath, n in s.files]
+    path = index_path(out_path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
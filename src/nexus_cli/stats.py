@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+stats.py - Instrumentation Module for Nexus CLI
+Times the phases of a scan (walk, ignore, handlers, minify, tokenize, write, ...) and,
+for --stats, records per-file handler time, sizes, tokens and errors.
+"""
+
+import threading
+from contextlib import nullcontext
+from time import perf_counter
+
+class NullTimer:
+    """The default when nothing is measured: every hook hands back its input untouched."""
+
+    _context = nullcontext()
+    # Called as on_render(path, translator, seconds) by worker pools; None skips the timing
+    on_render = None
+
+    def phase(self, name):
+        return self._context
+
+    def wrap(self, func, name):
+        return func
+
+    def wrap_handler(self, render):
+        return render
+
+    def instrument(self, obj, name, *methods):
+        pass
+
+    def file(self, entry, translator, content, duplicate=False):
+        pass
+
+    def error(self, entry, translator, error):
+        pass
+
+NULL_TIMER = NullTimer()
+
+class PhaseTimer(NullTimer):
+    """
+    Accumulates exclusive wall time per phase: when a timed call runs inside another one
+    (e.g. tokenizing while writing), the inner time is charged to the inner phase only.
+    Only calls made on the thread that created the timer are timed.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self._stack = []
+        self._mark = perf_counter()
+        self._owner = threading.get_ident()
+
+    def _charge(self, now):
+        if self._stack:
+            phase = self._stack[-1]
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + now - self._mark
+        self._mark = now
+
+    def enter(self, phase):
+        self._charge(perf_counter())
+        self._stack.append(phase)
+
+    def exit(self):
+        self._charge(perf_counter())
+        phase = self._stack.pop()
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def wrap(self, func, name):
+        def timed(*args, **kwargs):
+            if threading.get_ident() != self._owner:
+                return func(*args, **kwargs)
+            self.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.exit()
+        return timed
+
+    def wrap_handler(self, render):
+        """Times render(translator, path) under one 'handler:<translator>' phase per translator."""
+        def timed(translator, path):
+            if threading.get_ident() != self._owner:
+                return render(translator, path)
+            self.enter(f"handler:{translator}")
+            try:
+                return render(translator, path)
+            finally:
+                self.exit()
+        return timed
+
+    def instrument(self, obj, name, *methods):
+        """Replaces the given bound methods of obj with timed versions."""
+        for method in methods:
+            setattr(obj, method, self.wrap(getattr(obj, method), name))
+
+class _Phase:
+    __slots__ = ("timer", "name")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer.enter(self.name)
+
+    def __exit__(self, *exc):
+        self.timer.exit()
+
+# --- Per-File Statistics ---
+RENDERED, CACHED, DUPLICATE, FAILED = "rendered", "cached", "duplicate", "failed"
+
+class FileStats:
+    __slots__ = ("relpath", "translator", "status", "seconds", "bytes", "output", "tokens", "error")
+
+    def __init__(self, relpath, translator, status, seconds=0.0, size=0, output=0, error=None):
+        self.relpath = relpath
+        self.translator = translator
+        self.status = status
+        self.seconds = seconds
+        self.bytes = size
+        self.output = output
+        self.tokens = None
+        self.error = error
+
+def section_error(content):
+    """Built-in handlers report failures as a '### <KIND> ERROR: ...' section instead of raising."""
+    first = content[:200].split("\n", 1)[0]
+    return first[4:] if first.startswith("### ") and " ERROR" in first.split(":", 1)[0] else None
+
+class ScanStats(PhaseTimer):
+    """
+    Phase times plus one FileStats per scanned file. Handler time is measured around each
+    handler call, in the worker when the scan runs with -j (see HandlerPool); files served
+    from the scan cache or replaced by a duplicate reference have no handler time.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.started = perf_counter()
+        self.total = None
+        self.files = {}
+        self._times = {}
+
+    def on_render(self, path, translator, seconds):
+        self._times[path] = seconds
+
+    def wrap_handler(self, render):
+        timed_phase = super().wrap_handler(render)
+        def timed(translator, path):
+            start = perf_counter()
+            try:
+                return timed_phase(translator, path)
+            finally:
+                self.on_render(path, translator, perf_counter() - start)
+        return timed
+
+    def _size(self, entry):
+        try:
+            return entry.stat().st_size
+        except OSError:
+            return 0
+
+    def file(self, entry, translator, content, duplicate=False):
+        seconds = self._times.pop(entry.path, None)
+        status = DUPLICATE if duplicate else CACHED if seconds is None else RENDERED
+        self.files[entry.relpath] = FileStats(entry.relpath, translator, status, seconds or 0.0, self._size(entry),
+                                              len(content), section_error(content) if content else None)
+
+    def error(self, entry, translator, error):
+        seconds = self._times.pop(entry.path, 0.0)
+        self.files[entry.relpath] = FileStats(entry.relpath, translator, FAILED, seconds, self._size(entry),
+                                              error=f"{type(error).__name__}: {error}")
+
+    def add_tokens(self, breakdown):
+        """Attaches token counts from the scan's (relpath, translator, tokens) rows."""
+        for relpath, _, n in breakdown:
+            record = self.files.get(relpath)
+            if record is not None:
+                record.tokens = n
+
+    def finish(self):
+        self.total = perf_counter() - self.started
+
+    def by_translator(self):
+        """Returns {translator: {files, rendered, cached, errors, seconds, bytes, output, tokens}}."""
+        totals = {}
+        for f in self.files.values():
+            t = totals.setdefault(f.translator, {"files": 0, "rendered": 0, "cached": 0, "errors": 0,
+                                                 "seconds": 0.0, "bytes": 0, "output": 0, "tokens": 0})
+            t["files"] += 1
+            t["rendered"] += f.status == RENDERED
+            t["cached"] += f.status == CACHED
+            t["errors"] += f.error is not None
+            t["seconds"] += f.seconds
+            t["bytes"] += f.bytes
+            t["output"] += f.output
+            t["tokens"] += f.tokens or 0
+        return totals
+
+    def phases(self):
+        """Returns [(phase, seconds, calls)], with 'other' for time outside every timed phase."""
+        rows = sorted(((p, s, self.calls.get(p, 0)) for p, s in self.seconds.items()), key=lambda row: -row[1])
+        if self.total is not None:
+            rows.append(("other", max(0.0, self.total - sum(self.seconds.values())), 0))
+        return rows
+
+    def slowest(self, top_n):
+        ranked = sorted(self.files.values(), key=lambda f: -f.seconds)
+        return ranked[:top_n or None]
+
+    def to_dict(self):
+        return {
+            "total_seconds": round(self.total or 0.0, 6),
+            "phases": {p: {"seconds": round(s, 6), "calls": n} for p, s, n in self.phases()},
+            "translators": {t: {**v, "seconds": round(v["seconds"], 6)} for t, v in sorted(self.by_translator().items())},
+            "files": [{name: (round(getattr(f, name), 6) if name == "seconds" else getattr(f, name)) for name in FileStats.__slots__}
+                      for f in sorted(self.files.values(), key=lambda f: -f.seconds)],
+        }
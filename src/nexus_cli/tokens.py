@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+tokens.py - Token Estimation Module for Nexus CLI
+Counts report tokens incrementally, one section at a time.
+"""
+
+import os
+
+ENCODING_NAME = "cl100k_base"
+
+def _read_bpe(path, expected_hash=None):
+    """Parses a .tiktoken BPE file ("<base64 token> <rank>" lines), checking its sha256 first."""
+    import base64
+    import hashlib
+    with open(path, "rb") as f:
+        contents = f.read()
+    if expected_hash and hashlib.sha256(contents).hexdigest() != expected_hash:
+        raise ValueError(f"{path} does not match the published sha256 of the encoding")
+    ranks = {}
+    for line in contents.splitlines():
+        if line:
+            token, rank = line.split()
+            ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+def load_encoding(name=ENCODING_NAME, bpe_file=None, cache_dir=None):
+    """
+    Loads a tiktoken encoding without network access when given a local BPE file.
+    `bpe_file` replaces the download URL of the named encoding; `cache_dir` is a pre-seeded
+    tiktoken cache directory (files named by the sha1 of the URL). The published sha256 is
+    checked either way, and nothing process-wide (environment, tiktoken's modules) changes.
+    """
+    import tiktoken
+    if not (bpe_file or cache_dir):
+        return tiktoken.get_encoding(name)
+
+    import types
+    import hashlib
+    import tiktoken_ext.openai_public as openai_public
+    constructor = getattr(openai_public, name, None)
+    if not isinstance(constructor, types.FunctionType):
+        raise ValueError(f"Unknown encoding '{name}'")
+
+    def load_local(url, expected_hash=None):
+        path = bpe_file or os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest())
+        return _read_bpe(path, expected_hash)
+
+    # A copy of the constructor with its own globals loads through load_local; the module
+    # itself is untouched, so concurrent loads (serve, thread pools) are unaffected
+    local = types.FunctionType(constructor.__code__, {**constructor.__globals__, "load_tiktoken_bpe": load_local},
+                               constructor.__name__, constructor.__defaults__, constructor.__closure__)
+    return tiktoken.Encoding(**local())
+
+class TokenCounter:
+    """
+    Accumulates a running token total.
+    Counting per section can drift from a single-shot count of the whole report by a few
+    tokens, because BPE merges never cross the section boundaries. Every section ends with
+    the "\n---\n" separator, so in practice the drift is zero or a handful of tokens.
+    """
+
+    def __init__(self, encoding_name=ENCODING_NAME, bpe_file=None, cache_dir=None, threads=None):
+        self.total = 0
+        self.name = encoding_name
+        self.threads = threads or min(8, os.cpu_count() or 1)
+        self.error = None
+        try:
+            self.encoder = load_encoding(encoding_name, bpe_file, cache_dir)
+        except Exception as e:
+            self.encoder = None
+            self.error = e
+
+    @property
+    def available(self):
+        return self.encoder is not None
+
+    def measure(self, text):
+        """Returns the token count of text without touching the running total."""
+        if self.encoder is None:
+            return 0
+        return len(self.encoder.encode(text, disallowed_special=()))
+
+    def measure_batch(self, texts):
+        """Token counts for many texts at once; tiktoken encodes them across a thread pool."""
+        if self.encoder is None:
+            return [0] * len(texts)
+        if len(texts) < 2:
+            return [self.measure(t) for t in texts]
+        encoded = self.encoder.encode_batch(texts, num_threads=self.threads, disallowed_special=())
+        return [len(tokens) for tokens in encoded]
+
+    def count(self, text):
+        """Counts the tokens of text, adds them to the running total and returns them."""
+        n = self.measure(text)
+        self.total += n
+        return n
+
+# --- Fast Estimation ---
+# Characters per cl100k_base token, calibrated with benchmarks/bench_token_estimate.py.
+# The section kind is read from the handler's "### KIND:" header line.
+CHARS_PER_TOKEN = {
+    "CODE": 4.0,
+    "TEXT": 3.6,
+    "DATA": 2.6,
+    "PDF": 3.6,
+    "IMAGE": 2.7,
+    None: 3.8,
+}
+
+def section_kind(text):
+    """Returns the KIND of a '### KIND: name' section header, or None for other text."""
+    if text.startswith("### "):
+        colon = text.find(":", 4, 40)
+        if colon != -1:
+            return text[4:colon].split(" ", 1)[0] or None
+    return None
+
+class FastEstimator:
+    """
+    Drop-in TokenCounter replacement that estimates from character counts per section kind.
+    Orders of magnitude cheaper than BPE encoding; see the benchmark for its error.
+    """
+
+    def __init__(self, chars_per_token=None):
+        self.total = 0
+        self.name = "estimate"
+        self.error = None
+        overrides = dict(chars_per_token or {})
+        if "default" in overrides:
+            overrides[None] = overrides.pop("default")
+        self.ratios = {**CHARS_PER_TOKEN, **overrides}
+
+    @property
+    def available(self):
+        return True
+
+    def measure(self, text):
+        ratio = self.ratios.get(section_kind(text)) or self.ratios[None]
+        return int(round(len(text) / ratio))
+
+    def measure_batch(self, texts):
+        return [self.measure(t) for t in texts]
+
+    def count(self, text):
+        n = self.measure(text)
+        self.total += n
+        return n
+
+def make_counter(settings=None, estimate="exact", threads=None):
+    """Builds the counter described by the "tokenizer" block of nexus.json."""
+    settings = settings or {}
+    if (estimate or settings.get("estimate", "exact")) == "fast":
+        return FastEstimator(settings.get("chars_per_token"))
+    return TokenCounter(settings.get("encoding", ENCODING_NAME), settings.get("bpe_file"), settings.get("cache_dir"), threads)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+walker.py - Traversal Engine for Nexus CLI
+Walks the configured watch_dirs with os.scandir, pruning ignored directories as it goes.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from nexus_cli.ignore import normalize_path, GITIGNORE
+
+class FileEntry:
+    """A walked file. stat() reuses the DirEntry's cached result instead of re-statting the path."""
+
+    __slots__ = ("path", "relpath", "name", "_entry", "_stat")
+
+    def __init__(self, path, relpath, name, entry=None):
+        self.path = path
+        self.relpath = relpath
+        self.name = name
+        self._entry = entry
+        self._stat = None
+
+    @property
+    def ext(self):
+        return self.name.split(".")[-1].lower()
+
+    def stat(self):
+        if self._stat is None:
+            self._stat = self._entry.stat() if self._entry is not None else os.stat(self.path)
+        return self._stat
+
+def dedupe_roots(watch_dirs):
+    """Drops missing directories and any watch dir that is equal to or nested inside another one."""
+    kept = []
+    for directory in watch_dirs:
+        if not os.path.isdir(directory):
+            continue
+        real = os.path.realpath(directory)
+        if any(real == r or real.startswith(r.rstrip(os.sep) + os.sep) for _, r in kept):
+            continue
+        kept = [(d, r) for d, r in kept if not r.startswith(real.rstrip(os.sep) + os.sep)]
+        kept.append((directory, real))
+    return [d for d, _ in kept]
+
+class Walker:
+    """
+    Pre-order scandir walk (a directory's files, then its subdirectories, both sorted by name).
+    Overlapping watch_dirs are walked once, symlinked directories are only followed when asked
+    to (with loop detection), and with jobs > 1 the subtrees directly below each root are
+    walked concurrently while the output order stays the same. `on_dir(path)` is called for
+    every directory that is listed (e.g. to register file system watches).
+    """
+
+    def __init__(self, matcher=None, follow_symlinks=False, jobs=1, on_error=None, on_dir=None):
+        self.matcher = matcher
+        self.follow_symlinks = follow_symlinks
+        self.jobs = jobs
+        self.on_error = on_error
+        self.on_dir = on_dir
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def _first_visit(self, st):
+        key = (st.st_dev, st.st_ino)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            return True
+
+    def list_dir(self, path):
+        """
+        Returns (files, subdirs) of one directory after ignore filtering. Entry types come from
+        the directory listing itself, so only symlinks ever need a stat call.
+        """
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            if self.on_error: self.on_error(path, e)
+            return [], []
+        if self.on_dir: self.on_dir(path)
+
+        rel = normalize_path(path)
+        prefix = f"{rel}/" if rel else ""
+        matcher = self.matcher
+        if matcher is not None:
+            matcher.enter_dir(rel, any(e.name == GITIGNORE for e in entries))
+
+        files, dirs = [], []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                    if matcher is not None and matcher.match(prefix + entry.name, is_dir=True):
+                        continue
+                    if self.follow_symlinks and not self._first_visit(entry.stat()):
+                        continue
+                    dirs.append(entry.path)
+                elif entry.is_file():
+                    if matcher is not None and matcher.match(prefix + entry.name):
+                        continue
+                    files.append(FileEntry(entry.path, prefix + entry.name, entry.name, entry))
+            except OSError as e:
+                if self.on_error: self.on_error(entry.path, e)
+        return files, dirs
+
+    def _walk_tree(self, top):
+        stack = [top]
+        while stack:
+            files, dirs = self.list_dir(stack.pop())
+            yield from files
+            stack.extend(reversed(dirs))
+
+    def walk(self, watch_dirs):
+        """Yields a FileEntry for every non-ignored file under the watch dirs."""
+        for top in dedupe_roots(watch_dirs):
+            if self.follow_symlinks and not self._first_visit(os.stat(top)):
+                continue
+            files, dirs = self.list_dir(top)
+            yield from files
+            if self.jobs > 1 and len(dirs) > 1:
+                with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                    for subtree in pool.map(lambda d: list(self._walk_tree(d)), dirs):
+                        yield from subtree
+            else:
+                for d in dirs:
+                    yield from self._walk_tree(d)
+
+def walk_files(watch_dirs, matcher=None, follow_symlinks=False, jobs=1, on_error=None):
+    """Convenience wrapper around Walker.walk."""
+    return Walker(matcher, follow_symlinks, jobs, on_error).walk(watch_dirs)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+watch.py - Watch Mode Module for Nexus CLI
+Runs one full scan, then keeps the snapshot current by re-rendering only the files that change.
+"""
+
+import os
+import time
+import bisect
+import select
+import struct
+from datetime import datetime
+
+from nexus_cli.context import load_config, load_custom_handlers, console, HandlerPool, render_tasks
+from nexus_cli.handlers import REGISTRY, configure_handlers, handler_salt, pdf_cache_policy
+from nexus_cli.cache import ScanCache, CACHE_DIR
+from nexus_cli.client import SERVE_FILE
+from nexus_cli.ignore import ProjectIgnore, normalize_path, GITIGNORE
+from nexus_cli.walker import Walker, FileEntry, dedupe_roots
+from nexus_cli.report import ReportWriter, Section
+from nexus_cli.tokens import make_counter
+from nexus_cli.minify import Minifier
+
+CONFIG_FILE = "nexus.json"
+DEFAULT_OUTPUT = "context_watch.md"
+
+# --- Change Sources ---
+IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+IN_DELETE_SELF, IN_MOVE_SELF = 0x400, 0x800
+IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """
+    Recursive watches through libc's inotify (Linux only); directories are added as the walker
+    lists them. Raises OSError when inotify is unavailable. A failed add_dir (e.g. the
+    max_user_watches limit) is kept in `failed` so the caller can fall back to polling.
+    """
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._get_errno = ctypes.get_errno
+        self.paths = {}
+        self.failed = None
+
+    def add_dir(self, path):
+        if self.failed is not None:
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = self._get_errno()
+            self.failed = OSError(err, os.strerror(err), path)
+            return
+        # Adding an already watched (e.g. moved) directory returns its wd, so this re-points it
+        self.paths[wd] = path
+
+    def poll(self, timeout):
+        """Waits up to timeout seconds; returns changed paths, or None if events were lost."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                base = self.paths.get(wd)
+                if mask & IN_IGNORED:
+                    self.paths.pop(wd, None)
+                elif base is not None:
+                    changed.append(os.path.join(base, name) if name else base)
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """
+    Fallback change source: re-walks the tree every interval and diffs (size, mtime) per file.
+    `extra` paths are stat'ed as well, even when the walk ignores them (e.g. nexus.json).
+    """
+
+    def __init__(self, walk, interval=1.0, extra=()):
+        self.walk = walk
+        self.interval = interval
+        self.extra = extra
+        self.failed = None
+        self._state = self._snapshot()
+
+    def _snapshot(self):
+        state = {}
+        for entry in self.walk():
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            state[entry.path] = (st.st_size, st.st_mtime_ns)
+        for path in self.extra:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def add_dir(self, path):
+        pass
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        old, self._state = self._state, self._snapshot()
+        changed = [p for p, sig in self._state.items() if old.get(p) != sig]
+        return changed + [p for p in old if p not in self._state]
+
+    def close(self):
+        pass
+
+# --- Snapshot ---
+class Snapshot:
+    """
+    The rendered sections of every watched file, kept in walk order.
+    Updates re-render only the changed files; unchanged sections keep their token counts,
+    so rewriting the report only encodes what changed.
+    """
+
+    def __init__(self, roots, config, out_path, minifier, counter, cache, pool, matcher):
+        self.roots = [normalize_path(r) for r in roots]
+        self.config = config
+        self.out_path = out_path
+        self.minifier = minifier
+        self.counter = counter
+        self.cache = cache
+        self.pool = pool
+        self.matcher = matcher
+        self.sections = {}
+        self.order = []
+        out = normalize_path(os.path.relpath(os.path.abspath(out_path)))
+        self.own_files = {out, out + ".tmp"}
+
+    def order_key(self, relpath):
+        """Sort key reproducing the walker's order: a directory's files before its subdirectories."""
+        for i, root in enumerate(self.roots):
+            if not root or relpath.startswith(root + "/"):
+                parts = (relpath[len(root) + 1:] if root else relpath).split("/")
+                return (i, tuple((1, d) for d in parts[:-1]) + ((0, parts[-1]),))
+        return (len(self.roots), ((0, relpath),))
+
+    def translator_for(self, entry):
+        translator = self.config["translators"].get(entry.ext)
+        return translator if translator in REGISTRY else None
+
+    def render(self, entries):
+        """Renders entries (FileEntry) into the snapshot; returns how many sections changed."""
+        # The report (and its temp file) may already exist when the watch starts; never include it
+        tasks = [(e, t) for e in entries if e.relpath not in self.own_files for t in [self.translator_for(e)] if t]
+        on_error = lambda entry, e: console.print(f"[bold red]! Error reading {entry.name}: {e}")
+        changed = 0
+        for entry, translator, content in render_tasks(tasks, self.pool, self.cache, on_error):
+            old = self.sections.get(entry.relpath)
+            if not content:
+                changed += self.remove(entry.relpath)
+                continue
+            if self.minifier:
+                content = self.minifier.apply(content, entry.ext)
+            if old is not None and old.content == content:
+                continue
+            if old is None:
+                bisect.insort(self.order, (self.order_key(entry.relpath), entry.relpath))
+            self.sections[entry.relpath] = Section(entry, translator, content)
+            changed += 1
+        return changed
+
+    def remove(self, relpath):
+        if relpath not in self.sections:
+            return 0
+        del self.sections[relpath]
+        i = bisect.bisect_left(self.order, (self.order_key(relpath), relpath))
+        del self.order[i]
+        return 1
+
+    def remove_tree(self, reldir):
+        prefix = reldir + "/"
+        return sum(self.remove(p) for p in [p for p in self.sections if p.startswith(prefix)])
+
+    def apply(self, paths, walker):
+        """
+        Folds a batch of changed OS paths into the snapshot. Returns the number of changed
+        sections, or None when the batch touches nexus.json or a .gitignore and needs a full rescan.
+        """
+        entries, changed = {}, 0
+        for path in set(paths):
+            relpath = normalize_path(os.path.relpath(path))
+            if relpath in self.own_files:
+                continue
+            name = os.path.basename(relpath)
+            if relpath == CONFIG_FILE or (name == GITIGNORE and self.config.get("use_gitignore")):
+                return None
+            if os.path.isdir(path):
+                if not self.matcher.match(relpath, is_dir=True):
+                    for entry in walker.walk([path]):
+                        entries[entry.relpath] = entry
+            elif os.path.isfile(path):
+                if not self.matcher.match(relpath):
+                    entries[relpath] = FileEntry(path, relpath, name)
+            else:
+                changed += self.remove(relpath) + self.remove_tree(relpath)
+        return changed + self.render(entries.values())
+
+    def write(self):
+        """Rewrites the report atomically, encoding only the sections without a known count."""
+        self.counter.total = 0
+        tmp_path = self.out_path + ".tmp"
+        with ReportWriter(tmp_path, minify=self.minifier is not None, counter=self.counter) as writer:
+            writer.write(f"# NEXUS CONTEXT REPORT: {self.config.get('project_name')}\n**Generated:** {datetime.now()}\n\n")
+            for _, relpath in self.order:
+                s = self.sections[relpath]
+                on_tokens = None if s.tokens is not None else (lambda n, s=s: setattr(s, "tokens", n))
+                writer.write_section(s.content, s.tokens, on_tokens, minified=self.minifier is not None)
+        os.replace(tmp_path, self.out_path)
+
+# --- Session ---
+def copy_report(out_path):
+    try:
+        import pyperclip
+        with open(out_path, "r", encoding="utf-8") as f:
+            pyperclip.copy(f.read())
+    except Exception as e:
+        console.print(f"[bold red]❌ Clipboard Error: {e}")
+
+def watch_session(args):
+    """
+    One full scan followed by incremental updates.
+    Returns True when the configuration changed and the caller should start a fresh session.
+    """
+    config = load_config()
+    load_custom_handlers()
+    handler_opts = config.get("handlers", {})
+    render_opts = pdf_cache_policy(handler_opts, not getattr(args, 'no_cache', False))
+    configure_handlers(render_opts)
+
+    cache = None
+    if not getattr(args, 'no_cache', False):
+        cache = ScanCache(
+            verify_hash=config.get("cache", {}).get("verify_hash", False),
+            salt=handler_salt(handler_opts)
+        )
+    matcher = ProjectIgnore.from_config(config, extra=[f"/{normalize_path(CACHE_DIR)}/", f"/{normalize_path(SERVE_FILE)}"])
+    out_path = args.output or DEFAULT_OUTPUT
+    counter = make_counter(config.get("tokenizer"), getattr(args, 'token_estimate', None))
+    if counter.error is not None:
+        console.print("[bold yellow]⚠️ Tokenizer unavailable; token counts are disabled.")
+    jobs = max(1, args.jobs or 1)
+    roots = dedupe_roots(config.get("watch_dirs", ["."]))
+
+    watcher = None
+    if not args.poll:
+        try:
+            watcher = InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            console.print(f"[bold yellow]⚠️ inotify unavailable ({e}); falling back to polling.")
+
+    def make_walker(on_dir=None):
+        return Walker(
+            matcher,
+            follow_symlinks=config.get("follow_symlinks", False),
+            jobs=jobs,
+            on_error=lambda path, e: console.print(f"[bold red]! Error reading {path}: {e}"),
+            on_dir=on_dir
+        )
+
+    pool = HandlerPool(jobs, render_opts)
+    minifier = Minifier(config.get("minify")) if args.minify else None
+    snapshot = Snapshot(roots, config, out_path, minifier, counter, cache, pool, matcher)
+    try:
+        start = time.perf_counter()
+        with console.status("[bold cyan][Nexus] Initial scan...", spinner="dots"):
+            snapshot.render(make_walker(watcher.add_dir if watcher else None).walk(roots))
+            snapshot.write()
+        if cache:
+            cache.save()
+        if watcher is not None and watcher.failed is not None:
+            console.print(f"[bold yellow]⚠️ Could not watch every directory ({watcher.failed}); falling back to polling.")
+            watcher.close()
+            watcher = None
+        if watcher is None:
+            watcher = PollingWatcher(lambda: make_walker().walk(roots), args.interval, [CONFIG_FILE])
+        if args.copy:
+            copy_report(out_path)
+
+        mode = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+        token_msg = f" (~{counter.total:,} tokens)" if counter.available else ""
+        console.print(f"[bold green]✅ {len(snapshot.sections):,} files in {time.perf_counter() - start:.2f}s → [white]{out_path}{token_msg}")
+        console.print(f"[cyan][Nexus] 👀 Watching {', '.join(roots)} ({mode}). Press Ctrl+C to stop.")
+
+        dir_walker = make_walker(watcher.add_dir)
+        while True:
+            changed = watcher.poll(1.0)
+            if not changed and changed is not None:
+                continue
+            # Debounce: keep collecting until the tree has been quiet for args.debounce seconds
+            deadline = time.monotonic() + max(args.debounce * 10, 2.0)
+            while changed is not None and time.monotonic() < deadline:
+                more = watcher.poll(args.debounce)
+                if not more:
+                    changed = None if more is None else changed
+                    break
+                changed += more
+            if changed is None:
+                console.print("[bold yellow]⚠️ Event queue overflowed; rescanning.")
+                return True
+
+            start = time.perf_counter()
+            updated = snapshot.apply(changed, dir_walker)
+            if updated is None:
+                console.print("[cyan][Nexus] ⚙️  Configuration changed; rescanning.")
+                return True
+            if not updated:
+                continue
+            snapshot.write()
+            if args.copy:
+                copy_report(out_path)
+            token_msg = f" (~{counter.total:,} tokens)" if counter.available else ""
+            stamp = datetime.now().strftime("%H:%M:%S")
+            console.print(f"[cyan][{stamp}] 🔄 {updated} section(s) updated in {time.perf_counter() - start:.2f}s{token_msg}")
+    finally:
+        pool.close()
+        if watcher is not None:
+            watcher.close()
+        if cache:
+            try:
+                cache.save()
+            except OSError as e:
+                console.print(f"[bold yellow]⚠️ Failed to save scan cache: {e}")
+
+def run_watch(args):
+    """Entry point for the 'nexus watch' subcommand."""
+    try:
+        while watch_session(args):
+            pass
+    except KeyboardInterrupt:
+        console.print("\n[cyan][Nexus] 👋 Watch stopped.")
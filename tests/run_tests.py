@@ -1,6 +1,9 @@
 import os
+import sys
 import shutil
 import json
+import subprocess
+import time
 from pathlib import Path
 
 # Save the base directory so we can always return to it safely
@@ -36,6 +39,13 @@ def test_route_a_new_project():
         print("❌ Scaffold FAILED")
         return False
 
+    # The saved plan replays into another directory without re-parsing the tree
+    replay_dir = TEST_DIR / "replay"
+    cmd_replay = f"nexus scaffold --from-plan {TEST_DIR / 'api_project_plan.json'} -o {replay_dir} --yes"
+    if os.system(cmd_replay) != 0 or not (replay_dir / "api_project/src/main.py").exists():
+        print("❌ Scaffold plan replay FAILED")
+        return False
+
     # Navigate into the newly scaffolded project
     os.chdir(TEST_DIR / "api_project")
 
@@ -101,24 +111,667 @@ def test_route_b_legacy_project():
         print("❌ Scan FAILED")
         return False
 
+    # 4. The same scan as compressed JSONL must render back to the same markdown
+    print("\n[Extra] Running 'nexus scan --format jsonl' and 'nexus render'...")
+    if os.system("nexus scan --format jsonl -o CONTEXT.jsonl.gz") != 0 or os.system("nexus render CONTEXT.jsonl.gz -o RENDERED.md") != 0:
+        print("❌ JSONL output FAILED")
+        return False
+    strip = lambda path: [l for l in Path(path).read_text(encoding="utf-8").splitlines() if not l.startswith("**Generated:**")]
+    if strip("CONTEXT.md") != strip("RENDERED.md"):
+        print("❌ JSONL output FAILED: rendered markdown differs from the markdown scan.")
+        return False
+
     # Return to base directory
     os.chdir(BASE_DIR)
     print("\n✅ ROUTE B (Legacy Project Workflow): PASSED")
     return True
 
+def test_route_c_startup_imports():
+    """
+    ROUTE C: Startup Cost
+    Importing the CLI (and registering the built-in handlers) must not pull in heavy dependencies.
+    """
+    print("\n" + "="*50)
+    print("⚡ ROUTE C: LAZY IMPORTS")
+    print("="*50)
+
+    heavy = ["pandas", "PIL", "pypdf", "tiktoken", "pyperclip"]
+    probe = (
+        "import sys, nexus_cli.main, nexus_cli.init, nexus_cli.scaffolding, nexus_cli.handlers, nexus_cli.client; "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True)
+    loaded = result.stdout.strip()
+    if result.returncode != 0 or loaded:
+        print(f"❌ Startup imports FAILED: {loaded or result.stderr.strip()}")
+        return False
+
+    print("\n✅ ROUTE C (Lazy Imports): PASSED")
+    return True
+
+def test_route_d_benchmark():
+    """
+    ROUTE D: Benchmark Smoke Test
+    Workflow: nexus bench on the tiny corpus -> JSON results -> regression gate against itself
+    """
+    print("\n" + "="*50)
+    print("⏱️  ROUTE D: BENCHMARK SUITE")
+    print("="*50)
+
+    results = TEST_DIR / "bench.json"
+    cmd_bench = f"nexus bench --size tiny --repeat 1 --dir {TEST_DIR / 'bench'} -o {results}"
+    if os.system(cmd_bench) != 0 or not results.exists():
+        print("❌ Bench FAILED")
+        return False
+
+    with open(results, "r", encoding="utf-8") as f:
+        metrics = json.load(f).get("metrics", {})
+    if not all(m in metrics for m in ("scaffold", "init", "scan.total", "scan.walk", "scan.handler:code")):
+        print(f"❌ Bench FAILED: missing metrics in {sorted(metrics)}")
+        return False
+
+    # The gate itself is exercised; the tolerance is generous so timing noise cannot fail it
+    cmd_gate = f"nexus bench --size tiny --repeat 1 --baseline {results} --tolerance 100 -o {TEST_DIR / 'bench2.json'}"
+    if os.system(cmd_gate) != 0:
+        print("❌ Bench regression gate FAILED")
+        return False
+
+    print("\n✅ ROUTE D (Benchmark Suite): PASSED")
+    return True
+
+def test_route_e_daemon():
+    """
+    ROUTE E: Warm Daemon
+    Workflow: nexus serve -> nexus scan (forwarded to the daemon) -> same report as a local scan -> nexus serve --stop
+    """
+    print("\n" + "="*50)
+    print("🛰️  ROUTE E: WARM DAEMON")
+    print("="*50)
+
+    os.chdir(TEST_DIR / "legacy_app")
+    daemon = subprocess.Popen(["nexus", "serve", "--idle-timeout", "60"])
+    try:
+        deadline = time.time() + 15
+        while not Path(".nexus/serve.json").exists() and time.time() < deadline:
+            time.sleep(0.1)
+        if not Path(".nexus/serve.json").exists():
+            print("❌ Daemon FAILED to start")
+            return False
+        if os.name != "nt" and Path(".nexus/serve.json").stat().st_mode & 0o077:
+            print("❌ serve.json (which holds the daemon's token) is readable by other users")
+            return False
+
+        if os.system("nexus scan -o DAEMON_REPORT.md") != 0 or os.system("nexus scan --no-daemon -o LOCAL_REPORT.md") != 0:
+            print("❌ Daemon scan FAILED")
+            return False
+        strip = lambda p: [l for l in Path(p).read_text(encoding="utf-8").splitlines() if not l.startswith("**Generated:**")]
+        if strip("DAEMON_REPORT.md") != strip("LOCAL_REPORT.md"):
+            print("❌ Daemon report differs from a local scan")
+            return False
+
+        if os.system("nexus serve --stop") != 0 or daemon.wait(timeout=15) != 0:
+            print("❌ Daemon stop FAILED")
+            return False
+    finally:
+        if daemon.poll() is None:
+            daemon.kill()
+        os.chdir(BASE_DIR)
+
+    print("\n✅ ROUTE E (Warm Daemon): PASSED")
+    return True
+
+# --- Route F helpers ---
+FEATURES_DIR = TEST_DIR / "features"
+
+def make_project(name, files, translators=None, **config):
+    """Creates TEST_DIR/features/<name> with `files` ({relpath: text}) and a nexus.json, and enters it."""
+    root = FEATURES_DIR / name
+    for relpath, text in files.items():
+        path = root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    config = {"project_name": name, "watch_dirs": ["."], "ignore_patterns": [".nexus", "REPORT*", "*.idx"],
+              "ignore_syntax": "gitignore", "translators": translators or {"py": "code", "md": "text", "csv": "csv"}, **config}
+    (root / "nexus.json").write_text(json.dumps(config, indent=2), encoding="utf-8")
+    os.chdir(root)
+    return root
+
+def nexus(*args):
+    """Runs a nexus command in the current directory; returns its combined output, or None if it failed."""
+    result = subprocess.run(["nexus", *args], capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if result.returncode != 0:
+        print(result.stdout + result.stderr)
+        return None
+    return result.stdout + result.stderr
+
+def read_report(path="REPORT.md"):
+    """The report's lines without the timestamp, so two scans can be compared."""
+    return [l for l in Path(path).read_text(encoding="utf-8").splitlines() if not l.startswith("**Generated:**")]
+
+def check(condition, message):
+    if not condition:
+        print(f"❌ {message}")
+    return condition
+
+# Runs nexus with a spy on the token counters and prints how many texts they encoded
+COUNT_ENCODES = """
+import sys
+from nexus_cli import tokens
+from nexus_cli.main import main
+encoded = [0]
+def spy(cls):
+    measure, measure_batch = cls.measure, cls.measure_batch
+    def batch(self, texts):
+        encoded[0] += len(texts)
+        self.measure = lambda text: measure(self, text)  # per-text calls inside a batch count once
+        try:
+            return measure_batch(self, texts)
+        finally:
+            del self.measure
+    def single(self, text):
+        encoded[0] += 1
+        return measure(self, text)
+    cls.measure, cls.measure_batch = single, batch
+for name in ("TokenCounter", "FastEstimator"):
+    if hasattr(tokens, name):
+        spy(getattr(tokens, name))
+sys.argv = ["nexus"] + sys.argv[1:]
+try:
+    main()
+finally:
+    print(f"ENCODED {encoded[0]}")
+"""
+
+def nexus_encodes(*args):
+    """Runs a nexus command; returns (output, number of texts the token counter encoded)."""
+    import re
+    result = subprocess.run([sys.executable, "-c", COUNT_ENCODES, *args], capture_output=True, text=True, encoding="utf-8", errors="replace")
+    output = result.stdout + result.stderr
+    if result.returncode != 0:
+        print(output)
+    encoded = re.search(r"ENCODED (\d+)", output)
+    return output, int(encoded.group(1)) if encoded else None
+
+def check_cache_invalidation():
+    """Unchanged files come from the cache; editing custom_handlers.py or an option invalidates it."""
+    make_project("cache", {"a.shout": "hello\n", "b.py": "print('b')\n"}, {"shout": "shout", "py": "code"})
+    handlers = Path(".nexus/custom_handlers.py")
+    handlers.parent.mkdir(exist_ok=True)
+    shout = ("from nexus_cli.handlers import register_handler\n"
+             "@register_handler('shout')\n"
+             "def handle_shout(path):\n    return '### SHOUT: {}\\n'\n")
+    handlers.write_text(shout.format("v1"), encoding="utf-8")
+    first, second = nexus("scan", "-o", "REPORT.md"), nexus("scan", "-o", "REPORT.md")
+    if not (check(first and "SHOUT: v1" in Path("REPORT.md").read_text(encoding="utf-8"), "custom handler output missing")
+            and check(second and "2 hits, 0 misses" in second, "warm scan did not hit the cache")):
+        return False
+    handlers.write_text(shout.format("v2"), encoding="utf-8")
+    if not check(nexus("scan", "-o", "REPORT.md") and "SHOUT: v2" in Path("REPORT.md").read_text(encoding="utf-8"),
+                 "editing custom_handlers.py did not invalidate the cached section"):
+        return False
+    config = json.loads(Path("nexus.json").read_text(encoding="utf-8"))
+    config["handlers"] = {"code": {"max_lines": 1}}
+    Path("nexus.json").write_text(json.dumps(config), encoding="utf-8")
+    return check("0 hits, 2 misses" in (nexus("scan", "-o", "REPORT.md") or ""), "changing a handler option did not invalidate the cache")
+
+def check_parallel_matches_serial():
+    """A -j scan (threads for code/text, processes for csv) writes the same report as a serial scan."""
+    files = {f"pkg{i % 3}/mod{i}.py": f"def f{i}():\n    return {i}\n" for i in range(12)}
+    files.update({f"data/t{i}.csv": f"id,v\n{i},{i * 2}\n" for i in range(4)})
+    files["docs/readme.md"] = "# Docs\n"
+    make_project("parallel", files)
+    if not (nexus("scan", "--no-cache", "-o", "REPORT.md") and nexus("scan", "--no-cache", "-j", "4", "-o", "REPORT_J.md")):
+        return check(False, "scan -j FAILED")
+    return check(read_report("REPORT.md") == read_report("REPORT_J.md"), "-j report differs from the serial report")
+
+def check_streaming_minify():
+    """The streamed -m report equals minifying the whole plain report in one go."""
+    from nexus_cli.report import minify_text
+    files = {f"m{i}.md": f"# Title {i}   \n\n\n\n\nbody {i}\t\n\n\n" for i in range(6)}
+    files["trailing.py"] = "x = 1\n\n\n\n"
+    make_project("streaming", files)
+    if not (nexus("scan", "--no-cache", "-o", "REPORT.md") and nexus("scan", "--no-cache", "-m", "-o", "REPORT_M.md")):
+        return check(False, "scan FAILED")
+    plain, minified = "\n".join(read_report("REPORT.md")), "\n".join(read_report("REPORT_M.md"))
+    return (check(plain.split("\n").count("---") == 7 and "\n\n\n\n" in plain, "plain report lost sections or blank lines")
+            and check(minify_text(plain) == minified, "streamed -m report differs from minifying the whole report"))
+
+def check_ignore_rules():
+    """Ignore patterns follow .gitignore rules (negation, anchoring, directory-only); legacy substrings still match."""
+    # Every file's content names it, so the report shows which files were scanned
+    files = ["docs/a.md", "docs/keep.md", "top.py", "sub/top.py", "tmp1/x.py", "tmp2.py", "pkg.egg-info/info.py"]
+    make_project("ignore", {f: f"marker {f}\n" for f in files},
+                 ignore_patterns=[".nexus", "REPORT*", "*.md", "!keep.md", "/top.py", "tmp*/", "*.egg-info"])
+    if not nexus("scan", "--no-cache", "-o", "REPORT.md"):
+        return check(False, "scan FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    kept = {"docs/keep.md", "sub/top.py", "tmp2.py"}
+    for f in files:
+        if not check((f"marker {f}\n" in report) == (f in kept), f"{f} should {'' if f in kept else 'not '}be in the report"):
+            return False
+
+    # A nexus.json from before .gitignore semantics: '.egg-info' was a substring match
+    config = json.loads(Path("nexus.json").read_text(encoding="utf-8"))
+    del config["ignore_syntax"]
+    config["ignore_patterns"] = [".nexus", "REPORT", ".egg-info"]
+    Path("nexus.json").write_text(json.dumps(config), encoding="utf-8")
+    output = nexus("scan", "--no-cache", "-o", "REPORT.md") or ""
+    if not (check("'.egg-info' -> '*.egg-info*'" in output, "legacy substring pattern was not reported")
+            and check("marker pkg.egg-info/info.py" not in Path("REPORT.md").read_text(encoding="utf-8"),
+                      "legacy substring pattern stopped matching")):
+        return False
+
+    # Nested .gitignore files: the deepest one with a matching rule decides
+    nested = {".gitignore": "*.log\n", "a.log": "marker a.log\n", "sub/.gitignore": "!keep.log\n",
+              "sub/keep.log": "marker sub/keep.log\n", "sub/b.log": "marker sub/b.log\n",
+              "sub/deep/.gitignore": "keep.log\n", "sub/deep/keep.log": "marker sub/deep/keep.log\n"}
+    make_project("ignore_nested", nested, translators={"log": "text"}, use_gitignore=True)
+    if not nexus("scan", "--no-cache", "-o", "REPORT.md"):
+        return check(False, "scan with nested .gitignore files FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    return check([f for f in nested if f"marker {f}\n" in report] == ["sub/keep.log"], "nested .gitignore rules were applied in the wrong order")
+
+def check_overlapping_watch_dirs():
+    """Overlapping watch_dirs are walked once, in pre-order (a directory's files before its subdirectories)."""
+    files = ["z.py", "src/a.py", "src/deep/b.py", "src/deep/c.py"]
+    make_project("walk", {f: f"marker {f}\n" for f in files}, watch_dirs=["src", ".", "src/deep", "missing"])
+    if not nexus("scan", "--no-cache", "-o", "REPORT.md"):
+        return check(False, "scan FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    if not check(all(report.count(f"marker {f}\n") == 1 for f in files), "a file under overlapping watch_dirs is missing or repeated"):
+        return False
+    return check([report.index(f"marker {f}\n") for f in files] == sorted(report.index(f"marker {f}\n") for f in files),
+                 "files are not in pre-order")
+
+def check_bounded_reads():
+    """Code and text handlers read only their head/tail/max_lines window and skip binary files."""
+    make_project("bounded", {"big.py": "".join(f"line_{i:04d}\n" for i in range(2000)),
+                             "notes.md": "".join(f"note {i}\n" for i in range(50))},
+                 handlers={"code": {"head": 60, "tail": 30}, "text": {"max_lines": 3}})
+    Path("blob.py").write_bytes(b"marker blob\0\x01\x02" * 100)
+    if not nexus("scan", "--no-cache", "-o", "REPORT.md"):
+        return check(False, "scan FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    return (check("line_0000" in report and "line_1999" in report and "line_1000" not in report, "code head/tail window not applied")
+            and check("note 2\n" in report and "note 3\n" not in report, "text max_lines not applied")
+            and check("marker blob" not in report and "blob.py" not in report, "binary file was rendered"))
+
+def check_csv_rows():
+    """CSV rows are counted per record (quoted newlines included); "rows": "estimate" extrapolates large files."""
+    import re
+    quoted = 'id,note\n1,"two\nlines"\n2,plain\n\n3,"say ""hi""\nand\nbye"\n'
+    big = "id,value\n" + "".join(f"{i},value_{i}\n" for i in range(8000))
+    make_project("csv", {"quoted.csv": quoted, "big.csv": big})
+    # Runs of blank lines are not rows (written as bytes so CRLF survives on every platform)
+    Path("blanks.csv").write_bytes(b"id,v\n1,2\n\n\n\n3,4\n")
+    Path("crlf.csv").write_bytes(b"id,v\r\n1,2\r\n\r\n\r\n\r\n3,4\r\n")
+    if not nexus("scan", "--no-cache", "-o", "REPORT.md"):
+        return check(False, "scan FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    if not check("- Shape: (3, 2)" in report and "- Shape: (8000, 2)" in report, "quoted-newline CSV rows miscounted"):
+        return False
+    if not check("blanks.csv\n- Shape: (2, 2)" in report and "crlf.csv\n- Shape: (2, 2)" in report, "blank-line runs counted as CSV rows"):
+        return False
+    config = json.loads(Path("nexus.json").read_text(encoding="utf-8"))
+    config["handlers"] = {"csv": {"rows": "estimate"}}
+    Path("nexus.json").write_text(json.dumps(config), encoding="utf-8")
+    if not nexus("scan", "--no-cache", "-o", "REPORT.md"):
+        return check(False, "scan FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    estimate = re.search(r"- Shape: \(~([\d,]+), 2\)", report)
+    return (check("- Shape: (3, 2)" in report, "a CSV under the sniffed block should still be counted exactly")
+            and check(estimate and 7000 <= int(estimate.group(1).replace(",", "")) <= 9000, "row estimate missing or far off"))
+
+def check_pdf_page_cache():
+    """The PDF page cache follows --no-cache and drops the pages of deleted PDFs."""
+    import random
+    from nexus_cli.bench import make_pdf
+    make_project("pdf", {"notes.md": "# Notes\n"}, {"md": "text", "pdf": "pdf"})
+    Path("doc.pdf").write_bytes(make_pdf(random.Random(0), 2))
+    pages = Path(".nexus/cache/pdf")
+    if not check(nexus("scan", "--no-cache", "-o", "REPORT.md") and not pages.exists(), "--no-cache wrote the PDF page cache"):
+        return False
+    if not check(nexus("scan", "-o", "REPORT.md") and len(list(pages.iterdir())) == 1, "a scan did not cache the PDF's pages"):
+        return False
+    Path("doc.pdf").unlink()
+    return check(nexus("scan", "-o", "REPORT.md") and not list(pages.iterdir()), "a deleted PDF's pages were not pruned")
+
+def check_token_budget():
+    """--max-tokens keeps the report within the budget and a section whole; the manifest lists every file unless capped."""
+    import re
+    files = {f"pkg{i % 7}/sub{i % 3}/module_{i}.py": "".join(f"def f{j}():\n    return {i * j}\n" for j in range(8)) for i in range(105)}
+    make_project("budget", files)
+    for budget, cap in ((4000, None), (1500, "25")):
+        output = nexus("scan", "--no-cache", "--token-estimate", "fast", "--max-tokens", str(budget),
+                       *(("--manifest-rows", cap) if cap else ()), "-o", "REPORT.md") or ""
+        total = re.search(r"~([\d,]+) tokens", output)
+        report = Path("REPORT.md").read_text(encoding="utf-8")
+        included = re.search(r"Included: (\d+)", report)
+        if not (check(total and int(total.group(1).replace(",", "")) <= budget, f"report exceeds the {budget} token budget")
+                and check(included and int(included.group(1)) >= 1, f"no section kept whole within {budget} tokens")):
+            return False
+        if cap:
+            if not check(report.count("\n| ") <= int(cap) + 3, "--manifest-rows did not cap the manifest"):
+                return False
+        elif not check(all(re.search(rf"\| (included|truncated|omitted) \| [\d,]+ \| [\d,]+ \| {re.escape(f)} \|", report) for f in files),
+                       "the manifest does not list every file with its token cost"):
+            return False
+    return True
+
+def check_token_cache():
+    """Per-file token counts are cached: a warm scan only encodes what is not cached, with the same counts."""
+    import re
+    make_project("tokens", {f"mod{i}.py": "x = 1\n" * (i + 1) for i in range(5)})
+    args = ("scan", "--token-estimate", "fast", "--token-breakdown", "0", "-o", "REPORT.md")
+    counts = lambda output: (re.findall(r"(mod\d\.py)\W+code\W+([\d,]+)", output), re.search(r"~([\d,]+) tokens", output).group(1))
+    (cold, cold_encoded), (warm, warm_encoded) = nexus_encodes(*args), nexus_encodes(*args)
+    # The report header (it carries the timestamp) is the only text without a cached count
+    if not (check(cold_encoded == 6 and warm_encoded == 1, f"encoded {cold_encoded} then {warm_encoded} texts, expected 6 then 1")
+            and check(len(counts(cold)[0]) == 5 and counts(cold) == counts(warm), "warm per-file counts or total differ from the cold scan")):
+        return False
+    Path("mod2.py").write_text("y = 2\n" * 40, encoding="utf-8")
+    edited, edited_encoded = nexus_encodes(*args)
+    return check(edited_encoded == 2, f"editing one file encoded {edited_encoded} texts, expected 2")
+
+def check_offline_tokenizer():
+    """A missing bpe_file warns and the scan still writes its report; --token-estimate fast needs no tokenizer."""
+    make_project("tokenizer", {"a.py": "marker a\n"}, tokenizer={"bpe_file": "missing.tiktoken"})
+    output = nexus("scan", "--no-cache", "-o", "REPORT.md") or ""
+    if not check("Tokenizer unavailable" in output and "marker a" in Path("REPORT.md").read_text(encoding="utf-8"),
+                 "a missing bpe_file should warn and still write the report"):
+        return False
+    output = nexus("scan", "--no-cache", "--token-estimate", "fast", "-o", "REPORT.md") or ""
+    if not check("tokens, estimated)" in output and "Tokenizer unavailable" not in output, "--token-estimate fast did not count tokens"):
+        return False
+    # Loading from a cache directory must not leak into the environment of the process
+    from nexus_cli.tokens import load_encoding
+    environment = dict(os.environ)
+    try:
+        load_encoding(cache_dir=str(Path("empty-cache").resolve()))
+    except Exception:
+        pass
+    return check(dict(os.environ) == environment, "loading an encoding changed os.environ")
+
+def check_watch_updates():
+    """nexus watch rewrites the report when a file is edited, added or deleted, and never includes an existing report."""
+    # context.md is not ignored by nexus.json; watch still has to skip it as its own output
+    make_project("watch", {"a.py": "marker a v1\n", "b.py": "marker b\n", "context.md": "marker stale report\n"})
+    report = Path("context.md")
+    watcher = subprocess.Popen(["nexus", "watch", "--poll", "--interval", "0.2", "--debounce", "0.1", "-o", "context.md"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def settles(*expected, absent=()):
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            text = report.read_text(encoding="utf-8") if report.exists() else ""
+            if all(e in text for e in expected) and not any(a in text for a in absent):
+                return True
+            time.sleep(0.1)
+        return False
+
+    try:
+        if not check(settles("marker a v1", "marker b", absent=["marker stale report"]), "watch did not write the initial report or included the old one"):
+            return False
+        Path("a.py").write_text("marker a v2 (edited)\n", encoding="utf-8")
+        if not check(settles("marker a v2", absent=["marker a v1"]), "watch missed an edited file"):
+            return False
+        Path("c.py").write_text("marker c\n", encoding="utf-8")
+        Path("b.py").unlink()
+        return check(settles("marker c", absent=["marker b"]), "watch missed an added or deleted file")
+    finally:
+        watcher.kill()
+        watcher.wait()
+
+def check_dedup():
+    """--dedup renders identical files once and references the first copy, on cold and warm scans."""
+    same = "marker shared\ndef f():\n    return 42\n"
+    make_project("dedup", {"a/x.py": same, "b/x.py": same, "b/y.py": same, "c.py": "marker c\nSIZE = 1234567\n"})
+    for run in ("cold", "warm"):
+        output = nexus("scan", "--dedup", "-o", "REPORT.md") or ""
+        report = Path("REPORT.md").read_text(encoding="utf-8")
+        if not (check(report.count("marker shared") == 1 and report.count("Identical to `a/x.py`") == 2,
+                      f"{run} --dedup scan did not reference the first copy")
+                and check("marker c" in report and "2 duplicate files" in output, f"{run} --dedup summary is wrong")):
+            return False
+    return True
+
+def check_minify_savings():
+    """-m strips comments per language mode; token savings are only measured when asked for."""
+    make_project("minify", {"app.py": "# license header\ndef f():\n    \"\"\"Docstring.\"\"\"\n    return 1  # one\n"},
+                 minify={"py": "python"})
+    plain = nexus("scan", "--no-cache", "-m", "--token-estimate", "fast", "-o", "REPORT.md") or ""
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    if not check(plain and "license header" not in report and "Docstring" not in report and "return 1" in report,
+                 "python minify mode did not strip comments and docstrings"):
+        return False
+    detailed = nexus("scan", "--no-cache", "-m", "--token-estimate", "fast", "--token-breakdown", "-o", "REPORT.md") or ""
+    return (check("tokens saved" not in plain, "minify savings were measured without --stats/--token-breakdown")
+            and check("tokens saved" in detailed, "--token-breakdown did not report minify savings"))
+
+def check_shards():
+    """--shard-tokens keeps every shard under the limit and --shards K balances K shards; no file is lost or split."""
+    import re
+    files = {f"pkg{i % 5}/module_{i}.py": f"# marker {i}:\n" + "".join(f"def f{j}():\n    return {i * j}\n" for j in range(6)) for i in range(60)}
+    make_project("shards", files)
+    for option, value in (("--shard-tokens", "800"), ("--shards", "3")):
+        for old in Path(".").glob("REPORT_*.md"):
+            old.unlink()
+        if not nexus("scan", "--no-cache", "--token-estimate", "fast", option, value, "-o", "REPORT.md"):
+            return check(False, f"scan {option} FAILED")
+        rows = re.findall(r"^\| \d+ \| (\S+) \| ([\d,]+) \| ([\d,]+) \|", Path("REPORT_index.md").read_text(encoding="utf-8"), re.M)
+        tokens = [int(t.replace(",", "")) for _, _, t in rows]
+        text = "".join(Path(name).read_text(encoding="utf-8") for name, _, _ in rows)
+        if not check(all(text.count(f"# marker {i}:\n") == 1 for i in range(60)), f"{option}: a file is missing or repeated across shards"):
+            return False
+        if option == "--shard-tokens" and not check(len(rows) > 1 and max(tokens) <= 800, "a shard exceeds --shard-tokens"):
+            return False
+        if option == "--shards" and not check(len(rows) == 3 and max(tokens) <= 1.25 * sum(tokens) / 3, "--shards 3 is not balanced"):
+            return False
+    return True
+
+def check_scan_stats():
+    """--stats-json records non-negative phase times and per-translator file counts matching the project."""
+    files = {"a.py": "a = 1\n", "pkg/b.py": "b = 2\n", "pkg/c.py": "c = 3\n", "docs/d.md": "# d\n", "docs/e.md": "# e\n", "t.csv": "x,y\n1,2\n"}
+    make_project("stats", files)
+    expected = {"code": 3, "text": 2, "csv": 1}
+    for run, status in (("cold", "rendered"), ("warm", "cached")):
+        if not nexus("scan", "--token-estimate", "fast", "--stats", "--stats-json", "stats.json", "-o", "REPORT.md"):
+            return check(False, f"{run} scan --stats FAILED")
+        stats = json.loads(Path("stats.json").read_text(encoding="utf-8"))
+        phases = stats["phases"]
+        # Handlers only run (and get a phase) on the cold scan
+        required = {"setup", "walk", "write", "other"} | ({"handler:code", "handler:text", "handler:csv"} if run == "cold" else set())
+        if not (check(required <= set(phases) and all(p["seconds"] >= 0 for p in phases.values())
+                      and stats["total_seconds"] >= 0, f"{run}: phases missing or negative")
+                and check({t: v["files"] for t, v in stats["translators"].items()} == expected
+                          and all(v[status] == v["files"] for v in stats["translators"].values()), f"{run}: translator counts do not match the project")
+                and check(sorted(f["relpath"] for f in stats["files"]) == sorted(files) and all(f["tokens"] > 0 for f in stats["files"]),
+                          f"{run}: per-file records do not match the project")):
+            return False
+    return True
+
+def check_init_census():
+    """nexus init counts extensions outside ignored and .gitignore'd directories and maps them to translators."""
+    files = {"a.py": "a\n", "pkg/b.py": "b\n", "docs/c.md": "c\n", "data/d.csv": "x,y\n",
+             "node_modules/x/index.js": "j\n", "ignored/e.log": "l\n", ".gitignore": "ignored/\n"}
+    root = FEATURES_DIR / "init"
+    for relpath, text in files.items():
+        (root / relpath).parent.mkdir(parents=True, exist_ok=True)
+        (root / relpath).write_text(text, encoding="utf-8")
+    os.chdir(root)
+    if not nexus("init", "--yes"):
+        return check(False, "init FAILED")
+    config = json.loads(Path("nexus.json").read_text(encoding="utf-8"))
+    census = json.loads(Path(".nexus/cache/census.json").read_text(encoding="utf-8"))
+    return (check(config["translators"] == {"csv": "csv", "md": "text", "py": "code"}, "init picked the wrong translators")
+            and check(census["files"] == 4 and census["complete"] and census["extensions"]["py"]["files"] == 2,
+                      "census counted ignored files or missed some"))
+
+def check_scaffold_reapply():
+    """Re-applying a scaffold without overwrite only creates missing files and leaves edited ones alone."""
+    tree = "proj/\n├── src/\n│   ├── main.py\n│   └── utils.py\n├── docs/\n│   └── guide.md\n└── README.md\n"
+    make_project("scaffold", {"tree.txt": tree})
+    if not nexus("scaffold", "-f", "tree.txt", "-o", "out", "--yes"):
+        return check(False, "scaffold FAILED")
+    root = Path("out/proj")
+    if not check(all((root / f).is_file() for f in ("src/main.py", "src/utils.py", "docs/guide.md", "README.md")),
+                 "scaffold did not create every file"):
+        return False
+    (root / "src/main.py").write_text("edited\n", encoding="utf-8")
+    (root / "docs/guide.md").unlink()
+    # --json skips the save prompt; answer "no" to overwriting and "yes" to proceeding
+    result = subprocess.run(["nexus", "scaffold", "-f", "tree.txt", "-o", "out", "--json"], input="n\ny\n",
+                            capture_output=True, text=True, encoding="utf-8", errors="replace")
+    return (check(result.returncode == 0 and "Files created/updated: 1" in result.stdout, "re-apply did not create just the missing file")
+            and check((root / "src/main.py").read_text(encoding="utf-8") == "edited\n" and (root / "docs/guide.md").is_file(),
+                      "re-apply overwrote an edited file or missed a deleted one"))
+
+def check_git_scans():
+    """--since scans only files changed since a ref (plus untracked ones); --git takes git's file list."""
+    make_project("git", {"a.py": "marker a v1\n", "b.py": "marker b\n", ".gitignore": "local.py\nREPORT*\n.nexus/\n"})
+    git = lambda *args: subprocess.run(["git", "-c", "user.name=nexus", "-c", "user.email=nexus@example.com", *args],
+                                       capture_output=True, text=True).returncode == 0
+    if not check(git("init", "-q") and git("add", "-A") and git("commit", "-q", "-m", "base"), "git setup FAILED"):
+        return False
+    Path("a.py").write_text("marker a v2\n", encoding="utf-8")
+    Path("c.py").write_text("marker c\n", encoding="utf-8")
+    Path("local.py").write_text("marker local\n", encoding="utf-8")
+    if not nexus("scan", "--since", "-o", "REPORT.md"):
+        return check(False, "scan --since FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    if not check("marker a v2" in report and "marker c" in report and "marker b" not in report and "marker local" not in report,
+                 "--since did not keep exactly the changed and untracked files"):
+        return False
+    if not nexus("scan", "--git", "-o", "REPORT.md"):
+        return check(False, "scan --git FAILED")
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    return check(all(m in report for m in ("marker a v2", "marker b", "marker c")) and "marker local" not in report,
+                 "--git did not list tracked and untracked, non-ignored files")
+
+def check_stale_daemon():
+    """A serve.json left by a crashed daemon is removed and the scan runs locally."""
+    import socket
+    make_project("stale_daemon", {"a.py": "marker a\n"})
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed_port = sock.getsockname()[1]
+    # A dead pid, then a live pid (this process) with nothing listening on the recorded port
+    for case, pid in (("dead pid", dead.pid), ("refused connection", os.getpid())):
+        serve_file = Path(".nexus/serve.json")
+        serve_file.parent.mkdir(exist_ok=True)
+        serve_file.write_text(json.dumps({"pid": pid, "token": "stale", "port": closed_port}), encoding="utf-8")
+        if not (check(nexus("scan", "--token-estimate", "fast", "-o", "REPORT.md") and "marker a" in Path("REPORT.md").read_text(encoding="utf-8"),
+                      f"{case}: scan with a stale serve.json FAILED")
+                and check(not serve_file.exists(), f"{case}: the stale serve.json was kept")):
+            return False
+    return True
+
+def check_query_ranking():
+    """--query keeps the best-matching files, and renders or looks up each file only once."""
+    files = {"docs/zebra.md": "marker zebra: zebra stripes and more zebra\n", "docs/lion.md": "marker lion: a zebra hunter\n",
+             "src/engine.py": "marker engine\ndef run():\n    return 1\n", "src/util.py": "marker util\nX = 2\n"}
+    make_project("query", files)
+    output = nexus("scan", "--query", "zebra", "--top-k", "1", "--neighbors", "0", "-o", "REPORT.md") or ""
+    report = Path("REPORT.md").read_text(encoding="utf-8")
+    if not (check("marker zebra:" in report and "marker lion:" not in report and "marker engine" not in report,
+                  "--query did not keep only the best match")
+            and check("0 hits, 4 misses" in output, "indexed files were looked up in the cache twice")):
+        return False
+    output = nexus("scan", "--query", "hunter", "--top-k", "1", "--neighbors", "0", "-o", "REPORT.md") or ""
+    return (check("marker lion:" in Path("REPORT.md").read_text(encoding="utf-8"), "--query missed the only match")
+            and check("1 hits, 0 misses" in output, "a warm --query scan did not take its one section from the cache"))
+
+def check_jsonl_clipboard_text():
+    """--copy of a compressed JSONL report copies the markdown that `nexus render` writes; the .idx header is metadata only."""
+    from nexus_cli.jsonl import markdown_text
+    make_project("jsonl", {"a.py": "marker a\n", "docs/b.md": "marker b\n"})
+    if not (nexus("scan", "--no-cache", "--format", "jsonl", "--compress", "gzip", "-o", "REPORT.jsonl.gz")
+            and nexus("render", "REPORT.jsonl.gz", "-o", "REPORT.md")):
+        return check(False, "jsonl scan or render FAILED")
+    if not check(markdown_text("REPORT.jsonl.gz") == Path("REPORT.md").read_text(encoding="utf-8"),
+                 "clipboard text differs from the rendered markdown"):
+        return False
+    # The index header holds metadata only; rendering one file still starts with the report header
+    header = json.loads(Path("REPORT.jsonl.gz.idx").read_text(encoding="utf-8"))["header"]
+    if not (check("content" not in header and "tokens" not in header, "the .idx header holds the header record's text")
+            and nexus("render", "REPORT.jsonl.gz", "-p", "a.py", "-o", "ONE.md")):
+        return check(False, "rendering one file FAILED")
+    one = Path("ONE.md").read_text(encoding="utf-8")
+    return check(one.startswith("# NEXUS CONTEXT REPORT") and "marker a" in one and "marker b" not in one,
+                 "rendering one file lost the header or picked the wrong sections")
+
+# Each entry checks one scan feature in its own small project under test_output/features
+FEATURE_CHECKS = [
+    check_cache_invalidation,
+    check_parallel_matches_serial,
+    check_streaming_minify,
+    check_ignore_rules,
+    check_overlapping_watch_dirs,
+    check_bounded_reads,
+    check_csv_rows,
+    check_pdf_page_cache,
+    check_token_budget,
+    check_token_cache,
+    check_offline_tokenizer,
+    check_watch_updates,
+    check_dedup,
+    check_minify_savings,
+    check_shards,
+    check_scan_stats,
+    check_init_census,
+    check_scaffold_reapply,
+    check_git_scans,
+    check_stale_daemon,
+    check_query_ranking,
+    check_jsonl_clipboard_text,
+]
+
+def test_route_f_scan_features():
+    """
+    ROUTE F: Scan Features
+    One small project per feature, each asserting on the report or the console summary.
+    """
+    print("\n" + "="*50)
+    print("🔬 ROUTE F: SCAN FEATURES")
+    print("="*50)
+
+    failed = []
+    for feature in FEATURE_CHECKS:
+        print(f"\n[Check] {feature.__doc__.strip().splitlines()[0]}")
+        try:
+            if not feature():
+                failed.append(feature.__name__)
+        finally:
+            os.chdir(BASE_DIR)
+    if failed:
+        print(f"❌ Scan features FAILED: {', '.join(failed)}")
+        return False
+
+    print("\n✅ ROUTE F (Scan Features): PASSED")
+    return True
+
 def main():
     print("🧪 STARTING COMPREHENSIVE E2E TEST SUITE...\n")
     setup_environment()
     
     route_a_success = test_route_a_new_project()
     route_b_success = test_route_b_legacy_project()
+    route_c_success = test_route_c_startup_imports()
+    route_d_success = test_route_d_benchmark()
+    route_e_success = test_route_e_daemon()
+    route_f_success = test_route_f_scan_features()
     
+    passed = route_a_success and route_b_success and route_c_success and route_d_success and route_e_success and route_f_success
     print("\n" + "="*50)
-    if route_a_success and route_b_success:
+    if passed:
         print("🏆 ALL ROUTES PASSED! YOUR CLI IS PRODUCTION-READY.")
     else:
         print("💥 SOME TESTS FAILED. CHECK THE LOGS ABOVE.")
     print("="*50 + "\n")
+    # A non-zero status fails the CI job
+    return 0 if passed else 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file